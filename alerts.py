@@ -0,0 +1,241 @@
+"""
+Alert rule engine for the Hospital Reform Dashboard
+Derives the "Offene Punkte" from rules over hospital x LG facts
+
+Every rule is a vectorized function over the fact table returning a level
+per fact (0 = ok, 1 = warning, 2 = critical). Levels are kept in one
+fact x rule matrix; update() writes new facts and re-evaluates only the rows
+whose values changed. alerts() collapses hits of the same rule, region and
+LG into one alert (with the number of sites) and sorts by priority and
+deadline, so its size is bounded by rules x regions x LGs.
+"""
+
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+
+from kpi_rollup import latest_staffing_month
+from mock_data import MINDESTMENGEN, rate_indicator
+from volume_projection import VolumeProjection, volume_status
+
+LEVEL_OK, LEVEL_WARNING, LEVEL_CRITICAL = 0, 1, 2
+PRIORITIES = {LEVEL_WARNING: "warning", LEVEL_CRITICAL: "critical"}
+
+INDICATOR_LABELS = {
+    "complication_rate": "Komplikationsrate",
+    "mortality_rate": "Mortalität",
+    "satisfaction": "Zufriedenheit",
+    "avg_stay": "Verweildauer",
+}
+
+# Deadlines from the reform timeline (kh-reform-dashboard-konzept.md)
+DEADLINE_LG_ASSIGNMENT = pd.Timestamp("2025-12-31")
+DEADLINE_STAFFING = pd.Timestamp("2026-01-15")
+DEADLINE_QUALITY_AUDIT = pd.Timestamp("2025-12-20")
+DEADLINE_MINDESTMENGE = pd.Timestamp("2026-03-31")
+
+STAFFING_CRITICAL_SHARE = 0.8  # actual / required below this is critical
+APPROVAL_CRITICAL_DAYS = 30  # open applications this close to the deadline are critical
+
+# Rules whose level depends on as_of, re-evaluated for all facts when it changes
+TIME_DEPENDENT_RULES = ["approval"]
+
+NUMERIC_FACTS = ["staff_required", "staff_actual", "projected_cases"] + list(INDICATOR_LABELS)
+FACT_COLUMNS = ["region", "name", "status"] + NUMERIC_FACTS
+
+
+def _typed(facts):
+    """Fact columns in a fixed order with float measures (NaN = no data)"""
+    return facts[FACT_COLUMNS].astype({column: float for column in NUMERIC_FACTS})
+
+
+def _staffing(facts, as_of):
+    required = facts["staff_required"].to_numpy(dtype=float)
+    actual = facts["staff_actual"].to_numpy(dtype=float)
+    return np.select(
+        [actual < required * STAFFING_CRITICAL_SHARE, actual < required], [LEVEL_CRITICAL, LEVEL_WARNING], LEVEL_OK
+    )
+
+
+def _approval(facts, as_of):
+    open_ = (facts["status"] == "in_progress").to_numpy()
+    urgent = as_of >= DEADLINE_LG_ASSIGNMENT - pd.Timedelta(days=APPROVAL_CRITICAL_DAYS)
+    return np.where(open_, LEVEL_CRITICAL if urgent else LEVEL_WARNING, LEVEL_OK)
+
+
+def _minimum_volume(facts, as_of):
+    threshold = facts.index.get_level_values("lg").map(MINDESTMENGEN).to_numpy(dtype=float, na_value=np.nan)
+    status = volume_status(facts["projected_cases"], threshold)
+    return np.select([status == "critical", status == "warning"], [LEVEL_CRITICAL, LEVEL_WARNING], LEVEL_OK)
+
+
+def _indicator(indicator):
+    def rule(facts, as_of):
+        values = facts[indicator].to_numpy(dtype=float)
+        return np.where(rate_indicator(indicator, values) == "critical", LEVEL_WARNING, LEVEL_OK)
+    return rule
+
+
+# name -> type, deadline, rule, issue of one site, issue of n sites of a region
+RULES = {
+    "staffing": ("Personal", DEADLINE_STAFFING, _staffing,
+                 "Personalausstattung {lg} nicht ausreichend",
+                 "Personalausstattung {lg} an {n} Standorten nicht ausreichend"),
+    "approval": ("LG-Genehmigung", DEADLINE_LG_ASSIGNMENT, _approval,
+                 "{lg}: LG noch nicht genehmigt",
+                 "{lg}: LG an {n} Standorten noch nicht genehmigt"),
+    "minimum_volume": ("Mindestmenge", DEADLINE_MINDESTMENGE, _minimum_volume,
+                       "{lg}: Prognose unter Mindestmenge",
+                       "{lg}: {n} Standorte mit Prognose unter Mindestmenge"),
+}
+RULES.update({
+    indicator: ("Qualität", DEADLINE_QUALITY_AUDIT, _indicator(indicator),
+                f"{{lg}}: {label} außerhalb des Zielwerts",
+                f"{{lg}}: {label} an {{n}} Standorten außerhalb des Zielwerts")
+    for indicator, label in INDICATOR_LABELS.items()
+})
+
+
+def alert_facts(sites, approvals, staffing, indicators, as_of):
+    """Build hospital x LG facts (index site_id, lg) as of a month
+
+    sites/approvals/staffing/indicators follow synthetic_data.generate_dataset;
+    indicators need the months up to as_of that the volume projection is
+    fitted on (FIT_MONTHS), staffing the latest month up to as_of.
+    """
+    as_of = pd.Timestamp(as_of)
+    keys = ["site_id", "lg"]
+    facts = approvals[keys + ["status"]].astype({"site_id": str, "lg": str, "status": str}).set_index(keys)
+
+    staffing = staffing[staffing["month"] == latest_staffing_month(staffing["month"], as_of)]
+    staffing = staffing.astype({"site_id": str, "lg": str}).set_index(keys)
+    facts = facts.join(staffing[["staff_required", "staff_actual"]])
+
+    projection = VolumeProjection(indicators, MINDESTMENGEN, as_of=as_of)
+    facts = facts.join(projection.table["projected"].rename("projected_cases"))
+    latest = indicators[indicators["month"] == as_of].astype({"site_id": str, "lg": str}).set_index(keys)
+    facts = facts.join(latest[list(INDICATOR_LABELS)])
+
+    site_info = sites.assign(id=sites["id"].astype(str)).set_index("id")[["region", "name"]].astype(str)
+    facts = facts.join(site_info, on="site_id")
+    return _typed(facts)
+
+
+class AlertEngine:
+    """Rule levels of all hospital x LG facts, re-evaluated per changed fact"""
+
+    def __init__(self, facts, as_of):
+        self.facts = _typed(facts)
+        self.as_of = pd.Timestamp(as_of)
+        self.rules = list(RULES)
+        self._levels = np.zeros((len(self.facts), len(self.rules)), dtype=np.int8)
+        self._table = None
+        self._lock = threading.Lock()
+        self._evaluate(np.arange(len(self.facts)))
+
+    def _evaluate(self, positions, rules=None):
+        subset = self.facts.iloc[positions]
+        for j, name in enumerate(self.rules):
+            if rules is None or name in rules:
+                self._levels[positions, j] = RULES[name][2](subset, self.as_of)
+        self._table = None
+
+    def update(self, facts, as_of=None, complete=False):
+        """Apply new or changed facts and re-evaluate their rows; returns the number of re-evaluated facts
+
+        A new as_of re-evaluates only the TIME_DEPENDENT_RULES for all facts.
+        complete=True marks facts as the full set: facts missing from it (e.g.
+        a site x LG that dropped out of the data) are removed.
+        """
+        facts = _typed(facts)
+        with self._lock:
+            if complete:
+                self._drop(~self.facts.index.isin(facts.index))
+            if as_of is not None and pd.Timestamp(as_of) != self.as_of:
+                self.as_of = pd.Timestamp(as_of)
+                self._evaluate(np.arange(len(self.facts)), rules=TIME_DEPENDENT_RULES)
+
+            new = ~facts.index.isin(self.facts.index)
+            if new.any():
+                self.facts = pd.concat([self.facts, facts[new]])
+                self._levels = np.vstack([self._levels, np.zeros((new.sum(), len(self.rules)), dtype=np.int8)])
+
+            positions = self.facts.index.get_indexer(facts.index)
+            old, incoming = self.facts.iloc[positions].to_numpy(), facts.to_numpy()
+            changed = ((old != incoming) & ~(pd.isna(old) & pd.isna(incoming))).any(axis=1) | new
+            positions = positions[changed]
+            if len(positions):
+                for j, column in enumerate(FACT_COLUMNS):
+                    self.facts.iloc[positions, j] = facts[column].to_numpy()[changed]
+                self._evaluate(positions)
+            return len(positions)
+
+    def remove(self, keys):
+        """Drop facts (e.g. an LG moved away from a site); returns the number of removed facts"""
+        with self._lock:
+            return self._drop(self.facts.index.isin(keys))
+
+    def _drop(self, drop):
+        if not drop.any():
+            return 0
+        self.facts = self.facts[~drop]
+        self._levels = self._levels[~drop]
+        self._table = None
+        return int(drop.sum())
+
+    def copy(self):
+        """Independent engine with the same facts and rule levels (e.g. for what-if scenarios)"""
+        other = copy.copy(self)
+        other.facts = self.facts.copy()
+        other._levels = self._levels.copy()
+        other._lock = threading.Lock()
+        return other
+
+    def alerts(self):
+        """Alerts sorted by priority and deadline, one per rule, region and LG"""
+        with self._lock:
+            if self._table is None:
+                self._table = self._build_table()
+            return list(self._table)
+
+    def _build_table(self):
+        positions, rule_idx = np.nonzero(self._levels)
+        if not len(positions):
+            return []
+
+        hits = pd.DataFrame({
+            "rule": np.asarray(self.rules, dtype=object)[rule_idx],
+            "region": self.facts["region"].to_numpy()[positions],
+            "lg": self.facts.index.get_level_values("lg").to_numpy()[positions],
+            "hospital": self.facts["name"].to_numpy()[positions],
+            "level": self._levels[positions, rule_idx],
+        })
+        grouped = hits.groupby(["rule", "region", "lg"], sort=False).agg(
+            level=("level", "max"), sites=("hospital", "size"), hospital=("hospital", "first")
+        ).reset_index()
+        grouped["deadline"] = grouped["rule"].map({name: rule[1] for name, rule in RULES.items()})
+        grouped = grouped.sort_values(["level", "deadline", "sites", "region"], ascending=[False, True, False, True])
+
+        alerts = []
+        for row in grouped.itertuples(index=False):
+            alert_type, deadline, _, single, several = RULES[row.rule]
+            alerts.append({
+                "priority": PRIORITIES[row.level],
+                "region": row.region,
+                "hospital": row.hospital if row.sites == 1 else None,
+                "issue": (single if row.sites == 1 else several).format(lg=row.lg, n=row.sites),
+                "deadline": deadline.strftime("%d.%m.%Y"),
+                "type": alert_type,
+                "sites": int(row.sites),
+            })
+        return alerts
+
+
+def alerts_from_dataset(dataset, as_of=None):
+    """Build an AlertEngine for a dataset as of a month (default: the latest)"""
+    months = dataset["indicators"]["month"]
+    as_of = pd.Timestamp(as_of) if as_of is not None else months.max()
+    facts = alert_facts(dataset["sites"], dataset["approvals"], dataset["staffing"], dataset["indicators"], as_of)
+    return AlertEngine(facts, as_of)
@@ -0,0 +1,339 @@
+"""
+LG allocation optimizer for the regional conferences
+Proposes which sites of a region should provide which Leistungsgruppen
+
+The objective rewards specialist reachability (population share of the
+region within 60 minutes, averaged over the LGs, counting sites outside
+the region as they are) and quality (mean quality score of the sites
+providing an LG), with a small cost per change to the current
+assignment. Versorgungsstufen are a hard constraint (LG_MIN_LEVEL); the
+Mindestmengen (the region's projected cases split evenly must reach the
+threshold, which caps the number of sites per LG) and the related LGs
+(RELATED_LGS) are penalties, and the best result without violations is
+kept.
+
+The search is simulated annealing over single site x LG toggles whose
+score difference only touches the toggled LG: per cell and LG the number
+of sites reaching it is kept, so a toggle costs O(cells the site
+reaches). Independent chains run on the scenario process pool (one per
+core) in time slices; AllocationSearch collects the best assignment after
+every slice, so a result is available at any time within the budget.
+"""
+
+from functools import lru_cache
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+W_REACH = 1.0
+W_QUALITY = 0.5
+W_CHANGE = 0.001  # per changed site x LG
+W_PENALTY = 0.05  # per violated Mindestmenge / missing related LG
+
+TEMPERATURE_START = 0.01
+TEMPERATURE_END = 1e-5
+
+DEFAULT_BUDGET_S = 30
+SLICE_S = 2  # chains report their best assignment this often
+CHECK_EVERY = 64  # iterations between clock reads
+
+
+class AllocationProblem:
+    """Decision space and objective inputs of one region"""
+
+    def __init__(self, site_ids, names, leistungsgruppen, current, allowed, quality, caps, related,
+                 population, reach, outside):
+        """current/allowed/quality: sites x LGs; caps: max sites per LG; related: LG x LG (row needs column)
+
+        population, reach (cells x sites, sparse) and outside (cells x LGs)
+        follow ReachabilityEngine.coverage_inputs.
+        """
+        self.site_ids = list(site_ids)
+        self.names = list(names)
+        self.leistungsgruppen = list(leistungsgruppen)
+        self.current = current & allowed
+        self.allowed = allowed
+        self.quality = quality
+        self.caps = caps
+        self.related = related
+        self.population = population
+        self.cells = [reach.indices[reach.indptr[j]:reach.indptr[j + 1]] for j in range(reach.shape[1])]
+        self.outside = outside
+        self.candidates = np.argwhere(allowed)
+
+
+def quality_scores(facts):
+    """Quality score in [0, 1] per fact: indicator ratings (success 1, warning 0.5) and staffing"""
+    from alerts import INDICATOR_LABELS
+    from mock_data import rate_indicator
+
+    points = {"success": 1.0, "warning": 0.5, "critical": 0.0}
+    scores = [
+        np.where(facts[indicator].isna(), np.nan, np.vectorize(points.get)(rate_indicator(indicator, facts[indicator])))
+        for indicator in INDICATOR_LABELS
+    ]
+    staffing = np.where(facts["staff_required"].isna(), np.nan, facts["staff_actual"] >= facts["staff_required"])
+    scores = np.column_stack(scores + [staffing])
+    rated = (~np.isnan(scores)).sum(axis=1)
+    return np.where(rated > 0, np.nansum(scores, axis=1) / np.maximum(rated, 1), np.nan)
+
+
+def problem_from_model(model, region):
+    """AllocationProblem of a region's sites from a ScenarioModel"""
+    import pandas as pd
+
+    from mock_data import LG_MIN_LEVEL, MINDESTMENGEN, RELATED_LGS, VERSORGUNGSSTUFEN
+
+    sites = model.sites[model.sites["region"] == region]
+    leistungsgruppen = model.reachability.leistungsgruppen
+    keys = pd.MultiIndex.from_product([sites.index, leistungsgruppen], names=["site_id", "lg"])
+    shape = (len(sites), len(leistungsgruppen))
+
+    facts = model.alerts.facts.reindex(keys)
+    current = (facts["status"] == "approved").to_numpy().reshape(shape)
+    quality = pd.DataFrame(quality_scores(facts).reshape(shape), index=sites.index)
+    # LGs a site does not provide yet get its mean score (or a neutral one)
+    quality = quality.T.fillna(quality.mean(axis=1)).T.fillna(0.5).to_numpy()
+
+    rank = sites["level"].astype(str).map({level: i for i, level in enumerate(VERSORGUNGSSTUFEN)}).to_numpy()
+    min_rank = np.array([VERSORGUNGSSTUFEN.index(LG_MIN_LEVEL.get(lg, VERSORGUNGSSTUFEN[0])) for lg in leistungsgruppen])
+    allowed = rank[:, None] >= min_rank[None, :]
+
+    demand = model.volumes["projected"].reindex(keys).fillna(0).to_numpy().reshape(shape).sum(axis=0)
+    thresholds = np.array([MINDESTMENGEN.get(lg, np.nan) for lg in leistungsgruppen])
+    with np.errstate(invalid="ignore"):
+        caps = np.where(np.isnan(thresholds), len(sites), np.maximum(demand // thresholds, 1)).astype(int)
+
+    lg_index = {lg: i for i, lg in enumerate(leistungsgruppen)}
+    related = np.zeros((len(leistungsgruppen), len(leistungsgruppen)), dtype=bool)
+    for lg, required in RELATED_LGS.items():
+        for other in required:
+            if lg in lg_index and other in lg_index:
+                related[lg_index[lg], lg_index[other]] = True
+
+    population, reach, outside = model.reachability.coverage_inputs(region, sites.index)
+    return AllocationProblem(
+        sites.index, sites["name"], leistungsgruppen, current, allowed, quality, caps, related,
+        population, reach, outside[:, :len(leistungsgruppen)],
+    )
+
+
+class _Evaluation:
+    """Objective terms of an assignment, updated per toggle"""
+
+    def __init__(self, problem, x):
+        self.problem = problem
+        self.x = x.copy()
+        self.count = problem.outside.astype(np.int32)
+        for site in range(len(x)):
+            for lg in np.flatnonzero(x[site]):
+                self.count[problem.cells[site], lg] += 1
+        self.covered = (problem.population[:, None] * (self.count > 0)).sum(axis=0)
+        self.n = x.sum(axis=0)
+        self.qsum = (problem.quality * x).sum(axis=0)
+        self.changes = int((x != problem.current).sum())
+        self.missing = int((x[:, :, None] & problem.related[None] & ~x[:, None, :]).sum())
+        self._total_population = max(problem.population.sum(), 1)
+        self._n_lg = len(problem.leistungsgruppen)
+
+    def _lg_terms(self, lg, covered, n, qsum):
+        reach = covered / self._total_population
+        quality = qsum / n if n else 0.0
+        return (W_REACH * reach + W_QUALITY * quality) / self._n_lg - W_PENALTY * max(n - self.problem.caps[lg], 0)
+
+    @property
+    def violations(self):
+        return int(np.maximum(self.n - self.problem.caps, 0).sum()) + self.missing
+
+    @property
+    def score(self):
+        terms = sum(self._lg_terms(lg, self.covered[lg], self.n[lg], self.qsum[lg]) for lg in range(self._n_lg))
+        return terms - W_CHANGE * self.changes - W_PENALTY * self.missing
+
+    def delta(self, site, lg):
+        """Score change of toggling (site, lg) and the values to apply it"""
+        problem, adding = self.problem, not self.x[site, lg]
+        sign = 1 if adding else -1
+        cells = problem.cells[site]
+        counts = self.count[cells, lg]
+        changed = problem.population[cells][counts == (0 if adding else 1)].sum()
+        covered = self.covered[lg] + sign * changed
+        n = self.n[lg] + sign
+        qsum = self.qsum[lg] + sign * problem.quality[site, lg]
+
+        row = self.x[site]
+        # Related LGs this LG needs at the site, and LGs at the site that need this one
+        needs = int((problem.related[lg] & ~row).sum())
+        needed_by = int((row & problem.related[:, lg]).sum())
+        missing = sign * (needs - needed_by)
+        changes = 1 if self.x[site, lg] == problem.current[site, lg] else -1
+
+        delta = (self._lg_terms(lg, covered, n, qsum) - self._lg_terms(lg, self.covered[lg], self.n[lg], self.qsum[lg])
+                 - W_CHANGE * changes - W_PENALTY * missing)
+        return delta, (covered, n, qsum, missing, changes)
+
+    def apply(self, site, lg, values):
+        covered, n, qsum, missing, changes = values
+        self.count[self.problem.cells[site], lg] += 1 if not self.x[site, lg] else -1
+        self.x[site, lg] = not self.x[site, lg]
+        self.covered[lg], self.n[lg], self.qsum[lg] = covered, n, qsum
+        self.missing += missing
+        self.changes += changes
+
+
+def initial_state(problem, seed):
+    """Chain state starting at the current assignment"""
+    rng = np.random.default_rng(seed)
+    return {"x": problem.current.copy(), "best": None, "elapsed": 0.0, "iterations": 0,
+            "rng": rng.bit_generator.state}
+
+
+def _better(candidate, best):
+    """Results without violations win, then the higher score"""
+    return best is None or (candidate["violations"] == 0, candidate["score"]) > (best["violations"] == 0, best["score"])
+
+
+def _result(evaluation):
+    return {"x": evaluation.x.copy(), "score": float(evaluation.score), "violations": evaluation.violations}
+
+
+def anneal(problem, state, seconds, budget):
+    """Continue a chain for `seconds`; the temperature follows its elapsed time within `budget`"""
+    evaluation = _Evaluation(problem, state["x"])
+    rng = np.random.default_rng()
+    rng.bit_generator.state = state["rng"]
+    best = state["best"] or _result(evaluation)
+    score, violations = evaluation.score, evaluation.violations
+    candidates = problem.candidates
+    iterations = 0
+
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        if iterations % CHECK_EVERY == 0:
+            elapsed = time.perf_counter() - start
+            progress = min((state["elapsed"] + elapsed) / budget, 1.0)
+            temperature = TEMPERATURE_START * (TEMPERATURE_END / TEMPERATURE_START) ** progress
+        site, lg = candidates[rng.integers(len(candidates))]
+        delta, values = evaluation.delta(site, lg)
+        if delta >= 0 or rng.random() < math.exp(delta / temperature):
+            evaluation.apply(site, lg, values)
+            score += delta
+            violations = evaluation.violations
+            if _better({"score": score, "violations": violations}, best):
+                best = _result(evaluation)
+        iterations += 1
+
+    return {"x": evaluation.x, "best": best, "elapsed": state["elapsed"] + elapsed,
+            "iterations": state["iterations"] + iterations, "rng": rng.bit_generator.state}
+
+
+def describe(problem, x):
+    """Summary of an assignment against the current one"""
+    evaluation = _Evaluation(problem, x)
+    added, removed = np.argwhere(x & ~problem.current), np.argwhere(problem.current & ~x)
+    lgs = np.flatnonzero(evaluation.n)
+    return {
+        "specialized_60min": round(100 * float(evaluation.covered.mean() / evaluation._total_population), 1),
+        "quality": round(100 * float((evaluation.qsum[lgs] / evaluation.n[lgs]).mean()), 1) if len(lgs) else 0.0,
+        "assignments": int(x.sum()),
+        "violations": evaluation.violations,
+        "changes": [
+            {"site_id": problem.site_ids[site], "hospital": problem.names[site],
+             "lg": problem.leistungsgruppen[lg], "change": change}
+            for change, pairs in [("add", added), ("remove", removed)] for site, lg in pairs
+        ],
+    }
+
+
+# --- Search in the background ----------------------------------------------------
+
+
+@lru_cache(maxsize=8)
+def _worker_problem(region):
+    import scenarios
+
+    return problem_from_model(scenarios.worker_model(), region)
+
+
+def _anneal_in_worker(region, state, seconds, budget):
+    return anneal(_worker_problem(region), state, seconds, budget)
+
+
+class AllocationSearch:
+    """Annealing chains for one region in a background thread; the best assignment is available at any time"""
+
+    def __init__(self, region, budget=DEFAULT_BUDGET_S, processes=None, seed=0):
+        import data_provider
+        import scenarios
+
+        self.snapshot = data_provider.current_snapshot()
+        self.region = region
+        self.budget = budget
+        self.processes = processes or os.cpu_count() or 1
+        self.problem = problem_from_model(scenarios.get_model(), region)
+        self.states = [initial_state(self.problem, seed + chain) for chain in range(self.processes)]
+        self.baseline = describe(self.problem, self.problem.current)
+        self.best = None
+        self.error = None
+        self.done = False
+        self._started = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        import data_provider
+        import scenarios
+
+        data_provider.pin(self.snapshot)  # pool workers of the same data generation
+        try:
+            while not self._stop.is_set():
+                remaining = self.budget - (time.perf_counter() - self._started)
+                if remaining <= 0:
+                    break
+                seconds = min(SLICE_S, remaining)
+                if self.processes > 1:
+                    pool = scenarios.get_pool(self.processes)
+                    futures = [pool.submit(_anneal_in_worker, self.region, state, seconds, self.budget)
+                               for state in self.states]
+                    self.states = [future.result() for future in futures]
+                else:
+                    self.states = [anneal(self.problem, state, seconds, self.budget) for state in self.states]
+                self._collect()
+        except Exception as error:  # surfaced in the UI instead of dying silently with the thread
+            self.error = error
+        finally:
+            self.done = True
+
+    def _collect(self):
+        best = None
+        for state in self.states:
+            if _better(state["best"], best):
+                best = state["best"]
+        with self._lock:
+            self.best = describe(self.problem, best["x"]) | {"score": best["score"]}
+
+    def progress(self):
+        """Elapsed share of the budget, iterations of all chains and the best result so far"""
+        elapsed = 0.0 if self._started is None else time.perf_counter() - self._started
+        with self._lock:
+            return {
+                "progress": 1.0 if self.done else min(elapsed / self.budget, 1.0),
+                "iterations": sum(state["iterations"] for state in self.states),
+                "chains": len(self.states),
+                "best": self.best,
+                "done": self.done,
+                "error": self.error,
+            }
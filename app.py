@@ -3,14 +3,17 @@ Krankenhausreform Schleswig-Holstein Dashboard
 Interactive Dashboard for Hospital Reform Monitoring
 """
 
+import functools
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime
 
-# Import mock data
-from mock_data import (
+import data_provider
+import instrumentation
+from instrumentation import KIND_VIEW, timed
+
+# Import data (cached per freshness class). pandas and Plotly are imported
+# inside the views that need them to keep cold start and the Planung view light.
+from data_provider import (
     get_state_kpis,
     get_regional_status,
     get_critical_alerts,
@@ -18,12 +21,16 @@ from mock_data import (
     get_hospital_details,
     get_quality_data_for_lg,
     get_quality_trends,
-    get_hospital_comparison,
+    get_hospital_comparison_page,
     get_timeline_events,
     get_regional_coverage_analysis,
-    REGIONS,
+    get_regional_patient_flows,
+    get_volume_projection_for_hospital,
+    get_volume_projection_for_lg,
     LEISTUNGSGRUPPEN,
-    HOSPITALS,
+    MINDESTMENGEN,
+    VERSORGUNGSSTUFEN,
+    get_registry,
 )
 
 # Page configuration
@@ -34,6 +41,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+
+def fragment(func=None, *, run_every=None):
+    """st.fragment whose reruns read the data snapshot pinned by the session's last full run"""
+    if func is None:
+        return functools.partial(fragment, run_every=run_every)
+
+    @functools.wraps(func)
+    def pinned(*args, **kwargs):
+        data_provider.pin(st.session_state.get("snapshot"))
+        return func(*args, **kwargs)
+
+    return st.fragment(pinned, run_every=run_every)
+
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -86,17 +108,21 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@timed(KIND_VIEW)
 def render_header():
     """Render the dashboard header"""
     col1, col2, col3 = st.columns([1, 3, 1])
     with col1:
-        st.image("assets/sh_logo_wide.png", width=200)
+        # Served from static/ (st.image imports NumPy, which the lighter views do not need)
+        st.markdown('<img src="app/static/sh_logo_wide.png" width="200" alt="Schleswig-Holstein">',
+                    unsafe_allow_html=True)
     with col2:
         st.title("🏥 Krankenhausreform Schleswig-Holstein Dashboard")
     with col3:
-        st.write(f"**Stand:** {datetime.now().strftime('%d.%m.%Y')}")
+        st.write(f"**Stand:** {data_provider.current_snapshot().created.strftime('%d.%m.%Y')}")
 
 
+@timed(KIND_VIEW)
 def render_progress_bar(current, total, label=""):
     """Render a progress bar"""
     percentage = int((current / total) * 100)
@@ -117,6 +143,7 @@ def render_progress_bar(current, total, label=""):
     st.markdown(bar_html, unsafe_allow_html=True)
 
 
+@timed(KIND_VIEW)
 def render_status_badge(status):
     """Render a status badge"""
     colors = {
@@ -128,8 +155,118 @@ def render_status_badge(status):
     return colors.get(status, "⚪")
 
 
+STATUS_LABELS = {"success": "✓ Gut", "warning": "⚠ OK", "critical": "✗ Kritisch"}
+STATUS_CELL_STYLES = {
+    "success": "background-color: #d4edda; color: #155724",
+    "warning": "background-color: #fff3cd; color: #856404",
+    "critical": "background-color: #f8d7da; color: #721c24",
+}
+
+ALERTS_SHOWN = 5  # further alerts are listed in a table below
+
+TREND_RANGES = {"12 Monate": 12, "24 Monate": 24, "36 Monate": 36}
+
+VOLUME_COLUMNS = {
+    "cases_12m": "Fälle (12 Mon.)",
+    "projected": "Prognose (12 Mon.)",
+    "threshold": "Mindestmenge",
+    "trend_pct": "Trend (%/Jahr)",
+    "status": "Status",
+}
+
+SCENARIO_ACTIONS = {"LG verlagern": "move_lg", "Standort schließen": "close_site"}
+
+SCENARIO_COLUMNS = {
+    "lg_approved_pct": "LG genehmigt (%)",
+    "quality_fulfilled_pct": "Qualität erfüllt (%)",
+    "bed_occupancy": "Bettenauslastung (%)",
+    "emergency_30min": "Notfall <30 min (%)",
+    "specialized_60min": "Spezialisiert <60 min (%)",
+    "below_mindestmenge": "Unter Mindestmenge",
+    "alerts_critical": "Kritische Punkte",
+    "alerts_warning": "Warnungen",
+    "region_lg_approved_pct": "Region: LG genehmigt (%)",
+    "region_emergency_30min": "Region: Notfall <30 min (%)",
+    "region_specialized_60min": "Region: Spezialisiert <60 min (%)",
+}
+
+ALLOCATION_BUDGETS = {"10 Sekunden": 10, "30 Sekunden": 30, "60 Sekunden": 60}
+ALLOCATION_CHANGES = {"add": "➕ zuweisen", "remove": "➖ entziehen"}
+ALLOCATION_REFRESH_S = 1
+
+COMPARISON_PAGE_COLUMNS = {
+    "region": "Region",
+    "level": "Versorgungsstufe",
+    "status": "Gesamt",
+    "complication_rate_status": "Komplikationen",
+    "mortality_rate_status": "Mortalität",
+    "satisfaction_status": "Zufriedenheit",
+    "avg_stay_status": "Verweildauer",
+}
+COMPARISON_SORT_KEYS = {
+    "Krankenhaus": "hospital",
+    "Gesamtstatus": "status",
+    "Komplikationsrate": "complication_rate",
+    "Mortalität": "mortality_rate",
+    "Zufriedenheit": "satisfaction",
+    "Verweildauer": "avg_stay",
+    "Region": "region",
+    "Versorgungsstufe": "level",
+}
+FILTER_ALL = "Alle"
+
+
+@timed(KIND_VIEW)
+def render_status_table(status_df, columns):
+    """Render a grid of status values as one color-coded dataframe element"""
+    statuses = status_df[list(columns)].rename(columns=columns)
+    statuses.index.name = "Krankenhaus"
+    styles = statuses.apply(lambda col: col.map(STATUS_CELL_STYLES).fillna(""))
+    labels = statuses.apply(lambda col: col.map(STATUS_LABELS).fillna(col))
+
+    st.dataframe(
+        labels.style.apply(lambda _: styles, axis=None),
+        use_container_width=True,
+        height=min(35 * (len(labels) + 1) + 3, 600),
+    )
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_export(kind, formats, label):
+    """Render download buttons; the file is generated when its download is clicked, not kept in the session"""
+    import export
+
+    snapshot = st.session_state["snapshot"]
+
+    def generate(fmt):
+        def data():
+            data_provider.pin(snapshot)  # Streamlit calls this in its own thread: export the generation shown
+            with export.export_file(kind, fmt) as spool:
+                return spool.read()
+        return data
+
+    st.write(f"**{label}:**")
+    columns = st.columns(len(formats))
+    for column, fmt in zip(columns, formats):
+        with column:
+            st.download_button(
+                f"💾 {fmt.upper()}",
+                generate(fmt),
+                file_name=export.file_name(kind, fmt),
+                mime=export.FORMATS[fmt][1],
+                key=f"export_{kind}_{fmt}",
+                on_click="ignore",
+                use_container_width=True,
+            )
+
+
+@timed(KIND_VIEW)
 def view_overview():
     """Render the Overview (Landesebene) view"""
+    import pandas as pd
+    from charts import regional_map
+
     st.header("📊 Überblick - Landesebene")
 
     # Get state KPIs
@@ -181,68 +318,35 @@ def view_overview():
         # Get regional status
         regional_df = get_regional_status()
 
-        # Create a simple map visualization using plotly
-        fig = go.Figure()
-
-        # Simulated coordinates for regions (fictional positioning for visualization)
-        region_coords = {
-            "Flensburg": (54.8, 9.4),
-            "Kiel": (54.3, 10.1),
-            "Lübeck": (53.9, 10.7),
-            "Neumünster": (54.1, 9.9),
-            "Rendsburg": (54.3, 9.7),
-        }
-
-        for _, row in regional_df.iterrows():
-            lat, lon = region_coords[row["region"]]
-            color = {"success": "green", "warning": "yellow", "critical": "red"}[row["status"]]
-
-            fig.add_trace(go.Scattergeo(
-                lon=[lon],
-                lat=[lat],
-                text=f"{row['region']}<br>Status: {render_status_badge(row['status'])}<br>Krankenhäuser: {row['hospitals']}<br>LG genehmigt: {row['lg_approved_pct']}%",
-                mode='markers+text',
-                marker=dict(size=20, color=color),
-                textposition="top center",
-                name=row["region"]
-            ))
-
-        fig.update_geos(
-            center=dict(lat=54.2, lon=10.0),
-            projection_scale=15,
-            showcountries=False,
-            showcoastlines=True,
-            showland=True,
-            landcolor="lightgray"
-        )
-
-        fig.update_layout(
-            height=400,
-            margin={"r": 0, "t": 0, "l": 0, "b": 0},
-            showlegend=False
-        )
+        # Map is built from the DataFrame columns and cached by data content
+        fig = regional_map(regional_df)
 
         st.plotly_chart(fig, use_container_width=True)
 
         # Regional status table
         st.write("**Status nach Regionen:**")
-        for _, row in regional_df.iterrows():
-            col_a, col_b, col_c, col_d = st.columns([2, 1, 1, 1])
-            with col_a:
-                st.write(f"{render_status_badge(row['status'])} **{row['region']}**")
-            with col_b:
-                st.write(f"{row['hospitals']} Standorte")
-            with col_c:
-                st.write(f"{row['lg_approved_pct']}% LG")
-            with col_d:
-                st.write(f"{row['quality_fulfilled_pct']}% Qualität")
+        status_table = pd.DataFrame({
+            "Region": regional_df["status"].map(render_status_badge) + " " + regional_df["region"],
+            "Standorte": regional_df["hospitals"],
+            "LG genehmigt": regional_df["lg_approved_pct"],
+            "Qualität": regional_df["quality_fulfilled_pct"],
+        })
+        st.dataframe(
+            status_table,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "LG genehmigt": st.column_config.NumberColumn(format="%d%% LG"),
+                "Qualität": st.column_config.NumberColumn(format="%d%% Qualität"),
+            },
+        )
 
     with col2:
         st.subheader("⚠️ Offene Punkte")
 
         alerts = get_critical_alerts()
 
-        for alert in alerts:
+        for alert in alerts[:ALERTS_SHOWN]:
             priority_icon = "🔴" if alert["priority"] == "critical" else "🟡"
 
             # Use Streamlit containers instead of raw HTML
@@ -261,6 +365,13 @@ def view_overview():
                         st.caption(f"Krankenhaus: {alert['hospital']}")
                     st.caption(f"Frist: {alert['deadline']}")
 
+        if len(alerts) > ALERTS_SHOWN:
+            with st.expander(f"Alle {len(alerts)} offenen Punkte"):
+                df_alerts = pd.DataFrame(alerts)[["priority", "region", "hospital", "issue", "deadline", "type"]]
+                df_alerts["priority"] = df_alerts["priority"].map(STATUS_LABELS)
+                df_alerts.columns = ["Priorität", "Region", "Krankenhaus", "Thema", "Frist", "Art"]
+                st.dataframe(df_alerts, use_container_width=True, hide_index=True)
+
     st.divider()
 
     # Bottom section: KPI Scoreboard
@@ -278,95 +389,281 @@ def view_overview():
     st.dataframe(df_kpi, use_container_width=True, hide_index=True)
 
 
+@timed(KIND_VIEW)
 def view_regional():
     """Render the Regional view"""
     st.header("🗺️ Regional - Detailansicht")
 
+    render_regional_detail()
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_regional_detail():
+    """Render the region selector and its panels (reruns without header and sidebar)"""
     # Region selector
-    selected_region = st.selectbox("Region auswählen:", REGIONS)
+    selected_region = st.selectbox("Region auswählen:", get_registry().regions)
 
     if selected_region:
         st.subheader(f"Region: {selected_region}")
 
-        # Get hospitals and coverage analysis
-        hospitals = get_hospitals_for_region(selected_region)
-        coverage = get_regional_coverage_analysis(selected_region)
-
         col1, col2, col3 = st.columns([2, 2, 2])
 
         # Left column: Hospitals in region
         with col1:
-            st.write("### 🏥 Krankenhäuser")
+            render_hospital_list(selected_region)
 
-            for hosp in hospitals:
-                status_icon = render_status_badge(hosp["status"])
-                with st.expander(f"{status_icon} {hosp['name']}", expanded=False):
-                    st.write(f"**Status:** {hosp['level']}")
-                    st.write(f"**Planbetten:** {hosp['beds']}")
-                    st.write(f"**Mitarbeiter:** {hosp['staff']}")
+        # Middle column: Coverage analysis
+        with col2:
+            render_coverage_analysis(selected_region)
 
-                    render_progress_bar(hosp["lg_approved"], hosp["lg_total"], "Leistungsgruppen")
+        # Right column: Patient migration and timeline
+        with col3:
+            render_patient_migration(selected_region)
 
-                    if hosp["quality_fulfilled"]:
-                        st.success("✓ Qualitätskriterien erfüllt")
-                    else:
-                        st.error("✗ Qualitätskriterien nicht erfüllt")
+        st.divider()
+        render_scenario_simulator(selected_region)
 
-                    if hosp["warnings"]:
-                        for warning in hosp["warnings"]:
-                            st.warning(f"⚠️ {warning}")
+        st.divider()
+        render_allocation_optimizer(selected_region)
 
-        # Middle column: Coverage analysis
-        with col2:
-            st.write("### 📊 Versorgungsanalyse")
 
-            st.write("**Demographie:**")
-            st.metric("Bevölkerung", f"{coverage['demographics']['population']:,}")
-            st.metric("Durchschnittsalter", f"{coverage['demographics']['avg_age']} Jahre")
-            st.metric("Prognose 2030", f"{coverage['demographics']['forecast_2030']:+d}%")
+@fragment
+@timed(KIND_VIEW)
+def render_hospital_list(region):
+    """Render the hospitals of a region"""
+    st.write("### 🏥 Krankenhäuser")
 
-            st.write("**Erreichbarkeit:**")
-            st.metric("Notfallversorgung (<30 min)", f"{coverage['accessibility']['emergency_30min']}%")
-            st.metric("Spezialisierte Leistungen (<60 min)", f"{coverage['accessibility']['specialized_60min']}%")
+    hospitals = get_hospitals_for_region(region)
 
-            st.write("**Versorgungslücken:**")
-            for gap in coverage["coverage_gaps"]:
-                if gap["status"] == "missing":
-                    st.error(f"🔴 {gap['lg']}: Fehlt komplett")
-                else:
-                    st.warning(f"🟡 {gap['lg']}: Unterversorgt")
+    for hosp in hospitals:
+        status_icon = render_status_badge(hosp["status"])
+        with st.expander(f"{status_icon} {hosp['name']}", expanded=False):
+            st.write(f"**Status:** {hosp['level']}")
+            st.write(f"**Planbetten:** {hosp['beds']}")
+            st.write(f"**Mitarbeiter:** {hosp['staff']}")
 
-        # Right column: Patient migration and timeline
-        with col3:
-            st.write("### 📈 Patientenstrom")
+            render_progress_bar(hosp["lg_approved"], hosp["lg_total"], "Leistungsgruppen")
+
+            if hosp["quality_fulfilled"]:
+                st.success("✓ Qualitätskriterien erfüllt")
+            else:
+                st.error("✗ Qualitätskriterien nicht erfüllt")
+
+            if hosp["warnings"]:
+                for warning in hosp["warnings"]:
+                    st.warning(f"⚠️ {warning}")
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_coverage_analysis(region):
+    """Render demographics, accessibility and coverage gaps of a region"""
+    st.write("### 📊 Versorgungsanalyse")
+
+    coverage = get_regional_coverage_analysis(region)
+
+    st.write("**Demographie:**")
+    st.metric("Bevölkerung", f"{coverage['demographics']['population']:,}")
+    st.metric("Durchschnittsalter", f"{coverage['demographics']['avg_age']} Jahre")
+    st.metric("Prognose 2030", f"{coverage['demographics']['forecast_2030']:+d}%")
+
+    st.write("**Erreichbarkeit:**")
+    st.metric("Notfallversorgung (<30 min)", f"{coverage['accessibility']['emergency_30min']}%")
+    st.metric("Spezialisierte Leistungen (<60 min)", f"{coverage['accessibility']['specialized_60min']}%")
+
+    st.write("**Versorgungslücken:**")
+    if not coverage["coverage_gaps"]:
+        st.success("✓ Alle Leistungsgruppen für ≥90% in 60 min erreichbar")
+    for gap in coverage["coverage_gaps"]:
+        if gap["status"] == "missing":
+            st.error(f"🔴 {gap['lg']}: nur {gap['share']}% in 60 min erreichbar")
+        else:
+            st.warning(f"🟡 {gap['lg']}: Unterversorgt ({gap['share']}% in 60 min)")
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_patient_migration(region):
+    """Render patient migration and upcoming dates of a region"""
+    from charts import patient_flow_sankey
 
-            st.write("**Abwanderung:**")
-            for dest, pct in coverage["patient_migration"]["outbound"].items():
-                st.write(f"→ {dest}: +{pct}%")
+    st.write("### 📈 Patientenstrom")
 
-            st.write("**Zuwanderung:**")
-            for source, pct in coverage["patient_migration"]["inbound"].items():
-                st.write(f"← {source}: +{pct}%")
+    coverage = get_regional_coverage_analysis(region)
+
+    st.write("**Abwanderung** (Anteil der Einwohner):")
+    for dest, pct in coverage["patient_migration"]["outbound"].items():
+        st.write(f"→ {dest}: {pct}%")
+
+    st.write("**Zuwanderung** (Anteil der Fälle):")
+    for source, pct in coverage["patient_migration"]["inbound"].items():
+        st.write(f"← {source}: {pct}%")
+
+    st.plotly_chart(patient_flow_sankey(get_regional_patient_flows(region)), use_container_width=True)
+
+    st.divider()
+
+    st.write("### 🗓️ Anstehende Termine")
+    st.info("📅 20.12.2025: Audits Qualitätskriterien")
+    st.info("📅 31.12.2025: Frist LG-Zuweisung")
+    st.warning("⚠️ 15.01.2026: Personalausstattung-Nachweis")
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_scenario_simulator(region):
+    """Render the what-if simulator: collect change sets and compare their KPIs with the current state"""
+    import scenarios
+
+    st.write("### 🧪 Szenario-Simulation")
+    st.caption("Verlagerungen und Schließungen durchspielen; verlagerte LGs nehmen Fälle, Personal und Qualität mit.")
+
+    model = scenarios.get_model()
+    names = model.sites["name"]
+    in_region = model.sites[model.sites["region"] == region]
+    sites = dict(zip(in_region["name"], in_region.index))
+    drafts = st.session_state.setdefault("scenarios", [])
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        action = SCENARIO_ACTIONS[st.selectbox("Maßnahme:", list(SCENARIO_ACTIONS), key="scenario_action")]
+    with col2:
+        site = sites.get(st.selectbox("Standort:", list(sites)))
+    if action == scenarios.ACTION_MOVE_LG:
+        with col3:
+            lg = st.selectbox("Leistungsgruppe:", model.approved_lgs(site) if site else [])
+        with col4:
+            others = model.sites.drop(index=site) if site else model.sites
+            targets = dict(zip(others["name"] + " (" + others["region"].astype(str) + ")", others.index))
+            target = targets.get(st.selectbox("Ziel-Standort:", list(targets)))
+        change = {"action": action, "lg": lg, "from": site, "to": target} if lg and target else None
+    else:
+        change = {"action": action, "site": site} if site else None
+
+    combine = st.checkbox("Mit dem letzten Szenario kombinieren", key="scenario_combine", disabled=not drafts)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("Szenario hinzufügen", disabled=change is None, use_container_width=True):
+            if combine and drafts:
+                drafts[-1] = drafts[-1] + [change]
+            else:
+                drafts.append([change])
+            st.session_state.pop("scenario_results", None)
+    with col2:
+        if st.button("Szenarien berechnen", disabled=not drafts, use_container_width=True):
+            with st.spinner("Szenarien werden berechnet..."):
+                try:
+                    baseline, results = scenarios.evaluate_batch(drafts, region)
+                    st.session_state["scenario_results"] = (region, baseline, results)
+                except ValueError as error:
+                    st.error(f"Szenario ungültig: {error}")
+    with col3:
+        if st.button("Liste leeren", disabled=not drafts, use_container_width=True):
+            drafts.clear()
+            st.session_state.pop("scenario_results", None)
+
+    for i, changes in enumerate(drafts, start=1):
+        st.write(f"**Szenario {i}:** {scenarios.describe(changes, names)}")
+
+    results = st.session_state.get("scenario_results")
+    if results and results[0] == region and len(results[2]) == len(drafts):
+        _, baseline, summaries = results
+        table = scenarios.compare(baseline, summaries, [f"Szenario {i}" for i in range(1, len(drafts) + 1)])
+        st.dataframe(table[list(SCENARIO_COLUMNS)].rename(columns=SCENARIO_COLUMNS).T, use_container_width=True)
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_allocation_optimizer(region):
+    """Render the LG allocation optimizer: a background search whose best proposal is shown while it runs"""
+    import allocation
+
+    st.write("### 🧭 LG-Zuordnung optimieren")
+    st.caption(
+        "Schlägt Standorte je Leistungsgruppe vor (Erreichbarkeit und Qualität) unter Beachtung von "
+        "Versorgungsstufen, Mindestmengen und verwandten LG."
+    )
 
-            st.divider()
+    search = st.session_state.get("allocation")
+    if search is not None and search.region != region:
+        search = None
 
-            st.write("### 🗓️ Anstehende Termine")
-            st.info("📅 20.12.2025: Audits Qualitätskriterien")
-            st.info("📅 31.12.2025: Frist LG-Zuweisung")
-            st.warning("⚠️ 15.01.2026: Personalausstattung-Nachweis")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        budget = ALLOCATION_BUDGETS[st.selectbox("Rechenzeit:", list(ALLOCATION_BUDGETS))]
+    with col2:
+        if st.button("Optimierung starten", disabled=search is not None and not search.done,
+                     use_container_width=True):
+            if st.session_state.get("allocation") is not None:
+                st.session_state["allocation"].stop()
+            search = st.session_state["allocation"] = allocation.AllocationSearch(region, budget).start()
+    with col3:
+        if st.button("Abbrechen", disabled=search is None or search.done, use_container_width=True):
+            search.stop()
+
+    if search is None:
+        return
+    if search.done:
+        render_allocation_proposal(search)
+    else:
+        render_allocation_progress()
+
+
+@fragment(run_every=ALLOCATION_REFRESH_S)
+def render_allocation_progress():
+    """Refresh the running search's best proposal until it is done"""
+    search = st.session_state.get("allocation")
+    if search is None:
+        return
+    if search.done:
+        st.rerun()
+    render_allocation_proposal(search)
+
+
+@timed(KIND_VIEW)
+def render_allocation_proposal(search):
+    """Render the progress and the best proposal of an allocation search against the current assignment"""
+    import pandas as pd
+
+    progress = search.progress()
+    st.progress(progress["progress"], text=(
+        f"{progress['iterations']:,} Iterationen in {progress['chains']} Ketten"
+        + (" – abgeschlossen" if progress["done"] else "")
+    ))
+    if progress["error"] is not None:
+        st.error(f"Optimierung fehlgeschlagen: {progress['error']}")
+    best, baseline = progress["best"], search.baseline
+    if best is None:
+        st.info("Erste Ergebnisse folgen...")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Spezialisiert <60 min", f"{best['specialized_60min']}%",
+                f"{best['specialized_60min'] - baseline['specialized_60min']:+.1f} pp")
+    col2.metric("Qualitätsscore", f"{best['quality']}%", f"{best['quality'] - baseline['quality']:+.1f} pp")
+    col3.metric("Regelverstöße", best["violations"], best["violations"] - baseline["violations"], delta_color="inverse")
+    col4.metric("Änderungen", len(best["changes"]))
+
+    if best["changes"]:
+        changes = pd.DataFrame(best["changes"])
+        changes["change"] = changes["change"].map(ALLOCATION_CHANGES)
+        st.dataframe(
+            changes[["hospital", "lg", "change"]].rename(
+                columns={"hospital": "Krankenhaus", "lg": "Leistungsgruppe", "change": "Vorschlag"}
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
 
 
+@timed(KIND_VIEW)
 def view_locations():
     """Render the Locations (Standorte) view"""
     st.header("🏥 Standorte - Krankenhausprofile")
 
-    # Get all hospitals
-    all_hospitals = []
-    for region, hosps in HOSPITALS.items():
-        for hosp in hosps:
-            all_hospitals.append(hosp["name"])
-
-    selected_hospital = st.selectbox("Krankenhaus auswählen:", all_hospitals)
+    selected_hospital = st.selectbox("Krankenhaus auswählen:", get_registry().names)
 
     if selected_hospital:
         details = get_hospital_details(selected_hospital)
@@ -445,11 +742,33 @@ def view_locations():
                     for lg in details["lg_rejected"]:
                         st.error(f"✗ {lg['name']}\n\nGrund: {lg['reason']}")
 
+                st.divider()
+
+                st.write("**📉 Mindestmengen-Prognose:**")
+                volumes = get_volume_projection_for_hospital(selected_hospital)
+                if volumes is None or volumes.empty:
+                    st.info("Keine Leistungsgruppen mit Mindestmenge")
+                else:
+                    render_volume_table(volumes.set_index("lg").rename_axis("Leistungsgruppe"))
+
+    st.divider()
+    st.subheader("📥 Export")
+    render_export("profiles", ["csv", "xlsx", "parquet"], "Standortprofile aller Standorte")
+    render_export("report", ["html"], "Standortbericht (Ministerrat)")
+
 
+@timed(KIND_VIEW)
 def view_quality():
     """Render the Quality (Qualität) view"""
     st.header("📊 Qualität - Klinische Indikatoren")
 
+    render_quality_detail()
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_quality_detail():
+    """Render the LG selector and its panels (reruns without header and sidebar)"""
     # LG selector
     selected_lg = st.selectbox("Leistungsgruppe auswählen:", LEISTUNGSGRUPPEN)
 
@@ -497,116 +816,166 @@ def view_quality():
 
         st.divider()
 
-        # Trend chart
-        st.subheader("📈 Trend-Entwicklung (12 Monate)")
-
-        trend_df = get_quality_trends(selected_lg)
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=trend_df["month"],
-            y=trend_df["complication_rate_sh"],
-            mode='lines+markers',
-            name='Schleswig-Holstein',
-            line=dict(color='#007bff', width=3)
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=trend_df["month"],
-            y=trend_df["complication_rate_bund"],
-            mode='lines',
-            name='Bundesweit (Baseline)',
-            line=dict(color='#6c757d', width=2, dash='dash')
-        ))
-
-        fig.add_hline(
-            y=quality_data['complication_rate']['target'],
-            line_dash="dot",
-            line_color="red",
-            annotation_text="Zielwert"
-        )
+        render_quality_trend(selected_lg, quality_data['complication_rate']['target'])
 
-        fig.update_layout(
-            title="Komplikationsrate über Zeit",
-            xaxis_title="Monat",
-            yaxis_title="Komplikationsrate (%)",
-            height=400,
-            hovermode='x unified'
-        )
+        st.divider()
 
-        st.plotly_chart(fig, use_container_width=True)
+        render_lg_volumes(selected_lg)
 
         st.divider()
 
-        # Hospital comparison
-        st.subheader("🏥 Standort-Vergleich")
-        st.write(f"Qualitätsindikatoren für {selected_lg} - Vergleich aller Standorte")
-
-        comparison_data = get_hospital_comparison(selected_lg)
-
-        # Create header row
-        col_a, col_b, col_c, col_d, col_e = st.columns([3, 1, 1, 1, 1])
-        with col_a:
-            st.write("**Krankenhaus**")
-        with col_b:
-            st.write("**Komplikationen**")
-        with col_c:
-            st.write("**Mortalität**")
-        with col_d:
-            st.write("**Zufriedenheit**")
-        with col_e:
-            st.write("**Verweildauer**")
+        render_hospital_comparison(selected_lg)
 
-        st.divider()
 
-        # Create data rows with color-coded backgrounds
-        for comp in comparison_data:
-            col_a, col_b, col_c, col_d, col_e = st.columns([3, 1, 1, 1, 1])
-
-            with col_a:
-                st.write(comp['hospital'])
-            with col_b:
-                if comp['complication'] == 'success':
-                    st.success("✓ Gut", icon="✅")
-                elif comp['complication'] == 'warning':
-                    st.warning("⚠ OK", icon="⚠️")
-                else:
-                    st.error("✗ Kritisch", icon="🔴")
-            with col_c:
-                if comp['mortality'] == 'success':
-                    st.success("✓ Gut", icon="✅")
-                elif comp['mortality'] == 'warning':
-                    st.warning("⚠ OK", icon="⚠️")
-                else:
-                    st.error("✗ Kritisch", icon="🔴")
-            with col_d:
-                if comp['satisfaction'] == 'success':
-                    st.success("✓ Gut", icon="✅")
-                elif comp['satisfaction'] == 'warning':
-                    st.warning("⚠ OK", icon="⚠️")
-                else:
-                    st.error("✗ Kritisch", icon="🔴")
-            with col_e:
-                if comp['stay_duration'] == 'success':
-                    st.success("✓ Gut", icon="✅")
-                elif comp['stay_duration'] == 'warning':
-                    st.warning("⚠ OK", icon="⚠️")
-                else:
-                    st.error("✗ Kritisch", icon="🔴")
+@fragment
+@timed(KIND_VIEW)
+def render_quality_trend(leistungsgruppe, target):
+    """Render the complication rate trend chart of a Leistungsgruppe"""
+    import plotly.graph_objects as go
 
-        st.divider()
+    col_range, col_window = st.columns([1, 1])
+    with col_range:
+        months = TREND_RANGES[st.selectbox("Zeitraum:", list(TREND_RANGES))]
+    with col_window:
+        smoothed = st.checkbox("Gleitender 3-Monats-Durchschnitt")
+
+    st.subheader(f"📈 Trend-Entwicklung ({months} Monate)")
+
+    trend_df = get_quality_trends(leistungsgruppe, months=months, window=3 if smoothed else None)
+
+    latest_yoy = trend_df["complication_rate_sh_yoy"].dropna()
+    if not latest_yoy.empty:
+        st.caption(f"Veränderung zum Vorjahresmonat: {latest_yoy.iloc[-1]:+.2f} Prozentpunkte")
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=trend_df["month"],
+        y=trend_df["complication_rate_sh"],
+        mode='lines+markers',
+        name='Schleswig-Holstein',
+        line=dict(color='#007bff', width=3)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=trend_df["month"],
+        y=trend_df["complication_rate_bund"],
+        mode='lines',
+        name='Bundesweit (Baseline)',
+        line=dict(color='#6c757d', width=2, dash='dash')
+    ))
+
+    fig.add_hline(
+        y=target,
+        line_dash="dot",
+        line_color="red",
+        annotation_text="Zielwert"
+    )
+
+    fig.update_layout(
+        title="Komplikationsrate über Zeit",
+        xaxis_title="Monat",
+        yaxis_title="Komplikationsrate (%)",
+        height=400,
+        hovermode='x unified'
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@timed(KIND_VIEW)
+def render_volume_table(volumes):
+    """Render projected annual case volumes against the Mindestmenge"""
+    table = volumes[list(VOLUME_COLUMNS)].rename(columns=VOLUME_COLUMNS)
+    table["Status"] = table["Status"].map(STATUS_LABELS)
+    st.dataframe(
+        table,
+        use_container_width=True,
+        column_config={"Mindestmenge": st.column_config.NumberColumn(format="%d")},
+    )
 
-        # Legend
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.success("✓ Gut: Zielwert übertroffen", icon="✅")
-        with col2:
-            st.warning("⚠ OK: Im Zielbereich", icon="⚠️")
-        with col3:
-            st.error("✗ Kritisch: Unter Zielwert", icon="🔴")
 
+@fragment
+@timed(KIND_VIEW)
+def render_lg_volumes(leistungsgruppe):
+    """Render the Mindestmengen projection of a Leistungsgruppe across hospitals"""
+    st.subheader("📉 Mindestmengen-Prognose")
+
+    if leistungsgruppe not in MINDESTMENGEN:
+        st.info("Für diese Leistungsgruppe ist keine Mindestmenge festgelegt")
+        return
+
+    volumes = get_volume_projection_for_lg(leistungsgruppe)
+    at_risk = volumes[volumes["status"] != "success"]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Mindestmenge (Fälle/Jahr)", f"{MINDESTMENGEN[leistungsgruppe]:,}")
+    col2.metric("Standorte", len(volumes))
+    col3.metric("Prognose unter Mindestmenge", len(at_risk))
+
+    if at_risk.empty:
+        st.success("✓ Alle Standorte erreichen die Mindestmenge voraussichtlich")
+    else:
+        render_volume_table(at_risk.set_index("hospital").rename_axis("Krankenhaus"))
+
+
+@fragment
+@timed(KIND_VIEW)
+def render_hospital_comparison(leistungsgruppe):
+    """Render one page of the site comparison of a Leistungsgruppe (sorted, filtered and paged in the data layer)"""
+    import pandas as pd
+
+    st.subheader("🏥 Standort-Vergleich")
+    st.write(f"Qualitätsindikatoren für {leistungsgruppe} - Vergleich aller Standorte")
+
+    col_sort, col_order, col_region, col_level, col_status, col_page = st.columns([2, 1, 2, 2, 2, 1])
+    with col_sort:
+        sort = COMPARISON_SORT_KEYS[st.selectbox("Sortieren nach:", list(COMPARISON_SORT_KEYS))]
+    with col_order:
+        descending = st.selectbox("Reihenfolge:", ["Aufsteigend", "Absteigend"]) == "Absteigend"
+    with col_region:
+        region = st.selectbox("Region:", [FILTER_ALL] + list(get_registry().regions))
+    with col_level:
+        level = st.selectbox("Versorgungsstufe:", [FILTER_ALL] + VERSORGUNGSSTUFEN)
+    with col_status:
+        status = st.selectbox("Status:", [FILTER_ALL] + list(STATUS_LABELS), format_func=lambda s: STATUS_LABELS.get(s, s))
+    query = {
+        "sort": sort,
+        "descending": descending,
+        "region": None if region == FILTER_ALL else region,
+        "level": None if level == FILTER_ALL else level,
+        "status": None if status == FILTER_ALL else status,
+    }
+    # The first page carries the page count (a new count resets the input to page 1)
+    result = get_hospital_comparison_page(leistungsgruppe, **query, page=1)
+    with col_page:
+        page = st.number_input("Seite:", min_value=1, max_value=result["pages"], value=1, step=1)
+    if page != 1:
+        result = get_hospital_comparison_page(leistungsgruppe, **query, page=page)
+
+    if not result["rows"]:
+        st.info("Keine Standorte für diese Auswahl.")
+    else:
+        render_status_table(pd.DataFrame(list(result["rows"])).set_index("hospital"), COMPARISON_PAGE_COLUMNS)
+    first = (result["page"] - 1) * result["page_size"] + 1 if result["total"] else 0
+    last = min(result["page"] * result["page_size"], result["total"])
+    st.caption(f"Seite {result['page']} von {result['pages']} · Standorte {first}–{last} von {result['total']}")
+
+    st.divider()
+
+    # Legend
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.success("✓ Gut: Zielwert übertroffen", icon="✅")
+    with col2:
+        st.warning("⚠ OK: Im Zielbereich", icon="⚠️")
+    with col3:
+        st.error("✗ Kritisch: Unter Zielwert", icon="🔴")
+
+    render_export("comparison", ["csv", "xlsx", "parquet"], "Vergleichsmatrix aller Leistungsgruppen")
 
+
+@timed(KIND_VIEW)
 def view_planning():
     """Render the Planning (Planung) view"""
     st.header("🗓️ Planung - Zeitstrahl & Meilensteine")
@@ -659,11 +1028,20 @@ def view_planning():
 
     # Footer with data sources
     st.write("---")
-    st.caption(f"**Letzte Aktualisierung:** {datetime.now().strftime('%d.%m.%Y %H:%M')} Uhr")
-    st.caption("**Nächste Auto-Refresh:** 06.12.2025 17:00 Uhr")
+    from scheduler import get_scheduler, next_refresh
+
+    st.caption(f"**Letzte Aktualisierung:** {data_provider.current_snapshot().created.strftime('%d.%m.%Y %H:%M')} Uhr")
+    st.caption(f"**Nächste Auto-Refresh:** {next_refresh().strftime('%d.%m.%Y %H:%M')} Uhr")
+    refresh_error = getattr(get_scheduler(), "error", None)
+    if refresh_error is not None:
+        st.caption(f"⚠️ Letzter Auto-Refresh fehlgeschlagen: {refresh_error}")
+    failed = [result["source"] for result in getattr(get_scheduler(), "last_fetch", []) if result["status"] == "failed"]
+    if failed:
+        st.caption(f"⚠️ Quellen nicht erreichbar (letzter Stand wird verwendet): {', '.join(failed)}")
     st.caption("**Datenquellen:** Ministerium, Landesverband der Krankenkassen, MDK, Routinedaten")
 
 
+@timed(KIND_VIEW)
 def view_info():
     """Render the Info view with background information"""
     st.header("ℹ️ Fachlicher Hintergrund")
@@ -682,8 +1060,24 @@ def view_info():
         st.error(f"Fehler beim Laden der Datei: {str(e)}")
 
 
+def render_debug_panel():
+    """Render the timings of the current script run in the sidebar (KH_INSTRUMENT only)"""
+    with st.sidebar.expander("⏱️ Laufzeiten (Debug)"):
+        rows = instrumentation.run_summary()
+        if not rows:
+            st.caption("Keine Messwerte")
+            return
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
 def main():
     """Main application"""
+    if instrumentation.ENABLED:
+        instrumentation.start_run()
+
+    # One data generation for the whole run and the fragment reruns until the next one
+    st.session_state["snapshot"] = data_provider.pin()
+
     # Render header
     render_header()
 
@@ -691,7 +1085,8 @@ def main():
     st.sidebar.title("Navigation")
     page = st.sidebar.radio(
         "Ansicht wählen:",
-        ["📊 Überblick", "🗺️ Regional", "🏥 Standorte", "📈 Qualität", "🗓️ Planung"]
+        ["📊 Überblick", "🗺️ Regional", "🏥 Standorte", "📈 Qualität", "🗓️ Planung"],
+        key="page",
     )
 
     st.sidebar.divider()
@@ -724,6 +1119,15 @@ def main():
     elif page == "ℹ️ Info":
         view_info()
 
+    if instrumentation.ENABLED:
+        render_debug_panel()
+        instrumentation.export()
+
+    # Daily refresh with pre-warmed caches (one scheduler per server process), started once the
+    # page is rendered so the first visitor does not wait for its imports
+    import scheduler
+    scheduler.start()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,73 @@
+"""
+Alert benchmark: rule evaluation over all hospital x LG facts and incremental updates
+
+For each dataset size the engine is built for the second-to-last month,
+then updated with a changed subset of facts and with the facts of the
+latest month (a new delivery), and the sorted, deduplicated alert table is
+built after each step.
+
+Usage: python benchmarks/bench_alerts.py [--sites 12 1700 20000] [--changes 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from alerts import AlertEngine, alert_facts  # noqa: E402
+from mock_data import get_dataset  # noqa: E402
+from synthetic_data import BBOX_DE, generate_dataset  # noqa: E402
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(dataset, changes, seed=0):
+    months = sorted(dataset["indicators"]["month"].unique())
+
+    def facts(month):
+        return alert_facts(dataset["sites"], dataset["approvals"], dataset["staffing"], dataset["indicators"], month)
+
+    previous, latest = facts(months[-2]), facts(months[-1])
+    engine, build = _timed(lambda: AlertEngine(previous, months[-2]))
+    _, table = _timed(engine.alerts)
+
+    rng = np.random.default_rng(seed)
+    changed = previous.iloc[rng.choice(len(previous), min(changes, len(previous)), replace=False)].copy()
+    changed["staff_actual"] = 0
+    evaluated, update = _timed(lambda: engine.update(changed))
+    _, table_update = _timed(engine.alerts)
+
+    _, month_update = _timed(lambda: engine.update(latest, as_of=months[-1]))
+    alerts, table_month = _timed(engine.alerts)
+    return len(previous), build, table, evaluated, update + table_update, month_update + table_month, len(alerts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[0, 1700, 20000], help="0 = mock hospitals")
+    parser.add_argument("--changes", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'Standorte':>10} {'Fakten':>8} {'Aufbau':>9} {'Tabelle':>9} {'Änderung':>16} {'Neuer Monat':>12} {'Alerts':>7}")
+    for n_sites in args.sites:
+        if n_sites == 0:
+            dataset = get_dataset()
+        else:
+            dataset = generate_dataset(n_sites=n_sites, n_months=13, n_regions=5 if n_sites <= 2000 else 400,
+                                       bbox=BBOX_DE)
+        n_facts, build, table, evaluated, update, month_update, n_alerts = bench(dataset, args.changes)
+        print(f"{len(dataset['sites']):>10} {n_facts:>8} {build:>7.0f}ms {table:>7.0f}ms "
+              f"{update:>7.1f}ms ({evaluated:>4}) {month_update:>10.0f}ms {n_alerts:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Allocation benchmark: annealing throughput and anytime quality of the LG optimizer
+
+For each dataset size the allocation problem of the first region is built
+(including the reachability inputs), then one chain is annealed for the
+budget in slices; after every slice the best score and its violations are
+printed, showing how the proposal improves while the search runs.
+
+Usage: python benchmarks/bench_allocation.py [--sites 0 1700] [--budget 10] [--slice 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from allocation import anneal, describe, initial_state, problem_from_model  # noqa: E402
+from bench_scenarios import build_model  # noqa: E402
+from mock_data import get_dataset  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+def bench(dataset, budget, slice_s):
+    model = build_model(dataset)
+    region = model.sites["region"].iloc[0]
+
+    start = time.perf_counter()
+    problem = problem_from_model(model, region)
+    build = time.perf_counter() - start
+    baseline = describe(problem, problem.current)
+    print(f"  {region}: {problem.current.shape[0]} Standorte, Aufbau {build:.2f}s, "
+          f"Ist: {baseline['violations']} Verstöße, {baseline['specialized_60min']}% <60 min, "
+          f"Qualität {baseline['quality']}%")
+
+    state = initial_state(problem, seed=0)
+    while state["elapsed"] < budget:
+        state = anneal(problem, state, min(slice_s, budget - state["elapsed"]), budget)
+        best = describe(problem, state["best"]["x"])
+        print(f"  {state['elapsed']:>5.1f}s {state['iterations']:>9,} It. "
+              f"({state['iterations'] / state['elapsed']:>7,.0f}/s)  Score {state['best']['score']:.4f}  "
+              f"Verstöße {best['violations']:>4}  {best['specialized_60min']}% <60 min  "
+              f"Qualität {best['quality']}%  Änderungen {len(best['changes'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[0, 1700], help="0 = mock hospitals")
+    parser.add_argument("--budget", type=float, default=10)
+    parser.add_argument("--slice", type=float, default=2)
+    args = parser.parse_args()
+
+    for n_sites in args.sites:
+        dataset = get_dataset() if n_sites == 0 else generate_dataset(n_sites=n_sites)
+        print(f"{len(dataset['sites'])} Standorte:")
+        bench(dataset, args.budget, args.slice)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Site comparison benchmark: full comparison vs. one page from the data layer
+
+Generates synthetic datasets of growing size and times, for one LG, the
+records of all sites (what the Qualität view used to render) against one
+sorted, filtered page of a ComparisonTable. The page cost should stay flat
+as the number of sites grows.
+
+Usage: python benchmarks/bench_comparison.py [--sites 200 1700 10000] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from comparison import INDICATORS, comparison_table  # noqa: E402
+from mock_data import LEISTUNGSGRUPPEN, rate_indicator  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+def all_records(sites, routine):
+    """Every site of the LG as status records (the previous get_hospital_comparison)"""
+    import pandas as pd
+
+    names = sites.set_index("id")["name"]
+    return pd.DataFrame({
+        "hospital": names.reindex(routine["site_id"]).to_numpy(),
+        **{indicator: rate_indicator(indicator, routine[indicator]) for indicator in INDICATORS},
+    }).to_dict("records")
+
+
+def measure(func, repeat):
+    """Median ms per call"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[200, 1700, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    lg = LEISTUNGSGRUPPEN[0]
+    print(f"{'Standorte':>10} {'Zeilen':>7} {'Alle Zeilen':>12} {'Tabelle':>9} {'Seite':>8} {'Seite gefiltert':>16}")
+    for n_sites in args.sites:
+        dataset = generate_dataset(n_sites=n_sites, n_months=2)
+        indicators = dataset["indicators"]
+        routine = indicators[(indicators["month"] == indicators["month"].max()) & (indicators["lg"] == lg)]
+        region = dataset["sites"]["region"].iloc[0]
+
+        full_ms = measure(lambda: all_records(dataset["sites"], routine), args.repeat)
+        start = time.perf_counter()
+        table = comparison_table(dataset["sites"], routine)
+        table.order("complication_rate", descending=True)
+        build_ms = (time.perf_counter() - start) * 1000
+        page_ms = measure(lambda: table.page("complication_rate", True, page=2), args.repeat)
+        filtered_ms = measure(lambda: table.page("complication_rate", True, region=region, status="warning"), args.repeat)
+        print(f"{n_sites:>10} {len(table):>7} {full_ms:>10.1f}ms {build_ms:>7.1f}ms {page_ms:>6.2f}ms "
+              f"{filtered_ms:>14.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
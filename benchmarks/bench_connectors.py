@@ -0,0 +1,67 @@
+"""
+Connector benchmark: fetching the external sources one after another vs. concurrently
+
+Serves synthetic fixtures from a local fixture server with a fixed latency
+per request and times a full fetch of all sources sequentially (one source
+in flight), concurrently over the shared connection pool, and again
+concurrently with conditional requests (all sources unchanged, 304). The
+last run injects one 503 per source to show the cost of a retry.
+
+Usage: python benchmarks/bench_connectors.py [--sites 1700] [--delay 0.5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import connectors  # noqa: E402
+import fixture_server  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+def timed_fetch(server, inbox, concurrency=None):
+    start = time.perf_counter()
+    results = connectors.fetch(server.url, inbox, concurrency=concurrency)
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", type=int, default=1700)
+    parser.add_argument("--delay", type=float, default=0.5, help="latency per request in seconds")
+    args = parser.parse_args()
+
+    fixtures = tempfile.mkdtemp(prefix="kh_fixtures_")
+    inbox = tempfile.mkdtemp(prefix="kh_inbox_")
+    try:
+        fixture_server.write_fixtures(fixtures, generate_dataset(n_sites=args.sites))
+        server = fixture_server.serve(fixtures, delay=args.delay)
+
+        runs = [("nacheinander", 1, False, False), ("parallel", None, False, False),
+                ("parallel, unverändert", None, True, False), ("parallel, je 1x 503", None, False, True)]
+        print(f"{len(connectors.SOURCES)} Quellen, {args.delay:.2f}s Latenz je Anfrage\n")
+        print(f"{'Abruf':<24} {'Dauer':>7} {'aktualisiert':>13} {'304':>5} {'Versuche':>9}")
+        for label, concurrency, conditional, failures in runs:
+            if not conditional:
+                shutil.rmtree(inbox)
+            if failures:
+                server.failures = {f"/{config['path']}": 1 for config in connectors.SOURCES.values()}
+            seconds, results = timed_fetch(server, inbox, concurrency)
+            updated = sum(result["status"] == connectors.STATUS_UPDATED for result in results)
+            not_modified = sum(result["status"] == connectors.STATUS_NOT_MODIFIED for result in results)
+            attempts = sum(result["attempts"] for result in results)
+            print(f"{label:<24} {seconds:>6.2f}s {updated:>13} {not_modified:>5} {attempts:>9}")
+        server.shutdown()
+    finally:
+        shutil.rmtree(fixtures, ignore_errors=True)
+        shutil.rmtree(inbox, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
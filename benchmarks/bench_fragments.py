@@ -0,0 +1,81 @@
+"""
+Rerun latency benchmark: full script rerun vs. fragment-scoped rerun
+
+Changing a selectbox inside a fragment only re-executes that fragment.
+AppTest always reruns the whole script, so the fragment rerun is measured
+by running the fragment function on its own.
+
+Usage: python benchmarks/bench_fragments.py [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# view label -> (fragment function in app.py, selectbox label)
+VIEWS = {
+    "🗺️ Regional": ("render_regional_detail", "Region auswählen:"),
+    "📈 Qualität": ("render_quality_detail", "Leistungsgruppe auswählen:"),
+}
+
+
+def _run_fragment(fragment_name):
+    """Script body for AppTest: render a single fragment of app.py"""
+    import app
+
+    getattr(app, fragment_name)()
+
+
+def _timed(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _select_all(at, selectbox_label, options):
+    for option in options:
+        next(sb for sb in at.selectbox if sb.label == selectbox_label).set_value(option).run()
+
+
+def bench_view(page, fragment_name, selectbox_label, repeat):
+    """Return median per-interaction latency (ms) for full and fragment reruns"""
+    full = AppTest.from_file(APP_PATH, default_timeout=60)
+    full.run()
+    full.sidebar.radio[0].set_value(page).run()
+    options = next(sb for sb in full.selectbox if sb.label == selectbox_label).options
+
+    fragment = AppTest.from_function(_run_fragment, args=(fragment_name,), default_timeout=60)
+    fragment.run()
+
+    full_ms = _timed(lambda: _select_all(full, selectbox_label, options), repeat) / len(options)
+    fragment_ms = _timed(lambda: _select_all(fragment, selectbox_label, options), repeat) / len(options)
+    return full_ms, fragment_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'View':<14} {'Full rerun':>12} {'Fragment':>12} {'Reduction':>10}")
+    for page, (fragment_name, selectbox_label) in VIEWS.items():
+        full_ms, fragment_ms = bench_view(page, fragment_name, selectbox_label, args.repeat)
+        reduction = 100 * (1 - fragment_ms / full_ms)
+        print(f"{page:<14} {full_ms:>10.1f}ms {fragment_ms:>10.1f}ms {reduction:>9.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Ingestion throughput benchmark for monthly §21 KHEntgG routine data
+
+Writes a synthetic routine-data CSV of the requested size (new months only,
+appended block by block so memory stays bounded), ingests it into a fresh
+store and reports rows/s. A second run on the same file must be a no-op.
+
+Usage: python benchmarks/bench_ingest.py [--gb 2.0] [--workdir /tmp/kh-bench]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.csv as pacsv  # noqa: E402
+
+from data_store import DataStore, SOURCE_ROUTINE  # noqa: E402
+from ingest import SCHEMAS, ingest_file  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+def write_synthetic_csv(path, target_bytes, n_sites=20000, months_per_block=12):
+    """Append synthetic routine data, block by block with later months, until target_bytes is reached"""
+    columns = list(SCHEMAS[SOURCE_ROUTINE])
+    end_month = pd.Timestamp("2000-01-01")
+    writer = None
+    with open(path, "wb") as f:
+        while f.tell() < target_bytes:
+            end_month += pd.DateOffset(months=months_per_block)
+            indicators = generate_dataset(n_sites=n_sites, n_months=months_per_block,
+                                          end_month=end_month, seed=end_month.year)["indicators"]
+            indicators["month"] = indicators["month"].dt.strftime("%Y-%m")
+            for col in ["region", "lg"]:
+                indicators[col] = indicators[col].astype(str)
+            table = pa.Table.from_pandas(indicators[columns], preserve_index=False)
+            if writer is None:
+                writer = pacsv.CSVWriter(f, table.schema)
+            writer.write_table(table)
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument("--workdir", default="/tmp/kh-bench-ingest")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.workdir, ignore_errors=True)
+    os.makedirs(args.workdir)
+    csv_path = os.path.join(args.workdir, "routine.csv")
+
+    start = time.perf_counter()
+    write_synthetic_csv(csv_path, int(args.gb * 1024 ** 3))
+    size_gb = os.path.getsize(csv_path) / 1024 ** 3
+    print(f"CSV erzeugt: {size_gb:.2f} GB in {time.perf_counter() - start:.1f}s")
+
+    store = DataStore(os.path.join(args.workdir, "store"))
+    stats = ingest_file(store, SOURCE_ROUTINE, csv_path)
+    print(f"Ingestion: {stats['rows']:,} Zeilen in {stats['seconds']:.1f}s "
+          f"= {stats['rows'] / stats['seconds']:,.0f} Zeilen/s ({size_gb / stats['seconds'] * 1024:,.0f} MB/s), "
+          f"{len(stats['months'])} neue Monate")
+
+    rerun = ingest_file(store, SOURCE_ROUTINE, csv_path)
+    print(f"Wiederholung: {'übersprungen (no-op)' if rerun['skipped'] else 'FEHLER: erneut verarbeitet'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Patient flow benchmark: sparse OD aggregation of case-level data and the per-month cache
+
+For each dataset size, synthetic cases are generated from every month of
+the routine data (tens of millions of cases for 1700 sites over 12 months)
+and aggregated month by month into area x area x LG flow matrices. Then all
+months are requested again to measure the cached lookup.
+
+Usage: python benchmarks/bench_patient_flows.py [--sites 12 1700] [--months 12]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from mock_data import LEISTUNGSGRUPPEN, get_dataset  # noqa: E402
+from patient_flows import PatientFlows  # noqa: E402
+from synthetic_data import NEIGHBOUR_STATES, generate_cases, generate_dataset  # noqa: E402
+
+
+def bench(dataset, n_months):
+    indicators = dataset["indicators"]
+    months = sorted(indicators["month"].unique())[-n_months:]
+    by_month = indicators.groupby("month")[["site_id", "lg", "cases"]]
+
+    start = time.perf_counter()
+    cases = {pd.Timestamp(month).strftime("%Y-%m"): generate_cases(dataset["sites"], by_month.get_group(month), seed=i)
+             for i, month in enumerate(months)}
+    generate = time.perf_counter() - start
+
+    flows = PatientFlows(dataset["sites"], cases.__getitem__, LEISTUNGSGRUPPEN, list(NEIGHBOUR_STATES),
+                         max_months=n_months)
+    n_cases = sum(len(df) for df in cases.values())
+
+    start = time.perf_counter()
+    for month in months:
+        flows.month(month)
+    aggregate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for month in months:
+        flows.month(month).migration(flows.regions[0])
+    cached = time.perf_counter() - start
+
+    return n_cases, generate, aggregate, cached / len(months)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[0, 1700], help="0 = mock hospitals")
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args()
+
+    print(f"{'Standorte':>10} {'Fälle':>12} {'Erzeugung':>10} {'Aggregation':>12} {'Mio. Fälle/s':>13} {'Cache':>9}")
+    for n_sites in args.sites:
+        dataset = get_dataset() if n_sites == 0 else generate_dataset(n_sites=n_sites)
+        n_cases, generate, aggregate, cached = bench(dataset, args.months)
+        print(f"{len(dataset['sites']):>10} {n_cases:>12,} {generate:>9.1f}s {aggregate:>11.2f}s "
+              f"{n_cases / aggregate / 1e6:>13.1f} {cached * 1000:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
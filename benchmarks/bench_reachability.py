@@ -0,0 +1,62 @@
+"""
+Reachability benchmark: engine build and recompute after a site's LG portfolio changes
+
+For each dataset size the engine is built over a 1 km population grid of
+Schleswig-Holstein; then random single-site portfolio changes are applied
+and the shares of all regions x LGs are recomputed after each one.
+
+Usage: python benchmarks/bench_reachability.py [--sites 12 1700] [--changes 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from mock_data import LEISTUNGSGRUPPEN, get_dataset  # noqa: E402
+from reachability import EMERGENCY, EMERGENCY_MINUTES, SPECIALIZED_MINUTES, reachability_from_sites  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+def bench(dataset, changes, seed=0):
+    start = time.perf_counter()
+    engine = reachability_from_sites(dataset["sites"], dataset["approvals"], LEISTUNGSGRUPPEN)
+    build = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    site_ids = dataset["sites"]["id"].to_numpy()
+    samples = []
+    for _ in range(changes):
+        portfolio = [lg for lg in engine.services if rng.random() < 0.5]
+        start = time.perf_counter()
+        engine.update_site(site_ids[rng.integers(len(site_ids))], portfolio)
+        engine.shares(EMERGENCY_MINUTES)
+        engine.shares(SPECIALIZED_MINUTES)
+        samples.append(time.perf_counter() - start)
+
+    return engine, build, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[0, 1700], help="0 = mock hospitals")
+    parser.add_argument("--changes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'Standorte':>10} {'Zellen':>8} {'Aufbau':>9} {'Änderung (Median)':>18} {'Max':>8}  Notfall <30 min")
+    for n_sites in args.sites:
+        dataset = get_dataset() if n_sites == 0 else generate_dataset(n_sites=n_sites)
+        engine, build, samples = bench(dataset, args.changes)
+        print(f"{len(dataset['sites']):>10} {len(engine._population):>8} {build * 1000:>7.0f}ms "
+              f"{statistics.median(samples) * 1000:>16.1f}ms {max(samples) * 1000:>6.1f}ms  "
+              f"{engine.state_share(EMERGENCY, EMERGENCY_MINUTES):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
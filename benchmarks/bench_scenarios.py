@@ -0,0 +1,107 @@
+"""
+Scenario benchmark: incremental what-if evaluation against rebuilding all engines
+
+For each dataset size the KPI rollup, volume projection, reachability and
+alert engines are built once (the cost of recomputing everything for a
+scenario), then LG moves and site closures are applied incrementally to
+copies of the model. Finally a batch of closures of the mock hospitals is
+evaluated serially and on the process pool (first call incl. worker start).
+
+Usage: python benchmarks/bench_scenarios.py [--sites 0 1700] [--scenarios 20] [--processes 2]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+import scenarios  # noqa: E402
+from alerts import alerts_from_dataset  # noqa: E402
+from kpi_rollup import rollup_from_dataset  # noqa: E402
+from mock_data import LEISTUNGSGRUPPEN, MINDESTMENGEN, get_dataset  # noqa: E402
+from reachability import reachability_from_sites  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+from volume_projection import VolumeProjection  # noqa: E402
+
+
+def build_model(dataset):
+    """ScenarioModel built from scratch (all engines)"""
+    return scenarios.ScenarioModel(
+        dataset["sites"],
+        rollup_from_dataset(dataset),
+        VolumeProjection(dataset["indicators"], MINDESTMENGEN).table,
+        reachability_from_sites(dataset["sites"], dataset["approvals"], LEISTUNGSGRUPPEN),
+        alerts_from_dataset(dataset),
+    )
+
+
+def _median_ms(func, args_list):
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def bench(dataset, n_scenarios, seed=0):
+    start = time.perf_counter()
+    model = build_model(dataset)
+    rebuild = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    site_ids = model.sites.index
+    sources = [site_id for site_id in rng.permutation(site_ids) if model.approved_lgs(site_id)][:n_scenarios]
+    moves = [
+        [{"action": scenarios.ACTION_MOVE_LG, "lg": model.approved_lgs(source)[0], "from": source,
+          "to": site_ids[(site_ids.get_loc(source) + 1) % len(site_ids)]}]
+        for source in sources
+    ]
+    closures = [[{"action": scenarios.ACTION_CLOSE_SITE, "site": source}] for source in sources]
+
+    copy_ms = _median_ms(model.copy, [()] * len(sources))
+    move_ms = _median_ms(lambda changes: scenarios.evaluate(model, changes), [(changes,) for changes in moves])
+    close_ms = _median_ms(lambda changes: scenarios.evaluate(model, changes), [(changes,) for changes in closures])
+    return rebuild, copy_ms, move_ms, close_ms
+
+
+def bench_batch(n_scenarios, processes):
+    """Serial and pooled batch of closures of the mock hospitals"""
+    site_ids = scenarios.get_model().sites.index
+    batch = [[{"action": scenarios.ACTION_CLOSE_SITE, "site": site_ids[i % len(site_ids)]}]
+             for i in range(n_scenarios)]
+
+    timings = {}
+    for label, n in [("seriell", 1), (f"Pool ({processes}) kalt", processes), (f"Pool ({processes}) warm", processes)]:
+        start = time.perf_counter()
+        scenarios.evaluate_batch(batch, processes=n)
+        timings[label] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[0, 1700], help="0 = mock hospitals")
+    parser.add_argument("--scenarios", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'Standorte':>10} {'Neuaufbau':>10} {'Kopie':>9} {'LG verlagern':>13} {'Schließung':>11}")
+    for n_sites in args.sites:
+        dataset = get_dataset() if n_sites == 0 else generate_dataset(n_sites=n_sites)
+        rebuild, copy_ms, move_ms, close_ms = bench(dataset, args.scenarios)
+        print(f"{len(dataset['sites']):>10} {rebuild:>9.2f}s {copy_ms:>7.1f}ms {move_ms:>11.1f}ms {close_ms:>9.1f}ms")
+
+    print(f"\n{args.scenarios} Szenarien (Mock-Daten):")
+    for label, seconds in bench_batch(args.scenarios, args.processes).items():
+        print(f"  {label:<16} {seconds:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+SQL repository benchmark: round trips and latency of the per-hospital getters
+
+Builds a temporary SQLite database from synthetic data and times the
+Regional hospital list and the site profile three ways: one query per
+hospital (the naive per-getter loop), StoreBackend reads on the repository
+(one query per source) and SQLBackend (one round trip per getter).
+
+Usage: python benchmarks/bench_sql.py [--sites 200 1700] [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_store import SOURCE_LG_APPROVALS, SOURCE_STAFFING, StoreBackend, write_dataset  # noqa: E402
+from sql_repository import SQLBackend, SQLRepository  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+def hospitals_per_site(backend, region):
+    """Regional hospital list with one approvals and one staffing query per hospital"""
+    rows = []
+    for hosp in backend.registry.in_region(region):
+        approvals = backend.store.read(SOURCE_LG_APPROVALS, columns=["status"],
+                                       month=backend._latest(SOURCE_LG_APPROVALS), site_id=hosp["id"])
+        staffing = backend.store.read(SOURCE_STAFFING, columns=["staff_actual"],
+                                      month=backend._latest(SOURCE_STAFFING), site_id=hosp["id"])
+        rows.append((len(approvals), int((approvals["status"] == "approved").sum()), staffing["staff_actual"].sum()))
+    return rows
+
+
+def measure(repository, func, args, repeat):
+    """Median ms and round trips per call"""
+    times = []
+    start_trips = repository.round_trips
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, (repository.round_trips - start_trips) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[200, 1700])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Standorte':>10} {'Abfrage':<38} {'Zeit':>9} {'Roundtrips':>11}")
+    for n_sites in args.sites:
+        with tempfile.TemporaryDirectory() as tmp:
+            repository = SQLRepository(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            write_dataset(repository, generate_dataset(n_sites=n_sites, n_months=6))
+            store_backend = StoreBackend(repository)
+            sql_backend = SQLBackend(repository)
+            region = sql_backend.registry.regions[0]
+            name = sql_backend.registry.in_region(region)[0]["name"]
+            sql_backend.get_volume_projection()  # engine used by both profiles, built once
+            store_backend.get_volume_projection()
+
+            runs = [
+                ("Krankenhausliste: je Standort", hospitals_per_site, (sql_backend, region)),
+                ("Krankenhausliste: je Quelle", StoreBackend.get_hospitals_for_region, (store_backend, region)),
+                ("Krankenhausliste: ein Roundtrip", SQLBackend.get_hospitals_for_region, (sql_backend, region)),
+                ("Standortprofil: je Quelle", StoreBackend.get_hospital_details, (store_backend, name)),
+                ("Standortprofil: ein Roundtrip", SQLBackend.get_hospital_details, (sql_backend, name)),
+            ]
+            for label, func, call_args in runs:
+                ms, trips = measure(repository, func, call_args, args.repeat)
+                print(f"{n_sites:>10} {label:<38} {ms:>7.1f}ms {trips:>11.0f}")
+            repository.pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Cold-start benchmark: import time of app.py and heavy modules loaded per view
+
+Each measurement runs in a fresh interpreter so nothing is cached:
+  1. `python -X importtime -c "import app"`: total and per-module cumulative import time
+  2. one AppTest run per sidebar page: wall time of the first run and
+     whether pandas / NumPy / Plotly / pyarrow were loaded to render it,
+     with the refresh scheduler on (default) and off (KH_SCHEDULER=off)
+
+Usage: python benchmarks/bench_startup.py [--record benchmarks/startup_history.jsonl]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["📊 Überblick", "🗺️ Regional", "🏥 Standorte", "📈 Qualität", "🗓️ Planung"]
+# label -> module that is only imported when the library is actually used
+# (streamlit itself imports a lightweight part of plotly for its chart theme)
+HEAVY_MODULES = {
+    "pandas": "pandas",
+    "numpy": "numpy",
+    "plotly": "plotly.graph_objs._figure",
+    "pyarrow": "pyarrow",
+}
+REPORTED_MODULES = ["streamlit", "pandas", "numpy", "pyarrow", "data_provider", "mock_data", "charts"]
+SCHEDULER_SETTINGS = {"an": "", "aus": "off"}  # label -> KH_SCHEDULER
+
+FIRST_RUN_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state["page"] = {page!r}
+start = time.perf_counter()
+at.run()
+seconds = time.perf_counter() - start
+loaded = [label for label, m in {heavy!r}.items() if m in sys.modules and m not in before]
+print(json.dumps({{"seconds": seconds, "loaded": loaded, "error": bool(at.exception)}}))
+"""
+
+
+def import_times():
+    """Cumulative import time (ms) of app and selected top-level modules"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        module = module.strip()
+        if module in REPORTED_MODULES + ["app"] and cumulative.strip().isdigit():
+            times[module] = int(cumulative) / 1000
+    return times
+
+
+def first_run(page, scheduler=""):
+    """Wall time and heavy modules of the first run of a page in a fresh interpreter"""
+    script = FIRST_RUN_SCRIPT.format(root=ROOT, app=os.path.join(ROOT, "app.py"), page=page, heavy=HEAVY_MODULES)
+    env = dict(os.environ, KH_SCHEDULER=scheduler)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--record", help="append the results as one JSON line to this file")
+    args = parser.parse_args()
+
+    times = import_times()
+    print("Import-Zeit (kumulativ):")
+    for module in ["app"] + REPORTED_MODULES:
+        if module in times:
+            print(f"  {module:<16} {times[module]:>8.1f} ms")
+
+    pages = {}
+    for label, setting in SCHEDULER_SETTINGS.items():
+        print(f"\nErster Lauf je Ansicht (frischer Prozess, Scheduler {label}):")
+        for page in PAGES:
+            run = first_run(page, setting)
+            pages.setdefault(page, {})[label] = run
+            status = "FEHLER" if run["error"] else ", ".join(run["loaded"]) or "-"
+            print(f"  {page:<14} {run['seconds'] * 1000:>8.0f} ms   geladen: {status}")
+
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "revision": _git_revision(),
+                "import_ms": times,
+                "first_run": pages,
+            }, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Per-view render benchmark: every sidebar page and selectbox value at several dataset sizes
+
+Drives app.py headlessly with Streamlit's AppTest. For each page and each
+(sampled) selectbox value it records
+  - cold_ms:  wall time of the rerun with empty data_provider caches
+  - warm_ms:  median wall time of repeated reruns with filled caches
+  - fetch_ms: time spent in data_provider getters during the cold rerun
+  - elements: number of rendered elements
+Dataset sizes are "mock" (the built-in mock data) or a number of synthetic
+sites, served from a temporary Parquet store via data_store.StoreBackend.
+
+Results are compared against benchmarks/views_baseline.json. The run fails
+(exit code 1) if a rerun exceeds the 3 s target of the concept doc, is
+slower than the baseline beyond the tolerance, or renders a different
+number of elements. Timings are machine-specific; refresh the baseline with
+--update-baseline after intended changes or on a new machine.
+
+Usage: python benchmarks/bench_views.py [--sizes mock 200 1700] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("KH_SCHEDULER", "off")  # cold timings without background pre-warming
+
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1.element_tree import Block  # noqa: E402
+
+import data_provider  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "views_baseline.json")
+
+PAGES = ["📊 Überblick", "🗺️ Regional", "🏥 Standorte", "📈 Qualität", "🗓️ Planung", "ℹ️ Info"]
+INFO_PAGE = "ℹ️ Info"
+
+# "< 3 Sekunden für alle Ansichten" (kh-reform-dashboard-konzept.md)
+TARGET_MS = 3000
+
+
+class FetchTimer:
+    """Accumulates the time spent in data_provider getters"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._call = data_provider.CachedGetter.__call__
+
+    def install(self):
+        timer = self
+        call = self._call
+
+        def timed_call(getter, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return call(getter, *args, **kwargs)
+            finally:
+                timer.seconds += time.perf_counter() - start
+
+        data_provider.CachedGetter.__call__ = timed_call
+
+    def reset(self):
+        self.seconds = 0.0
+
+
+def count_elements(node):
+    """Number of rendered elements (leaves) below a block"""
+    if not isinstance(node, Block):
+        return 1
+    return sum(count_elements(child) for child in node.children.values())
+
+
+def use_dataset_size(size, workdir):
+    """Switch data_provider to the mock data or a synthetic store with `size` sites"""
+    if size == "mock":
+        import mock_data
+
+        data_provider.use_backend(mock_data)
+        return
+
+    from data_store import DataStore, StoreBackend, write_dataset
+    from synthetic_data import generate_dataset
+
+    store = DataStore(os.path.join(workdir, f"sites-{size}"))
+    write_dataset(store, generate_dataset(n_sites=int(size)))
+    data_provider.use_backend(StoreBackend(store))
+
+
+def sample(options, max_options):
+    """Evenly spaced options including the first and the last"""
+    if len(options) <= max_options:
+        return list(options)
+    if max_options == 1:
+        return [options[0]]
+    step = (len(options) - 1) / (max_options - 1)
+    return [options[round(i * step)] for i in range(max_options)]
+
+
+class ViewBench:
+    def __init__(self, timer, repeat):
+        self.timer = timer
+        self.repeat = repeat
+        self.at = AppTest.from_file(APP_PATH, default_timeout=120)
+        self.at.run()
+        # after the first run, which loads the Streamlit config and its log level
+        set_log_level("error")
+
+    def _rerun(self, interact):
+        # mock_data draws from the random module; seed it so element counts are reproducible
+        random.seed(0)
+        interact()
+        self.at.run()
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def measure(self, interact):
+        """Cold and warm rerun after an interaction (e.g. selecting a value)"""
+        data_provider.invalidate()
+        self.timer.reset()
+        start = time.perf_counter()
+        self._rerun(interact)
+        cold = time.perf_counter() - start
+        fetch = self.timer.seconds
+
+        warm = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            self._rerun(interact)
+            warm.append(time.perf_counter() - start)
+
+        return {
+            "cold_ms": round(cold * 1000, 1),
+            "warm_ms": round(statistics.median(warm) * 1000, 1),
+            "fetch_ms": round(fetch * 1000, 1),
+            "elements": count_elements(self.at.main) + count_elements(self.at.sidebar),
+        }
+
+    def open_page(self, page):
+        if page == INFO_PAGE:
+            return lambda: self.at.sidebar.button[0].click()
+        return lambda: self.at.sidebar.radio[0].set_value(page)
+
+    def run_page(self, page, max_options):
+        """Results keyed by "<page>" and "<page> | <selectbox label> <value>\""""
+        open_page = self.open_page(page)
+        results = {page: self.measure(open_page)}
+
+        for label in [sb.label for sb in self.at.selectbox]:
+            options = self._selectbox(label).options
+            for option in sample(options, max_options):
+                def select(option=option):
+                    open_page()
+                    self._selectbox(label).set_value(option)
+
+                results[f"{page} | {label} {option}"] = self.measure(select)
+            # rerun with the first value so selectboxes depending on this one show their options for it
+            self._rerun(lambda: self._selectbox(label).set_value(options[0]))
+        return results
+
+    def _selectbox(self, label):
+        return next(sb for sb in self.at.selectbox if sb.label == label)
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """Return a list of regression messages"""
+    problems = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            where = f"[{size}] {name}"
+            if current["cold_ms"] > TARGET_MS:
+                problems.append(f"{where}: {current['cold_ms']:.0f} ms über dem Ziel von {TARGET_MS} ms")
+
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            for metric in ("cold_ms", "warm_ms"):
+                limit = previous[metric] * (1 + tolerance) + slack_ms
+                if current[metric] > limit:
+                    problems.append(f"{where}: {metric} {current[metric]:.0f} ms > {limit:.0f} ms "
+                                    f"(Baseline {previous[metric]:.0f} ms)")
+            if current["elements"] != previous["elements"]:
+                problems.append(f"{where}: {current['elements']} Elemente statt {previous['elements']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=["mock", "200", "1700"],
+                        help='"mock" or number of synthetic sites')
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--max-options", type=int, default=3, help="selectbox values per selectbox")
+    parser.add_argument("--repeat", type=int, default=3, help="warm reruns per scenario")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--slack-ms", type=float, default=50, help="allowed absolute slowdown")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    timer = FetchTimer()
+    timer.install()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            use_dataset_size(size, workdir)
+            bench = ViewBench(timer, args.repeat)
+            results[size] = {}
+            print(f"\nDatensatz: {size}")
+            print(f"  {'Szenario':<72} {'kalt':>8} {'warm':>8} {'Daten':>8} {'Elem.':>6}")
+            for page in args.pages:
+                for name, result in bench.run_page(page, args.max_options).items():
+                    results[size][name] = result
+                    print(f"  {name[:72]:<72} {result['cold_ms']:>6.0f}ms {result['warm_ms']:>6.0f}ms "
+                          f"{result['fetch_ms']:>6.0f}ms {result['elements']:>6}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nBaseline gespeichert: {args.baseline}")
+        return
+
+    problems = compare(results, baseline, args.tolerance, args.slack_ms)
+    if not baseline:
+        print(f"\nKeine Baseline gefunden ({args.baseline}); mit --update-baseline anlegen")
+    if problems:
+        print(f"\n{len(problems)} Regression(en):")
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        sys.exit(1)
+    print("\nKeine Regressionen")
+
+
+if __name__ == "__main__":
+    main()
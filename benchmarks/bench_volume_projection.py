@@ -0,0 +1,68 @@
+"""
+Volume projection benchmark: batched trend + seasonal fit of all site x LG series
+
+Compares the batched least-squares fit of VolumeProjection with fitting
+each series separately (np.linalg.lstsq per series) and checks that both
+give the same coefficients.
+
+Usage: python benchmarks/bench_volume_projection.py [--sites 12 1700 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from mock_data import MINDESTMENGEN, get_dataset  # noqa: E402
+from synthetic_data import BBOX_DE, generate_dataset  # noqa: E402
+from volume_projection import VolumeProjection, design_matrix, fit_batch  # noqa: E402
+
+
+def per_series(Y, X):
+    coef = np.full((len(Y), X.shape[1]), np.nan)
+    for i, y in enumerate(Y):
+        observed = ~np.isnan(y)
+        coef[i] = np.linalg.lstsq(X[observed], y[observed], rcond=None)[0]
+    return coef
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", nargs="+", type=int, default=[0, 1700, 20000], help="0 = mock hospitals")
+    args = parser.parse_args()
+
+    print(f"{'Standorte':>10} {'Reihen':>8} {'Projektion':>11} {'Fit (Batch)':>12} {'Fit (einzeln)':>14} {'unter MM':>9}")
+    for n_sites in args.sites:
+        if n_sites == 0:
+            dataset = get_dataset()
+        else:
+            dataset = generate_dataset(n_sites=n_sites, n_regions=5 if n_sites <= 2000 else 400, bbox=BBOX_DE)
+
+        start = time.perf_counter()
+        projection = VolumeProjection(dataset["indicators"], MINDESTMENGEN)
+        total = time.perf_counter() - start
+
+        indicators = dataset["indicators"]
+        Y = indicators.pivot_table(index=["site_id", "lg"], columns="month", values="cases", observed=True).to_numpy()
+        months = np.arange(Y.shape[1])
+        X = design_matrix(months, months[-1])
+        start = time.perf_counter()
+        batch = fit_batch(Y, X)
+        batched = time.perf_counter() - start
+        start = time.perf_counter()
+        single = per_series(Y, X)
+        separate = time.perf_counter() - start
+        assert np.allclose(batch, single)
+
+        under = int(projection.table["status"].isin(["warning", "critical"]).sum())
+        print(f"{len(dataset['sites']):>10} {len(Y):>8} {total * 1000:>9.0f}ms {batched * 1000:>10.1f}ms "
+              f"{separate * 1000:>12.0f}ms {under:>9}")
+
+
+if __name__ == "__main__":
+    main()
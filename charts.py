@@ -0,0 +1,109 @@
+"""
+Chart builders for the Hospital Reform Dashboard
+Builds Plotly figures from DataFrame columns and caches them by data content
+"""
+
+from collections import OrderedDict
+import threading
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from instrumentation import KIND_CHART, timed
+
+STATUS_COLORS = {"success": "green", "warning": "yellow", "critical": "red"}
+STATUS_ICONS = {"success": "🟢", "warning": "🟡", "critical": "🔴"}
+
+_FIGURE_CACHE_SIZE = 32
+_figure_cache = OrderedDict()
+_figure_lock = threading.Lock()
+
+
+def _fingerprint(name, df):
+    """Content hash of a DataFrame, used as figure cache key"""
+    return name, tuple(df.columns), int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+def cached_figure(builder):
+    """Cache a figure builder by the content of its DataFrame argument"""
+    def wrapper(df):
+        key = _fingerprint(builder.__name__, df)
+        with _figure_lock:
+            if key in _figure_cache:
+                _figure_cache.move_to_end(key)
+                return _figure_cache[key]
+
+        fig = builder(df)
+
+        with _figure_lock:
+            _figure_cache[key] = fig
+            while len(_figure_cache) > _FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
+        return fig
+
+    wrapper.__name__ = builder.__name__
+    wrapper.__doc__ = builder.__doc__
+    return wrapper
+
+
+@timed(KIND_CHART)
+@cached_figure
+def regional_map(regional_df):
+    """Build the regional overview map with one Scattergeo trace per status"""
+    text = (
+        regional_df["region"] + "<br>Status: " + regional_df["status"].map(STATUS_ICONS)
+        + "<br>Krankenhäuser: " + regional_df["hospitals"].astype(str)
+        + "<br>LG genehmigt: " + regional_df["lg_approved_pct"].astype(str) + "%"
+    )
+
+    fig = go.Figure()
+    for status, color in STATUS_COLORS.items():
+        mask = regional_df["status"] == status
+        if not mask.any():
+            continue
+        fig.add_trace(go.Scattergeo(
+            lon=regional_df.loc[mask, "lon"],
+            lat=regional_df.loc[mask, "lat"],
+            text=text[mask],
+            mode='markers+text',
+            marker=dict(size=20, color=color),
+            textposition="top center",
+            name=status
+        ))
+
+    fig.update_geos(
+        center=dict(lat=54.2, lon=10.0),
+        projection_scale=15,
+        showcountries=False,
+        showcoastlines=True,
+        showland=True,
+        landcolor="lightgray"
+    )
+
+    fig.update_layout(
+        height=400,
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        showlegend=False
+    )
+
+    return fig
+
+
+@timed(KIND_CHART)
+@cached_figure
+def patient_flow_sankey(flows_df):
+    """Build a Sankey diagram of patient flows from residence (left) to treating area (right)"""
+    flows_df = flows_df[flows_df["origin"] != flows_df["destination"]]
+    origins = list(dict.fromkeys(flows_df["origin"]))
+    destinations = list(dict.fromkeys(flows_df["destination"]))
+
+    fig = go.Figure(go.Sankey(
+        node=dict(label=origins + destinations, pad=12, thickness=12),
+        link=dict(
+            source=pd.Index(origins).get_indexer(flows_df["origin"]),
+            target=len(origins) + pd.Index(destinations).get_indexer(flows_df["destination"]),
+            value=flows_df["cases"],
+        ),
+    ))
+    fig.update_layout(height=320, margin={"r": 0, "t": 10, "l": 0, "b": 10})
+    return fig
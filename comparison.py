@@ -0,0 +1,120 @@
+"""
+Site comparison of a Leistungsgruppe
+Sorts, filters and pages the latest quality indicators of every site in the data layer
+
+A ComparisonTable holds one row per site offering the LG as NumPy columns:
+the indicator values, their ratings (<indicator>_status) and the worst
+rating as overall status. The sort order of every sort key is computed
+once per table (a stable lexsort with the hospital name as tie-breaker,
+missing values last); a page request is then one boolean filter and one
+slice, so only the rows of the visible page are materialized, however many
+sites there are.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from mock_data import rate_indicator
+
+INDICATORS = ["complication_rate", "mortality_rate", "satisfaction", "avg_stay"]
+
+STATUS_RANK = {"critical": 0, "warning": 1, "success": 2}  # worst first
+STATUSES = list(STATUS_RANK)
+
+SORT_KEYS = ["hospital", "region", "level", "status", *INDICATORS]
+FILTERS = ["region", "level", "status"]
+PAGE_SIZE = 25
+
+
+def _ranks(values):
+    """Dense ranks of values (NaN and None rank last)"""
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        _, ranks = np.unique(values, return_inverse=True)  # NaN sorts last
+        return ranks, np.isnan(values)
+    missing = pd.isna(values)
+    _, ranks = np.unique(np.where(missing, "", values).astype(str), return_inverse=True)
+    return ranks, missing
+
+
+class ComparisonTable:
+    """Latest indicator values and ratings of the sites offering one LG, paged on request"""
+
+    def __init__(self, frame):
+        """frame: one row per site with site_id, hospital, region, level and the INDICATORS"""
+        frame = frame.reset_index(drop=True)
+        columns = {name: frame[name].astype(object).to_numpy() for name in ["site_id", "hospital", "region", "level"]}
+        for indicator in INDICATORS:
+            columns[indicator] = frame[indicator].to_numpy(dtype=float)
+            columns[f"{indicator}_status"] = rate_indicator(indicator, columns[indicator])
+
+        rank = np.full(len(frame), STATUS_RANK["success"])
+        for indicator in INDICATORS:
+            ratings = columns[f"{indicator}_status"]
+            rank = np.minimum(rank, np.select([ratings == "critical", ratings == "warning"], [0, 1], 2))
+        columns["status"] = np.asarray(STATUSES, dtype=object)[rank]
+        self.columns = columns
+        self._status_rank = rank
+        self._name_ranks, _ = _ranks(columns["hospital"])
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.columns["site_id"])
+
+    def _sort_ranks(self, key):
+        if key == "status":
+            return self._status_rank, np.zeros(len(self), dtype=bool)
+        return _ranks(self.columns[key])
+
+    def order(self, sort="hospital", descending=False):
+        """Row positions in sort order (computed once per key and direction)"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unbekannter Sortierschlüssel: {sort}")
+        key = (sort, bool(descending))
+        order = self._orders.get(key)
+        if order is None:
+            ranks, missing = self._sort_ranks(sort)
+            order = np.lexsort((self._name_ranks, -ranks if descending else ranks, missing))
+            order.setflags(write=False)
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def page(self, sort="hospital", descending=False, region=None, level=None, status=None, page=1,
+             page_size=PAGE_SIZE):
+        """One page of the filtered, sorted sites
+
+        Returns rows (records of the page only), total (matching sites), page
+        (clamped to 1..pages), pages and page_size.
+        """
+        order = self.order(sort, descending)
+        mask = np.ones(len(self), dtype=bool)
+        for column, value in zip(FILTERS, [region, level, status]):
+            if value is not None:
+                mask &= self.columns[column] == value
+        positions = order[mask[order]] if not mask.all() else order
+
+        total = len(positions)
+        pages = max(-(-total // page_size), 1)
+        page = min(max(int(page), 1), pages)
+        rows = positions[(page - 1) * page_size:page * page_size]
+        records = pd.DataFrame({name: values[rows] for name, values in self.columns.items()}).to_dict("records")
+        return {"rows": records, "total": total, "page": page, "pages": pages, "page_size": page_size}
+
+
+def comparison_table(sites, routine):
+    """ComparisonTable from an LG's routine rows (site_id and the INDICATORS) and the site master data"""
+    sites = sites.set_index("id", drop=False)
+    site_ids = routine["site_id"].to_numpy()
+    frame = pd.DataFrame({
+        "site_id": site_ids,
+        "hospital": sites["name"].reindex(site_ids).to_numpy(),
+        "region": sites["region"].reindex(site_ids).to_numpy(),
+        "level": sites["level"].astype(str).reindex(site_ids).to_numpy(),
+    })
+    for indicator in INDICATORS:
+        frame[indicator] = routine[indicator].to_numpy()
+    return ComparisonTable(frame)
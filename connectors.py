@@ -0,0 +1,189 @@
+"""
+Source connectors for the Hospital Reform Dashboard
+Fetches the external data sources concurrently over pooled HTTP connections
+
+The sources the scheduler ingests (LG approvals, routine data and staffing
+of the concept doc, section 4.1 "Primärdatenquellen"; see ingest.SCHEMAS)
+are fetched at the same time with one httpx.AsyncClient, so a refresh takes
+as long as the slowest source instead of all of them combined. Master data,
+MDK audits and PREMs surveys have no ingestion yet and are not fetched. Every source has its own
+timeout and number of retries (transport errors, 429 and 5xx, exponential
+backoff). Requests are conditional: the ETag and Last-Modified validators of
+the last download are sent back, and a 304 keeps the file already in the
+inbox. Downloads are written to <inbox>/<source>_download.<ext> (moved into
+place when complete), where the scheduler's ingestion picks them up.
+
+Validators are kept in <inbox>/_http_cache.json. Serve fixtures locally with
+fixture_server.py:
+    python fixture_server.py --port 8765
+    python connectors.py http://localhost:8765 data/inbox
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from data_store import SOURCE_LG_APPROVALS, SOURCE_ROUTINE, SOURCE_STAFFING
+
+# Path below the base URL, timeout (s) and retries per source
+SOURCES = {
+    SOURCE_LG_APPROVALS: {"path": "ministerium/lg_approvals.csv", "timeout": 10.0, "retries": 3},
+    SOURCE_ROUTINE: {"path": "inek/routine.csv", "timeout": 30.0, "retries": 2},
+    SOURCE_STAFFING: {"path": "personal/staffing.csv", "timeout": 10.0, "retries": 3},
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_S = 0.5  # doubled per retry
+MAX_BACKOFF_S = 30.0
+MAX_CONNECTIONS = 10
+CHUNK_SIZE = 1024 * 1024
+
+STATE_NAME = "_http_cache.json"
+
+STATUS_UPDATED = "updated"
+STATUS_NOT_MODIFIED = "not_modified"
+STATUS_FAILED = "failed"
+
+
+def load_state(inbox):
+    path = os.path.join(inbox, STATE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(inbox, state):
+    path = os.path.join(inbox, STATE_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def target_path(inbox, source, config):
+    return os.path.join(inbox, f"{source}_download{os.path.splitext(config['path'])[1]}")
+
+
+def _conditional_headers(entry, path):
+    """If-None-Match/If-Modified-Since from the last download (none if its file is gone)"""
+    if not entry or not os.path.exists(path):
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _backoff(attempt, response=None):
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF_S)
+    return min(BACKOFF_S * 2 ** attempt, MAX_BACKOFF_S)
+
+
+async def fetch_source(client, base_url, source, config, entry, inbox):
+    """Fetch one source with retries; returns a result dict (never raises for HTTP or transport errors)"""
+    import httpx
+
+    url = f"{base_url.rstrip('/')}/{config['path']}"
+    path = target_path(inbox, source, config)
+    tmp_path = f"{path}.part"
+    headers = _conditional_headers(entry, path)
+    start = time.perf_counter()
+    result = {"source": source, "url": url, "path": path, "bytes": 0, "attempts": 0, "error": None}
+
+    for attempt in range(config["retries"] + 1):
+        result["attempts"] = attempt + 1
+        response = None
+        try:
+            async with client.stream("GET", url, headers=headers, timeout=config["timeout"]) as response:
+                if response.status_code == 304:
+                    return result | {"status": STATUS_NOT_MODIFIED, "seconds": time.perf_counter() - start}
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    with open(tmp_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            f.write(chunk)
+                            result["bytes"] += len(chunk)
+                    os.replace(tmp_path, path)
+                    return result | {
+                        "status": STATUS_UPDATED,
+                        "seconds": time.perf_counter() - start,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                result["error"] = f"HTTP {response.status_code}"
+        except httpx.HTTPStatusError as error:  # 4xx: retrying does not help
+            result["error"] = f"HTTP {error.response.status_code}"
+            break
+        except (httpx.TransportError, OSError) as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+            result["bytes"] = 0
+        if attempt < config["retries"]:
+            await asyncio.sleep(_backoff(attempt, response))
+
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return result | {"status": STATUS_FAILED, "seconds": time.perf_counter() - start}
+
+
+async def fetch_all(base_url, inbox, sources=None, concurrency=None):
+    """Fetch sources (default: all) concurrently over one connection pool; returns one result per source
+
+    concurrency limits the number of sources in flight (1 = one after another).
+    """
+    import httpx
+
+    sources = sources or list(SOURCES)
+    os.makedirs(inbox, exist_ok=True)
+    state = load_state(inbox)
+    limit = asyncio.Semaphore(concurrency or len(sources))
+
+    async def fetch(client, source):
+        async with limit:
+            return await fetch_source(client, base_url, source, SOURCES[source], state.get(source), inbox)
+
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+    async with httpx.AsyncClient(limits=limits, follow_redirects=True) as client:
+        results = await asyncio.gather(*(fetch(client, source) for source in sources))
+
+    for result in results:
+        if result["status"] == STATUS_UPDATED:
+            state[result["source"]] = {
+                "etag": result["etag"],
+                "last_modified": result["last_modified"],
+                "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            }
+    save_state(inbox, state)
+    return results
+
+
+def fetch(base_url, inbox, sources=None, concurrency=None):
+    """Blocking fetch_all (runs its own event loop)"""
+    return asyncio.run(fetch_all(base_url, inbox, sources, concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch the external data sources into the inbox")
+    parser.add_argument("base_url")
+    parser.add_argument("inbox")
+    parser.add_argument("--sources", nargs="+", choices=sorted(SOURCES))
+    args = parser.parse_args()
+
+    for result in fetch(args.base_url, args.inbox, args.sources):
+        detail = {
+            STATUS_UPDATED: f"{result['bytes']:,} Bytes",
+            STATUS_NOT_MODIFIED: "unverändert",
+            STATUS_FAILED: f"fehlgeschlagen ({result['error']})",
+        }[result["status"]]
+        print(f"{result['source']}: {detail}, {result['attempts']} Versuch(e), {result['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
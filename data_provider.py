@@ -0,0 +1,231 @@
+"""
+Data provider layer for the Hospital Reform Dashboard
+Serves the getters from one process-wide, read-only data snapshot
+
+Getters are served by the active backend (mock_data by default). Set
+KH_DATA_STORE to the root of a Parquet store (see data_store.py) or to a
+database URL (see sql_repository.py) to serve them from the store instead; getters a backend does not implement fall
+back to mock_data.
+
+All sessions share the current Snapshot (see snapshot.py): each getter
+value is computed once per argument set and generation, then frozen. A
+snapshot expires at the daily 17:00 KPI refresh; the next access starts
+refresh(), which builds the next generation in a background thread and
+swaps it in atomically while the old one keeps serving. A script run pins
+the snapshot it started with (pin()), so a session never mixes data of two
+generations.
+
+The freshness classes are deliberately collapsed into that daily swap: a
+new generation recomputes every value from its own backend instead of
+carrying over monthly or weekly values, which would mix data of two
+generations in one snapshot. The classes still set the ingestion cadences
+(scheduler.CADENCES) and group getters for invalidate(freshness).
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+
+import mock_data
+from mock_data import REGIONS, LEISTUNGSGRUPPEN, MINDESTMENGEN, HOSPITALS, REGISTRY, VERSORGUNGSSTUFEN
+from snapshot import Snapshot
+
+# Freshness classes from the concept doc (section 8.1 "Datenfrische")
+FRESHNESS_STRUCTURAL = "structural"  # LG-Status: täglich
+FRESHNESS_QUALITY = "quality"  # Qualitätsdaten: monatlich
+FRESHNESS_ROUTINE = "routine"  # Routinedaten: wöchentlich
+FRESHNESS_KPI = "kpi"  # Real-time KPIs: täglich 17:00 Uhr
+
+KPI_REFRESH_HOUR = 17
+
+
+def _now():
+    return datetime.now()
+
+
+def refresh_at(now):
+    """Return the next daily data refresh (KPI_REFRESH_HOUR) after now, when a snapshot expires"""
+    refresh = now.replace(hour=KPI_REFRESH_HOUR, minute=0, second=0, microsecond=0)
+    if refresh <= now:
+        refresh += timedelta(days=1)
+    return refresh
+
+
+class CachedGetter:
+    """Memoizes a getter by its arguments in the data snapshot of the calling script run"""
+
+    def __init__(self, func, freshness):
+        self.func = func
+        self.freshness = freshness
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, args, kwargs):
+        return self.__name__, args, tuple(sorted(kwargs.items()))
+
+    def __call__(self, *args, **kwargs):
+        snapshot = current_snapshot()
+        value, hit = snapshot.get(self._key(args, kwargs), lambda: self.func(snapshot.backend, *args, **kwargs))
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached argument sets"""
+        with self._lock:
+            return {
+                "getter": self.__name__,
+                "freshness": self.freshness,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": current_snapshot().count(self.__name__),
+            }
+
+
+_GETTERS = []
+_WARMERS = []
+_swap_lock = threading.Lock()
+_pinned = threading.local()  # snapshot of the current script run
+_refresh_thread = None
+
+
+def _swap(snapshot):
+    """Make snapshot the current one (a thread that has pinned a snapshot is moved to it)"""
+    global _snapshot
+    with _swap_lock:
+        _snapshot = snapshot
+    if getattr(_pinned, "snapshot", None) is not None:
+        _pinned.snapshot = snapshot
+
+
+_snapshot = Snapshot(mock_data, 1, refresh_at(_now()))
+
+
+def current_snapshot():
+    """Snapshot pinned by the calling script run, else the current one (refreshed once it expires)"""
+    pinned = getattr(_pinned, "snapshot", None)
+    if pinned is not None:
+        return pinned
+    snapshot = _snapshot
+    if snapshot.expired(_now()):
+        refresh()
+    return snapshot
+
+
+def pin(snapshot=None):
+    """Serve this thread's getters from snapshot (default: the current one) until the next pin; returns it"""
+    _pinned.snapshot = None
+    _pinned.snapshot = snapshot or current_snapshot()
+    return _pinned.snapshot
+
+
+def _next_backend(backend):
+    """Backend of the next generation, built up front (see StoreBackend.refreshed)"""
+    refreshed = getattr(backend, "refreshed", None)
+    return refreshed() if refreshed is not None else backend
+
+
+def on_refresh(func):
+    """Register func to run in refresh() against the new snapshot, before it is swapped in (pre-warming)"""
+    if func not in _WARMERS:
+        _WARMERS.append(func)
+    return func
+
+
+def refresh(wait=False):
+    """Build the next snapshot in a background thread and swap it in; no-op while one is being built"""
+    global _refresh_thread
+
+    def build():
+        old = _snapshot
+        started = _now()
+        snapshot = Snapshot(_next_backend(old.backend), old.generation + 1, refresh_at(started), created=started)
+        pin(snapshot)
+        try:
+            for warm in _WARMERS:
+                warm()
+        finally:
+            _swap(snapshot)
+
+    with _swap_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=build, name="snapshot-refresh", daemon=True)
+            _refresh_thread.start()
+        thread = _refresh_thread
+    if wait:
+        thread.join()
+
+
+def use_backend(backend):
+    """Serve getters from another backend (module or object with get_* attributes)"""
+    _swap(Snapshot(backend, _snapshot.generation + 1, refresh_at(_now())))
+
+
+def get_backend():
+    """The backend of the current snapshot (mock_data module or a backend object)"""
+    return current_snapshot().backend
+
+
+def get_registry():
+    """Hospital registry of the active backend"""
+    return getattr(get_backend(), "registry", None) or REGISTRY
+
+
+def _dispatch(name):
+    """Getter that resolves name on a snapshot's backend at call time"""
+    def getter(backend, *args, **kwargs):
+        func = getattr(backend, name, None) or getattr(mock_data, name)
+        return func(*args, **kwargs)
+
+    getter.__name__ = name
+    getter.__doc__ = getattr(mock_data, name).__doc__
+    return getter
+
+
+def cached(freshness):
+    """Wrap a getter in a CachedGetter and register it for invalidation"""
+    def decorator(func):
+        getter = CachedGetter(func, freshness)
+        _GETTERS.append(getter)
+        return getter
+    return decorator
+
+
+get_state_kpis = cached(FRESHNESS_KPI)(_dispatch("get_state_kpis"))
+get_critical_alerts = cached(FRESHNESS_KPI)(_dispatch("get_critical_alerts"))
+get_regional_status = cached(FRESHNESS_STRUCTURAL)(_dispatch("get_regional_status"))
+get_hospitals_for_region = cached(FRESHNESS_STRUCTURAL)(_dispatch("get_hospitals_for_region"))
+get_hospital_details = cached(FRESHNESS_STRUCTURAL)(_dispatch("get_hospital_details"))
+get_timeline_events = cached(FRESHNESS_STRUCTURAL)(_dispatch("get_timeline_events"))
+get_quality_data_for_lg = cached(FRESHNESS_QUALITY)(_dispatch("get_quality_data_for_lg"))
+get_quality_trends = cached(FRESHNESS_QUALITY)(_dispatch("get_quality_trends"))
+get_hospital_comparison = cached(FRESHNESS_QUALITY)(_dispatch("get_hospital_comparison"))
+get_hospital_comparison_page = cached(FRESHNESS_QUALITY)(_dispatch("get_hospital_comparison_page"))
+get_volume_projection_for_hospital = cached(FRESHNESS_ROUTINE)(_dispatch("get_volume_projection_for_hospital"))
+get_volume_projection_for_lg = cached(FRESHNESS_ROUTINE)(_dispatch("get_volume_projection_for_lg"))
+get_regional_coverage_analysis = cached(FRESHNESS_ROUTINE)(_dispatch("get_regional_coverage_analysis"))
+get_regional_patient_flows = cached(FRESHNESS_ROUTINE)(_dispatch("get_regional_patient_flows"))
+
+
+def invalidate(freshness=None):
+    """Swap in a snapshot of the same backend without the values of all getters (or of one freshness class)"""
+    dropped = {getter.__name__ for getter in _GETTERS if freshness is None or getter.freshness == freshness}
+    old = _snapshot
+    _swap(Snapshot(old.backend, old.generation + 1, old.expires, old.values(lambda key: key[0] not in dropped)))
+
+
+def cache_stats():
+    """Return hit/miss counters for all cached getters"""
+    return [getter.stats() for getter in _GETTERS]
+
+
+if os.environ.get("KH_DATA_STORE"):
+    from data_store import open_backend
+
+    use_backend(open_backend(os.environ["KH_DATA_STORE"]))
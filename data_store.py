@@ -0,0 +1,592 @@
+"""
+Columnar data store for the Hospital Reform Dashboard
+One Parquet dataset per source, hive-partitioned by month and region
+
+Layout: <root>/<source>/month=YYYY-MM/region=<Region>/part-0.parquet
+
+Reads go through pyarrow.dataset on a memory-mapped filesystem with column
+projection and filters on the partition keys, so a regional view only
+touches the files and columns of that region.
+
+Build a local store from synthetic data:
+    python data_store.py build data/store --sites 1700 --months 36
+
+open_store()/open_backend() also accept a database URL (see sql_repository.py).
+"""
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from instrumentation import KIND_GETTER, timed
+from kpi_rollup import KPIRollup, facts_from_dataset
+from mock_data import (
+    LEISTUNGSGRUPPEN, MINDESTMENGEN, QUALITY_TARGETS, emergency_kpi, get_federal_indicators, hospital_status,
+    lg_volumes, rate_indicator, regional_coverage, regional_status, rejection_reason, site_volumes,
+)
+from registry import HospitalRegistry
+
+# Sources from the concept doc (section 3, "Datenquellen")
+SOURCE_HOSPITALS = "hospitals"  # Krankenhausstammdaten (LVK)
+SOURCE_LG_APPROVALS = "lg_approvals"  # LG-Anträge & Genehmigungen (Ministerium)
+SOURCE_ROUTINE = "routine"  # Routinedaten §21 KHEntgG
+SOURCE_STAFFING = "staffing"  # Personalausstattung (Krankenhausmeldung)
+
+SOURCES = [SOURCE_HOSPITALS, SOURCE_LG_APPROVALS, SOURCE_ROUTINE, SOURCE_STAFFING]
+ALERT_SOURCES = [SOURCE_LG_APPROVALS, SOURCE_ROUTINE, SOURCE_STAFFING]  # inputs of the alert facts
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("month", pa.string()), ("region", pa.string())]),
+    flavor="hive",
+)
+
+INDICATORS = ["complication_rate", "mortality_rate", "satisfaction", "avg_stay"]
+
+
+def month_key(month):
+    """Partition key for a month ("YYYY-MM")"""
+    return pd.Timestamp(month).strftime("%Y-%m")
+
+
+class DataStore:
+    """Local Parquet store with one month/region-partitioned dataset per source"""
+
+    def __init__(self, root):
+        self.root = root
+        self._fs = pafs.LocalFileSystem(use_mmap=True)
+
+    def path(self, source):
+        return os.path.join(self.root, source)
+
+    def months(self, source):
+        """Month partitions present for a source, oldest first"""
+        if not os.path.isdir(self.path(source)):
+            return []
+        return sorted(
+            name.split("=", 1)[1] for name in os.listdir(self.path(source)) if name.startswith("month=")
+        )
+
+    def latest_month(self, source):
+        months = self.months(source)
+        return months[-1] if months else None
+
+    def versions(self):
+        """Fingerprint of the stored files per source (changes whenever a partition is written or replaced)"""
+        versions = {}
+        for source in SOURCES:
+            digest = hashlib.blake2b(digest_size=8)
+            for dirpath, dirnames, names in os.walk(self.path(source)):
+                dirnames.sort()
+                for name in sorted(names):
+                    stat = os.stat(os.path.join(dirpath, name))
+                    digest.update(f"{dirpath}/{name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+            versions[source] = digest.hexdigest()
+        return versions
+
+    def write(self, source, df, month=None):
+        """Write a DataFrame to a source, replacing the month/region partitions it covers
+
+        The frame needs a "region" column and either a "month" column or the
+        month argument.
+        """
+        df = df.copy()
+        if month is not None:
+            df["month"] = month_key(month)
+        elif not pd.api.types.is_string_dtype(df["month"]):
+            df["month"] = pd.to_datetime(df["month"]).dt.strftime("%Y-%m")
+
+        # Categoricals become plain strings so partition values and schemas stay stable
+        for col in df.columns[df.dtypes == "category"]:
+            df[col] = df[col].astype(str)
+
+        ds.write_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            self.path(source),
+            format="parquet",
+            partitioning=PARTITIONING,
+            existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet",
+            filesystem=self._fs,
+        )
+
+    def dataset(self, source):
+        return ds.dataset(self.path(source), format="parquet", partitioning=PARTITIONING, filesystem=self._fs)
+
+    def read(self, source, columns=None, **equals):
+        """Read a source with column projection and equality/membership filters
+
+        Keyword arguments filter on columns, e.g. read(SOURCE_ROUTINE,
+        columns=["site_id", "cases"], month="2025-11", region="Kiel").
+        Lists and tuples filter by membership.
+        """
+        expr = None
+        for column, value in equals.items():
+            if isinstance(value, (list, tuple, set)):
+                cond = ds.field(column).isin(list(value))
+            else:
+                cond = ds.field(column) == value
+            expr = cond if expr is None else expr & cond
+
+        table = self.dataset(source).to_table(columns=columns, filter=expr)
+        df = table.to_pandas()
+        if "month" in df.columns:
+            df["month"] = pd.to_datetime(df["month"], format="%Y-%m")
+        return df
+
+
+def open_store(root):
+    """DataStore at a directory, or a SQLRepository for a database URL (sqlite:///..., postgresql://...)"""
+    if "://" in root:
+        from sql_repository import SQLRepository
+
+        return SQLRepository(root)
+    return DataStore(root)
+
+
+def open_backend(root, months=None):
+    """Getter backend on open_store(root) (month partitions pinned to months, if given)"""
+    store = open_store(root)
+    if "://" in root:
+        from sql_repository import SQLBackend
+
+        return SQLBackend(store, months=months)
+    return StoreBackend(store, months=months)
+
+
+def write_dataset(store, dataset, snapshot_month=None):
+    """Write a synthetic dataset (see synthetic_data.generate_dataset) into the store"""
+    months = dataset["indicators"]["month"]
+    snapshot_month = snapshot_month or months.max()
+
+    store.write(SOURCE_HOSPITALS, dataset["sites"], month=snapshot_month)
+    store.write(SOURCE_LG_APPROVALS, dataset["approvals"], month=snapshot_month)
+    store.write(SOURCE_ROUTINE, dataset["indicators"])
+    store.write(SOURCE_STAFFING, dataset["staffing"])
+
+
+def _weighted_mean(df, columns, weight="cases"):
+    weights = df[weight].to_numpy(dtype=float)
+    total = weights.sum()
+    if total == 0:
+        return {col: float(df[col].mean()) for col in columns}
+    return {col: float(np.dot(df[col].to_numpy(dtype=float), weights) / total) for col in columns}
+
+
+class StoreBackend:
+    """Implements the mock_data getter interface on top of a DataStore
+
+    The month partitions of every source are pinned at construction, so
+    one backend keeps serving the same data while new months are written;
+    refreshed() returns the backend of the next data generation. An engine
+    is carried over only if the months and the file versions of its inputs
+    are unchanged: LG approvals replace the partition of the current month.
+    """
+
+    def __init__(self, store, previous=None, months=None):
+        self.store = store
+        self.versions = store.versions()  # before the months: a write in between is picked up by the next refresh
+        self.months = months or {source: tuple(store.months(source)) for source in SOURCES}
+        self._rollup = None
+        self._series = None
+        self._reachability = None
+        self._flows = None
+        self._alerts = None
+        self._alert_inputs = None
+        self._volumes = None
+        self._comparisons = {}
+
+        if previous is not None and self._unchanged(previous, SOURCE_HOSPITALS):
+            self.sites, self.registry = previous.sites, previous.registry
+            self._carry_over(previous)
+            return
+
+        sites = store.read(SOURCE_HOSPITALS, month=self._latest(SOURCE_HOSPITALS))
+        self.sites = sites.set_index("id", drop=False)
+
+        hospitals = {}
+        for region, group in sites.groupby("region", sort=False):
+            hospitals[region] = group.drop(columns="month").to_dict("records")
+        self.registry = HospitalRegistry(hospitals)
+
+    def _inputs(self, *sources):
+        """Months and file version of sources, compared to decide what a new generation recomputes"""
+        return {source: (self.months[source], self.versions[source]) for source in sources}
+
+    def _unchanged(self, previous, *sources):
+        return self._inputs(*sources) == previous._inputs(*sources)
+
+    def _carry_over(self, previous):
+        """Reuse the engines of previous (same sites) whose inputs did not change"""
+        if self._unchanged(previous, *SOURCES):
+            self._rollup = previous._rollup
+        if self._unchanged(previous, SOURCE_ROUTINE):
+            self._series = previous._series
+            self._comparisons = previous._comparisons
+            self._flows = previous._flows
+            self._volumes = previous._volumes
+        if self._unchanged(previous, SOURCE_LG_APPROVALS):
+            self._reachability = previous._reachability
+        if previous._alerts is not None:
+            self._alert_inputs = previous._alert_inputs
+            if self._unchanged(previous, *ALERT_SOURCES):
+                self._alerts = previous._alerts
+            else:
+                self._alerts = previous._alerts.copy()  # updated incrementally with the new facts
+
+    def refreshed(self):
+        """Backend over the month partitions stored now, reusing the engines whose inputs did not change"""
+        return type(self)(self.store, previous=self).build()
+
+    def build(self):
+        """Build all engines up front (e.g. before the backend starts serving)"""
+        self.get_kpi_rollup()
+        self.get_reachability()
+        self.get_volume_projection()
+        self.get_alert_engine()
+        return self
+
+    def _latest(self, source):
+        months = self.months[source]
+        return months[-1] if months else None
+
+    def _approval_counts(self, **equals):
+        approvals = self.store.read(
+            SOURCE_LG_APPROVALS, columns=["site_id", "status"], month=self._latest(SOURCE_LG_APPROVALS), **equals
+        )
+        return approvals.assign(approved=approvals["status"] == "approved").groupby("site_id").agg(
+            lg_total=("status", "size"), lg_approved=("approved", "sum")
+        )
+
+    def _staffing_by_site(self, **equals):
+        staffing = self.store.read(
+            SOURCE_STAFFING, columns=["site_id", "staff_required", "staff_actual"],
+            month=self._latest(SOURCE_STAFFING), **equals
+        )
+        return staffing.assign(ok=staffing["staff_actual"] >= staffing["staff_required"]).groupby("site_id").agg(
+            staff=("staff_actual", "sum"), quality_ok=("ok", "all"), lg_ok=("ok", "sum"), lg_count=("ok", "size")
+        )
+
+    def _staffing_months(self, routine_months):
+        """Latest stored staffing month up to each routine month (staffing is delivered monthly)"""
+        staffing_months = self.months[SOURCE_STAFFING]
+        return sorted({
+            earlier[-1] for earlier in ([month for month in staffing_months if month <= routine_month]
+                                        for routine_month in routine_months) if earlier
+        })
+
+    @timed(KIND_GETTER)
+    def get_kpi_rollup(self):
+        """KPI rollup over the latest and previous month of the stored sources"""
+        if self._rollup is None:
+            months = self.months[SOURCE_ROUTINE][-2:]
+            approvals = self.store.read(
+                SOURCE_LG_APPROVALS, columns=["site_id", "status", "decided"], month=self._latest(SOURCE_LG_APPROVALS)
+            )
+            staffing = self.store.read(
+                SOURCE_STAFFING, columns=["site_id", "month", "staff_required", "staff_actual"],
+                month=self._staffing_months(months),
+            )
+            routine = self.store.read(SOURCE_ROUTINE, columns=["site_id", "month", "cases", "avg_stay"], month=months)
+
+            # The approvals partition is the current state (delivered daily): the latest facts count
+            # every decision in it, not only those up to the start of the latest routine month
+            decided_by = {}
+            if months and self._latest(SOURCE_LG_APPROVALS):
+                delivered = pd.Period(self._latest(SOURCE_LG_APPROVALS), freq="M").end_time
+                decided_by[months[-1]] = max(pd.Timestamp(months[-1]), delivered)
+            facts = [facts_from_dataset(self.sites, approvals, staffing, routine, month, decided_by.get(month))
+                     for month in months]
+            self._rollup = KPIRollup(facts[-1], facts[0] if len(facts) > 1 else None)
+        return self._rollup
+
+    @timed(KIND_GETTER)
+    def get_reachability(self):
+        """Reachability engine over the stored sites and their approved LGs"""
+        if self._reachability is None:
+            from reachability import reachability_from_sites
+
+            approvals = self.store.read(
+                SOURCE_LG_APPROVALS, columns=["site_id", "lg", "status"], month=self._latest(SOURCE_LG_APPROVALS)
+            )
+            self._reachability = reachability_from_sites(self.sites, approvals, LEISTUNGSGRUPPEN)
+        return self._reachability
+
+    @timed(KIND_GETTER)
+    def get_patient_flows(self):
+        """Patient flow engine over synthetic cases drawn from the stored routine data"""
+        if self._flows is None:
+            from patient_flows import flows_from_routine
+
+            def load_routine(month):
+                return self.store.read(SOURCE_ROUTINE, columns=["site_id", "lg", "cases"], month=month)
+
+            self._flows = flows_from_routine(self.sites, load_routine, LEISTUNGSGRUPPEN)
+        return self._flows
+
+    def _latest_flows(self):
+        return self.get_patient_flows().month(self._latest(SOURCE_ROUTINE))
+
+    @timed(KIND_GETTER)
+    def get_regional_coverage_analysis(self, region):
+        return regional_coverage(self.get_reachability(), self._latest_flows(), region)
+
+    @timed(KIND_GETTER)
+    def get_regional_patient_flows(self, region):
+        return self._latest_flows().flows(region)
+
+    @timed(KIND_GETTER)
+    def get_volume_projection(self):
+        """Annual case projection of every site x LG (refitted when the routine data change)"""
+        from volume_projection import FIT_MONTHS, VolumeProjection
+
+        as_of = self._latest(SOURCE_ROUTINE)
+        if self._volumes is None:
+            routine = self.store.read(
+                SOURCE_ROUTINE, columns=["site_id", "lg", "month", "cases"],
+                month=self.months[SOURCE_ROUTINE][-FIT_MONTHS:],
+            )
+            self._volumes = VolumeProjection(routine, MINDESTMENGEN, as_of=as_of)
+        return self._volumes
+
+    @timed(KIND_GETTER)
+    def get_volume_projection_for_hospital(self, hospital_name):
+        hospital_base = self.registry.by_name(hospital_name)
+        if not hospital_base:
+            return None
+        return site_volumes(self.get_volume_projection(), hospital_base["id"])
+
+    @timed(KIND_GETTER)
+    def get_volume_projection_for_lg(self, leistungsgruppe):
+        return lg_volumes(self.get_volume_projection(), self.sites, leistungsgruppe)
+
+    def _alert_facts(self, as_of):
+        from alerts import INDICATOR_LABELS, alert_facts
+        from volume_projection import FIT_MONTHS
+
+        months = [month for month in self.months[SOURCE_ROUTINE] if month <= as_of][-FIT_MONTHS:]
+        approvals = self.store.read(
+            SOURCE_LG_APPROVALS, columns=["site_id", "lg", "status"], month=self._latest(SOURCE_LG_APPROVALS)
+        )
+        staffing = self.store.read(
+            SOURCE_STAFFING, columns=["site_id", "lg", "month", "staff_required", "staff_actual"],
+            month=self._staffing_months([as_of]),
+        )
+        routine = self.store.read(
+            SOURCE_ROUTINE, columns=["site_id", "lg", "month", "cases"] + list(INDICATOR_LABELS), month=months
+        )
+        return alert_facts(self.sites, approvals, staffing, routine, as_of)
+
+    @timed(KIND_GETTER)
+    def get_alert_engine(self):
+        """Alert rule engine; new approval, routine or staffing data only re-evaluate the facts they changed"""
+        from alerts import AlertEngine
+
+        as_of = self._latest(SOURCE_ROUTINE)
+        inputs = self._inputs(*ALERT_SOURCES)
+        if self._alerts is None:
+            self._alerts = AlertEngine(self._alert_facts(as_of), as_of)
+        elif self._alert_inputs != inputs:
+            self._alerts.update(self._alert_facts(as_of), as_of=as_of, complete=True)
+        self._alert_inputs = inputs
+        return self._alerts
+
+    @timed(KIND_GETTER)
+    def get_critical_alerts(self):
+        return self.get_alert_engine().alerts()
+
+    @timed(KIND_GETTER)
+    def get_state_kpis(self):
+        kpis = self.get_kpi_rollup().state_kpis()
+        kpis["emergency_accessible"] = emergency_kpi(self.get_reachability())
+        return kpis
+
+    @timed(KIND_GETTER)
+    def get_regional_status(self):
+        regional = self.get_kpi_rollup().regional_kpis()
+        by_region = self.sites.groupby("region", sort=False)
+        regional = regional.join(by_region.size().rename("hospitals")).join(by_region[["lat", "lon"]].mean())
+        regional = regional.rename_axis("region").reset_index()
+
+        regional["status"] = regional_status(regional["lg_approved_pct"], regional["quality_fulfilled_pct"])
+        regional["population"] = pd.NA  # not part of the stored sources
+        return regional[["region", "status", "hospitals", "lg_approved_pct", "quality_fulfilled_pct",
+                         "population", "lat", "lon"]]
+
+    @timed(KIND_GETTER)
+    def get_hospitals_for_region(self, region):
+        sites = self.registry.in_region(region)
+        approvals = self._approval_counts(region=region)
+        staffing = self._staffing_by_site(region=region)
+
+        detailed_hospitals = []
+        for hosp in sites:
+            lg_total = int(approvals["lg_total"].get(hosp["id"], 0))
+            lg_approved = int(approvals["lg_approved"].get(hosp["id"], 0))
+            quality_ok = bool(staffing["quality_ok"].get(hosp["id"], True))
+            status, warnings = hospital_status(lg_total, lg_approved, quality_ok)
+
+            detailed_hospitals.append({
+                "id": hosp["id"],
+                "name": hosp["name"],
+                "level": hosp["level"],
+                "beds": hosp["beds"],
+                "lg_total": lg_total,
+                "lg_approved": lg_approved,
+                "lg_percentage": int((lg_approved / lg_total) * 100) if lg_total else 0,
+                "quality_fulfilled": quality_ok,
+                "status": status,
+                "warnings": warnings,
+                "staff": int(staffing["staff"].get(hosp["id"], 0)),
+            })
+
+        return detailed_hospitals
+
+    @timed(KIND_GETTER)
+    def get_hospital_details(self, hospital_name):
+        hospital_base = self.registry.by_name(hospital_name)
+        if not hospital_base:
+            return None
+
+        site_filter = {"site_id": hospital_base["id"], "region": hospital_base["region"]}
+        approvals = self.store.read(
+            SOURCE_LG_APPROVALS, columns=["lg", "status"], month=self._latest(SOURCE_LG_APPROVALS), **site_filter
+        )
+        staffing = self._staffing_by_site(**site_filter)
+
+        recent_months = self.months[SOURCE_ROUTINE][-6:]
+        routine = self.store.read(
+            SOURCE_ROUTINE, columns=["cases"] + INDICATORS, month=recent_months, **site_filter
+        )
+        indicators = _weighted_mean(routine, INDICATORS)
+
+        by_status = approvals.groupby("status")["lg"].apply(list)
+        return {
+            "id": hospital_base["id"],
+            "name": hospital_name,
+            "region": hospital_base["region"],
+            "level": hospital_base["level"],
+            "beds": hospital_base["beds"],
+            "staff": int(staffing["staff"].sum()),
+            "lg_approved": by_status.get("approved", []),
+            "lg_in_progress": [
+                {"name": lg, "status": "Audit geplant", "date": "offen"} for lg in by_status.get("in_progress", [])
+            ],
+            "lg_rejected": [
+                {"name": lg, "reason": rejection_reason(self.get_volume_projection(), hospital_base["id"], lg)}
+                for lg in by_status.get("rejected", [])
+            ],
+            "quality": {
+                "staff_ok": bool(staffing["quality_ok"].all()),
+                "equipment_ok": True,
+                "related_lg_ok": True,
+            },
+            "quality_indicators": {
+                "complication_rate": round(indicators["complication_rate"], 1),
+                "mortality_rate": round(indicators["mortality_rate"], 1),
+                "satisfaction": round(indicators["satisfaction"], 1),
+            }
+        }
+
+    @timed(KIND_GETTER)
+    def get_quality_series(self):
+        """Quality time series over all stored months (federal baseline from mock data)"""
+        if self._series is None:
+            from timeseries import QualityTimeSeries
+
+            routine = self.store.read(
+                SOURCE_ROUTINE, columns=["site_id", "lg", "month", "cases"] + INDICATORS,
+                month=self.months[SOURCE_ROUTINE],
+            )
+            self._series = QualityTimeSeries(routine, get_federal_indicators())
+        return self._series
+
+    @timed(KIND_GETTER)
+    def get_quality_trends(self, leistungsgruppe, months=12, window=None):
+        return self.get_quality_series().trend_frame(leistungsgruppe, months=months, window=window)
+
+    @timed(KIND_GETTER)
+    def get_quality_data_for_lg(self, leistungsgruppe):
+        routine = self.store.read(
+            SOURCE_ROUTINE, columns=["cases"] + INDICATORS, month=self._latest(SOURCE_ROUTINE), lg=leistungsgruppe
+        )
+        current = _weighted_mean(routine, INDICATORS)
+
+        return {
+            "complication_rate": {
+                "current": round(current["complication_rate"], 1),
+                "target": QUALITY_TARGETS["complication_rate"],
+                "status": str(rate_indicator("complication_rate", current["complication_rate"])),
+            },
+            "mortality_rate": {
+                "current": round(current["mortality_rate"], 1),
+                "target": QUALITY_TARGETS["mortality_rate"],
+                "status": str(rate_indicator("mortality_rate", current["mortality_rate"])),
+            },
+            "avg_stay": {
+                "current": round(current["avg_stay"], 1),
+                "target": QUALITY_TARGETS["avg_stay"],
+                "range": QUALITY_TARGETS["avg_stay_range"],
+                "status": str(rate_indicator("avg_stay", current["avg_stay"])),
+            }
+        }
+
+    @timed(KIND_GETTER)
+    def get_hospital_comparison(self, leistungsgruppe, limit=None):
+        routine = self.store.read(
+            SOURCE_ROUTINE, columns=["site_id"] + INDICATORS, month=self._latest(SOURCE_ROUTINE), lg=leistungsgruppe
+        )
+        routine = routine.iloc[:limit]
+
+        return pd.DataFrame({
+            "hospital": self.sites["name"].reindex(routine["site_id"]).to_numpy(),
+            "complication": rate_indicator("complication_rate", routine["complication_rate"]),
+            "mortality": rate_indicator("mortality_rate", routine["mortality_rate"]),
+            "satisfaction": rate_indicator("satisfaction", routine["satisfaction"]),
+            "stay_duration": rate_indicator("avg_stay", routine["avg_stay"]),
+        }).to_dict("records")
+
+    @timed(KIND_GETTER)
+    def get_comparison_table(self, leistungsgruppe):
+        """Site comparison table of an LG from the latest stored routine month"""
+        from comparison import comparison_table
+
+        if leistungsgruppe not in self._comparisons:
+            routine = self.store.read(
+                SOURCE_ROUTINE, columns=["site_id"] + INDICATORS, month=self._latest(SOURCE_ROUTINE), lg=leistungsgruppe
+            )
+            self._comparisons[leistungsgruppe] = comparison_table(self.sites, routine)
+        return self._comparisons[leistungsgruppe]
+
+    @timed(KIND_GETTER)
+    def get_hospital_comparison_page(self, leistungsgruppe, sort="hospital", descending=False, region=None,
+                                     level=None, status=None, page=1, page_size=25):
+        return self.get_comparison_table(leistungsgruppe).page(
+            sort, descending, region, level, status, page, page_size
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a local data store (directory or database URL) from synthetic data")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("root")
+    build.add_argument("--sites", type=int, default=1700)
+    build.add_argument("--months", type=int, default=36)
+    build.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from synthetic_data import generate_dataset
+
+    dataset = generate_dataset(n_sites=args.sites, n_months=args.months, seed=args.seed)
+    write_dataset(open_store(args.root), dataset)
+    print(f"Wrote {args.sites} sites x {args.months} months to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
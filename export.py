@@ -0,0 +1,408 @@
+"""
+Bulk export of tables and reports for the Hospital Reform Dashboard
+Streams CSV, Parquet, XLSX and HTML instead of building them in memory
+
+Tables are produced as iterators of row batches and written batch by batch;
+iter_export() yields the encoded bytes while they are written, so a consumer
+(stdout, a file, an HTTP response) receives the first chunks before the
+export is complete. Per-site data (profiles, report sections) is computed on
+a process pool for state-wide exports.
+
+Usage:
+    python export.py profiles --format csv > standorte.csv
+    python export.py report --format html --out bericht.html --processes 8
+"""
+
+import argparse
+import csv
+import html
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import data_provider
+from data_provider import LEISTUNGSGRUPPEN, get_hospital_comparison, get_hospital_details, get_registry
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "html": ("html", "text/html"),
+}
+
+BATCH_SIZE = 200
+CHUNK_SIZE = 64 * 1024
+# Below this many sites the pool start-up costs more than it saves
+POOL_MIN_SITES = 50
+# How often a writer blocked on a full chunk queue checks for a cancelled export
+CANCEL_POLL_S = 0.5
+
+STATUS_TEXT = {"success": "Im Zielbereich", "warning": "Abweichung", "critical": "Kritisch"}
+
+
+# --- Per-site work (runs in pool workers) -------------------------------------
+
+_worker_backend = None
+
+
+def _init_worker(store_root, months):
+    """Open the parent's data source (same month partitions) in a pool worker"""
+    global _worker_backend
+    if store_root:
+        from data_store import open_backend
+
+        _worker_backend = open_backend(store_root, months=months)
+    else:
+        import mock_data
+
+        _worker_backend = mock_data
+
+
+def _site_details(name):
+    # in the parent process, go through the cached getter
+    if _worker_backend is None:
+        return get_hospital_details(name)
+    return _worker_backend.get_hospital_details(name)
+
+
+def _site_section(name):
+    return render_site_section(_site_details(name))
+
+
+def map_sites(func, names, processes=None, chunksize=8):
+    """Apply a per-site worker function to hospital names, yielding results in order
+
+    Runs on a process pool (spawned workers reading the month partitions of
+    the calling thread's data snapshot) when there are at least
+    POOL_MIN_SITES names and more than one process.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(names) < POOL_MIN_SITES:
+        for name in names:
+            yield func(name)
+        return
+
+    backend = data_provider.get_backend()
+    pool = ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(getattr(getattr(backend, "store", None), "root", None), getattr(backend, "months", None)),
+    )
+    try:
+        yield from pool.map(func, names, chunksize=chunksize)
+    finally:
+        pool.shutdown(cancel_futures=True)  # a cancelled export does not wait for the remaining sites
+
+
+# --- Tables ---------------------------------------------------------------------
+
+def profile_row(details):
+    """Flatten get_hospital_details() into one table row"""
+    indicators = details["quality_indicators"]
+    return {
+        "id": details["id"],
+        "name": details["name"],
+        "region": details["region"],
+        "level": details["level"],
+        "beds": details["beds"],
+        "staff": details["staff"],
+        "lg_approved": len(details["lg_approved"]),
+        "lg_in_progress": len(details["lg_in_progress"]),
+        "lg_rejected": len(details["lg_rejected"]),
+        "lg_approved_names": "; ".join(details["lg_approved"]),
+        "staff_ok": details["quality"]["staff_ok"],
+        "complication_rate": indicators["complication_rate"],
+        "mortality_rate": indicators["mortality_rate"],
+        "satisfaction": indicators["satisfaction"],
+    }
+
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def profile_batches(names=None, processes=None, batch_size=BATCH_SIZE):
+    """Profiles of all (or the given) sites as batches of rows"""
+    names = list(names) if names is not None else get_registry().names
+    rows = (profile_row(details) for details in map_sites(_site_details, names, processes) if details)
+    return _batched(rows, batch_size)
+
+
+def comparison_batches(leistungsgruppen=None, processes=None):
+    """Hospital x LG comparison matrix as one batch of rows per LG (one getter call each, no pool)"""
+    for lg in leistungsgruppen or LEISTUNGSGRUPPEN:
+        comparison = get_hospital_comparison(lg)
+        records = comparison.to_dict("records") if hasattr(comparison, "to_dict") else comparison
+        yield [{"leistungsgruppe": lg, **record} for record in records]
+
+
+# --- Writers (write batches to a binary file object) ----------------------------
+
+def write_csv(batches, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = csv.DictWriter(text, fieldnames=list(batch[0]))
+            writer.writeheader()
+        writer.writerows(batch)
+    text.detach()
+
+
+def write_parquet(batches, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for batch in batches:
+        table = pa.Table.from_pylist(batch)
+        if writer is None:
+            writer = pq.ParquetWriter(out, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    if writer is not None:
+        writer.close()
+
+
+def write_xlsx(batches, out, sheet_name="Export"):
+    """Write rows with openpyxl's write-only workbook (rows are not kept in memory)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    header = None
+    for batch in batches:
+        if header is None:
+            header = list(batch[0])
+            sheet.append(header)
+        for row in batch:
+            sheet.append([row[column] for column in header])
+    workbook.save(out)
+
+
+def write_html_table(batches, out, title):
+    out.write(_html_head(title).encode())
+    header = None
+    for batch in batches:
+        if header is None:
+            header = list(batch[0])
+            out.write(("<table><thead><tr>" + "".join(f"<th>{html.escape(c)}</th>" for c in header)
+                       + "</tr></thead><tbody>\n").encode())
+        out.write("".join(
+            "<tr>" + "".join(f"<td>{html.escape(str(row[c]))}</td>" for c in header) + "</tr>\n" for row in batch
+        ).encode())
+    out.write(b"</tbody></table>\n</body></html>\n")
+
+
+# --- HTML report ------------------------------------------------------------------
+
+def _html_head(title):
+    return (
+        "<!DOCTYPE html>\n<html lang=\"de\"><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title>"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:2px 6px}section{page-break-inside:avoid}</style>"
+        f"</head><body>\n<h1>{html.escape(title)}</h1>\n"
+        f"<p>Stand: {datetime.now().strftime('%d.%m.%Y %H:%M')} Uhr</p>\n"
+    )
+
+
+def render_site_section(details):
+    """HTML report section of one site (from get_hospital_details)"""
+    if not details:
+        return ""
+    from mock_data import rate_indicator
+
+    indicators = details["quality_indicators"]
+    rows = "".join(
+        f"<tr><td>{label}</td><td>{indicators[key]}</td>"
+        f"<td>{STATUS_TEXT[str(rate_indicator(key, indicators[key]))] if key != 'satisfaction' else ''}</td></tr>"
+        for key, label in [("complication_rate", "Komplikationsrate (%)"),
+                           ("mortality_rate", "Mortalität (%)"),
+                           ("satisfaction", "Patientenzufriedenheit")]
+    )
+    rejected = "".join(
+        f"<li>{html.escape(lg['name'])}: {html.escape(lg['reason'])}</li>" for lg in details["lg_rejected"]
+    )
+    return (
+        f"<section><h2>{html.escape(details['name'])}</h2>\n"
+        f"<p>Region {html.escape(details['region'])} · Stufe {html.escape(str(details['level']))} · "
+        f"{details['beds']} Betten · {details['staff']} Mitarbeiter</p>\n"
+        f"<p>Leistungsgruppen: {len(details['lg_approved'])} genehmigt, "
+        f"{len(details['lg_in_progress'])} in Bearbeitung, {len(details['lg_rejected'])} abgelehnt</p>\n"
+        + (f"<ul>{rejected}</ul>\n" if rejected else "")
+        + f"<table><tr><th>Indikator</th><th>Wert</th><th>Bewertung</th></tr>{rows}</table>\n</section>\n"
+    )
+
+
+def write_report(out, names=None, processes=None, title="Krankenhausreform SH – Standortbericht"):
+    """State-wide HTML report with one section per site, written as sections complete"""
+    names = list(names) if names is not None else get_registry().names
+    out.write(_html_head(title).encode())
+    out.write(f"<p>{len(names)} Standorte</p>\n".encode())
+    for section in map_sites(_site_section, names, processes):
+        out.write(section.encode())
+    out.write(b"</body></html>\n")
+
+
+# --- Exports ----------------------------------------------------------------------
+
+# table name -> (title, batch iterator)
+TABLES = {
+    "profiles": ("Standortprofile", profile_batches),
+    "comparison": ("Standortvergleich je Leistungsgruppe", comparison_batches),
+}
+REPORT = "report"
+
+
+def write_export(kind, fmt, out, processes=None):
+    """Write a table (see TABLES) or the report in a format (see FORMATS) to a binary file object"""
+    if kind == REPORT:
+        if fmt != "html":
+            raise ValueError("Der Standortbericht ist nur als HTML verfügbar")
+        write_report(out, processes=processes)
+        return
+
+    title, table_batches = TABLES[kind]
+    batches = table_batches(processes=processes)
+    if fmt == "csv":
+        write_csv(batches, out)
+    elif fmt == "parquet":
+        write_parquet(batches, out)
+    elif fmt == "xlsx":
+        write_xlsx(batches, out, sheet_name=title[:31])
+    else:
+        write_html_table(batches, out, title)
+
+
+class ExportCancelled(Exception):
+    """The consumer of iter_export() stopped iterating"""
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Binary file object that hands written bytes to a bounded queue in CHUNK_SIZE pieces"""
+
+    def __init__(self, chunks, cancel):
+        self._chunks = chunks
+        self._cancel = cancel
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def put(self, item):
+        """Queue item, waiting while the queue is full; raises ExportCancelled once cancel is set"""
+        while not self._cancel.is_set():
+            try:
+                self._chunks.put(item, timeout=CANCEL_POLL_S)
+                return
+            except queue.Full:
+                pass
+        raise ExportCancelled()
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= CHUNK_SIZE:
+            self.put(bytes(self._buffer[:CHUNK_SIZE]))
+            del self._buffer[:CHUNK_SIZE]
+        return len(data)
+
+    def flush_buffer(self):
+        if self._buffer:
+            self.put(bytes(self._buffer))
+            self._buffer.clear()
+
+
+_DONE = object()
+
+
+def iter_export(kind, fmt, processes=None, max_pending=16):
+    """Yield the bytes of an export while it is being written
+
+    The export is written on a background thread from the caller's data
+    snapshot; at most max_pending chunks are buffered, so a slow consumer
+    slows down the writer. A consumer that stops iterating (close() or
+    garbage collection of the generator) cancels the writer.
+    """
+    chunks = queue.Queue(maxsize=max_pending)
+    cancel = threading.Event()
+    snapshot = data_provider.current_snapshot()
+    errors = []
+
+    def produce():
+        data_provider.pin(snapshot)
+        writer = _ChunkWriter(chunks, cancel)
+        try:
+            write_export(kind, fmt, writer, processes=processes)
+            writer.flush_buffer()
+        except ExportCancelled:
+            return
+        except Exception as e:  # re-raised in the consumer
+            errors.append(e)
+        try:
+            writer.put(_DONE)
+        except ExportCancelled:
+            pass
+
+    thread = threading.Thread(target=produce, name=f"export-{kind}", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+    finally:
+        cancel.set()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def export_file(kind, fmt, processes=None):
+    """Write an export to a spooled temporary file (kept in memory up to 32 MB) and rewind it"""
+    spool = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+    for chunk in iter_export(kind, fmt, processes=processes):
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def file_name(kind, fmt):
+    return f"kh-reform-{kind}-{datetime.now():%Y-%m-%d}.{FORMATS[fmt][0]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export dashboard tables and reports")
+    parser.add_argument("kind", choices=sorted(TABLES) + [REPORT])
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--out", default="-", help="output file, '-' for stdout")
+    parser.add_argument("--processes", type=int, help="pool size for per-site work (default: CPU count)")
+    args = parser.parse_args()
+
+    out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    try:
+        for chunk in iter_export(args.kind, args.format, processes=args.processes):
+            out.write(chunk)
+            out.flush()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Local stand-in for the external data sources (HTTP fixture server)
+Serves synthetic fixtures under the paths of connectors.SOURCES
+
+Responses carry ETag and Last-Modified headers and answer conditional
+requests with 304 Not Modified, like the real sources. For testing the
+connectors a fixed latency per request and a number of 503 responses per
+path (served before the file) can be injected.
+
+Usage: python fixture_server.py [--port 8765] [--sites 200] [--delay 0.5] [--dir data/fixtures]
+"""
+
+import argparse
+import functools
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from connectors import SOURCES
+from data_store import SOURCE_LG_APPROVALS, SOURCE_ROUTINE, SOURCE_STAFFING
+
+
+def write_fixtures(directory, dataset):
+    """Write the source fixtures (latest month) of a synthetic dataset (see synthetic_data.generate_dataset)"""
+    from ingest import SCHEMAS
+
+    latest = dataset["indicators"]["month"].max()
+    frames = {
+        SOURCE_LG_APPROVALS: dataset["approvals"].assign(month=latest),
+        SOURCE_ROUTINE: dataset["indicators"][dataset["indicators"]["month"] == latest],
+        SOURCE_STAFFING: dataset["staffing"][dataset["staffing"]["month"] == latest],
+    }
+    for source, df in frames.items():
+        path = os.path.join(directory, SOURCES[source]["path"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df = df.assign(month=df["month"].dt.strftime("%Y-%m"))[list(SCHEMAS[source])]
+        df.to_csv(path, index=False)
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static files with ETag/If-None-Match, injected latency and 503s (see FixtureServer)"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so the connectors' pool reuses connections
+
+    def do_GET(self):
+        self._etag = None
+        time.sleep(self.server.delay)
+        path = self.path.split("?", 1)[0]
+        with self.server.lock:
+            failures = self.server.failures.get(path, 0)
+            if failures:
+                self.server.failures[path] = failures - 1
+        if failures:
+            self.send_error(503, "Service Unavailable (injected)")
+            return
+
+        file_path = self.translate_path(self.path)
+        if os.path.isfile(file_path):
+            stat = os.stat(file_path)
+            self._etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            if self.headers.get("If-None-Match") == self._etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+        super().do_GET()
+
+    def end_headers(self):
+        if self._etag:
+            self.send_header("ETag", self._etag)
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Threaded fixture server; delay (s) per request, failures: path -> number of 503 responses"""
+
+    daemon_threads = True
+
+    def __init__(self, directory, port=0, delay=0.0, failures=None):
+        super().__init__(("127.0.0.1", port), functools.partial(FixtureHandler, directory=directory))
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+def serve(directory, port=0, delay=0.0, failures=None):
+    """Start a FixtureServer in a daemon thread; stop it with server.shutdown()"""
+    server = FixtureServer(directory, port, delay, failures)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sites", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.0, help="latency per request in seconds")
+    parser.add_argument("--dir", help="fixture directory (default: temporary, generated)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="kh_fixtures_")
+    os.makedirs(directory, exist_ok=True)
+    if not os.listdir(directory):
+        from synthetic_data import generate_dataset
+
+        write_fixtures(directory, generate_dataset(n_sites=args.sites))
+
+    server = FixtureServer(directory, args.port, args.delay)
+    print(f"Fixtures aus {directory} unter {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
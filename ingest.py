@@ -0,0 +1,205 @@
+"""
+Incremental ingestion of monthly CSV deliveries into the data store
+Streams each CSV in bounded-memory blocks, validates and types the columns
+and appends only month partitions that are not in the store yet
+
+LG approvals are delivered daily as the full current state: a delivery
+replaces the partition of its month instead of being skipped.
+
+Processed files are recorded in <store>/_ingested.json (by name, size and
+modification time), so re-running on the same files is a no-op.
+
+Usage:
+    python ingest.py routine data/inbox/routine_2025-11.csv --store data/store
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+from data_store import DataStore, PARTITIONING, SOURCE_LG_APPROVALS, SOURCE_ROUTINE, SOURCE_STAFFING
+
+# Column types per source; all columns are required
+SCHEMAS = {
+    SOURCE_LG_APPROVALS: {
+        "site_id": pa.string(),
+        "region": pa.string(),
+        "lg": pa.string(),
+        "month": pa.string(),
+        "status": pa.string(),
+        "decided": pa.timestamp("us"),
+    },
+    SOURCE_ROUTINE: {
+        "site_id": pa.string(),
+        "region": pa.string(),
+        "lg": pa.string(),
+        "month": pa.string(),
+        "cases": pa.int32(),
+        "complication_rate": pa.float64(),
+        "mortality_rate": pa.float64(),
+        "satisfaction": pa.float64(),
+        "avg_stay": pa.float64(),
+    },
+    SOURCE_STAFFING: {
+        "site_id": pa.string(),
+        "region": pa.string(),
+        "lg": pa.string(),
+        "month": pa.string(),
+        "staff_required": pa.int16(),
+        "staff_actual": pa.int16(),
+    },
+}
+
+# Columns that must not be negative
+NON_NEGATIVE = ["cases", "complication_rate", "mortality_rate", "avg_stay", "staff_required", "staff_actual"]
+# Columns that may be empty (an LG application not decided yet)
+NULLABLE = ["decided"]
+# Sources delivered as the full current state: a delivery replaces its month
+REPLACED_SOURCES = [SOURCE_LG_APPROVALS]
+
+MANIFEST_NAME = "_ingested.json"
+DEFAULT_BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_manifest(store):
+    path = os.path.join(store.root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(store, manifest):
+    path = os.path.join(store.root, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _validate(batch, schema, path):
+    """Check month format, non-negative values and missing values of a typed batch"""
+    month = batch.column("month")
+    if not pc.all(pc.match_substring_regex(month, r"^\d{4}-(0[1-9]|1[0-2])$")).as_py():
+        raise ValueError(f"{path}: 'month' must be formatted as YYYY-MM (month 01-12)")
+
+    for name in schema:
+        column = batch.column(name)
+        if column.null_count and name not in NULLABLE:
+            raise ValueError(f"{path}: column '{name}' has {column.null_count} missing values")
+        if name in NON_NEGATIVE and pc.any(pc.less(column, 0)).as_py():
+            raise ValueError(f"{path}: column '{name}' has negative values")
+
+
+def ingest_file(store, source, path, block_size=DEFAULT_BLOCK_SIZE):
+    """Ingest one CSV file into a source; returns a stats dict
+
+    Rows of months already present in the store are skipped (replaced for
+    REPLACED_SOURCES). New months are written to a staging directory first
+    and moved into place once the file has been read completely, so a failed
+    run leaves the store unchanged.
+    """
+    schema = SCHEMAS[source]
+    manifest = load_manifest(store)
+    key = f"{source}/{_fingerprint(path)}"
+    if key in manifest:
+        return {"file": path, "skipped": True, "rows": 0, "rows_written": 0, "months": [], "seconds": 0.0}
+
+    existing_months = set() if source in REPLACED_SOURCES else set(store.months(source))
+    staging = os.path.join(store.root, ".staging", uuid.uuid4().hex)
+    start = time.perf_counter()
+    rows = rows_written = 0
+    new_months = set()
+
+    # Checked on the header first: open_csv raises a bare ArrowInvalid for absent include_columns
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    missing = set(schema) - set(header)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(column_types=schema, include_columns=list(schema)),
+    )
+
+    try:
+        for i, batch in enumerate(reader):
+            _validate(batch, schema, path)
+            rows += batch.num_rows
+
+            known = pc.is_in(batch.column("month"), pa.array(sorted(existing_months), pa.string()))
+            batch = batch.filter(pc.invert(known))
+            if not batch.num_rows:
+                continue
+
+            new_months.update(pc.unique(batch.column("month")).to_pylist())
+            rows_written += batch.num_rows
+            ds.write_dataset(
+                pa.Table.from_batches([batch]),
+                staging,
+                format="parquet",
+                partitioning=PARTITIONING,
+                existing_data_behavior="overwrite_or_ignore",
+                basename_template=f"part-{i}-{{i}}.parquet",
+            )
+
+        os.makedirs(store.path(source), exist_ok=True)
+        for month in sorted(new_months):
+            target = os.path.join(store.path(source), f"month={month}")
+            if os.path.exists(target):  # replaced source: the old partition is removed with the staging directory
+                os.replace(target, os.path.join(staging, f"replaced-{month}"))
+            os.replace(os.path.join(staging, f"month={month}"), target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    seconds = time.perf_counter() - start
+    manifest[key] = {
+        "rows": rows,
+        "rows_written": rows_written,
+        "months": sorted(new_months),
+        "ingested_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    save_manifest(store, manifest)
+
+    return {"file": path, "skipped": False, "rows": rows, "rows_written": rows_written,
+            "months": sorted(new_months), "seconds": seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest monthly CSV deliveries into the data store")
+    parser.add_argument("source", choices=sorted(SCHEMAS))
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--store", default="data/store")
+    parser.add_argument("--block-mb", type=int, default=DEFAULT_BLOCK_SIZE // (1024 * 1024))
+    args = parser.parse_args()
+
+    store = DataStore(args.store)
+    for path in args.files:
+        stats = ingest_file(store, args.source, path, block_size=args.block_mb * 1024 * 1024)
+        if stats["skipped"]:
+            print(f"{path}: bereits verarbeitet, übersprungen")
+            continue
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+        print(f"{path}: {stats['rows']:,} Zeilen, {stats['rows_written']:,} neu "
+              f"({', '.join(stats['months']) or 'keine neuen Monate'}), {rate:,.0f} Zeilen/s")
+
+
+if __name__ == "__main__":
+    main()
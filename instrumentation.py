@@ -0,0 +1,143 @@
+"""
+Hot-path instrumentation for the Hospital Reform Dashboard
+Times data getters, chart builders and views and exports the results
+
+Disabled by default. Set KH_INSTRUMENT=1 to enable it and KH_INSTRUMENT_FILE
+to export after every script run: a path ending in .prom is rewritten as a
+Prometheus text file with the process-wide totals, any other path gets one
+JSON line per timed call appended.
+
+The switch is read once at import: when disabled, timed() returns the
+function unchanged, so instrumented functions cost nothing extra.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+EXPORT_PATH = os.environ.get("KH_INSTRUMENT_FILE")
+ENABLED = bool(os.environ.get("KH_INSTRUMENT") or EXPORT_PATH)
+
+KIND_GETTER = "getter"
+KIND_CHART = "chart"
+KIND_VIEW = "view"
+
+_totals = {}  # (kind, name) -> [calls, seconds, max seconds]
+_lock = threading.Lock()
+_run = threading.local()  # calls of the current script run (one script thread per session)
+
+
+def _record(kind, name, seconds):
+    with _lock:
+        total = _totals.setdefault((kind, name), [0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += seconds
+        total[2] = max(total[2], seconds)
+
+    calls = getattr(_run, "calls", None)
+    if calls is not None:
+        calls.append({"kind": kind, "name": name, "seconds": seconds})
+
+
+def timed(kind):
+    """Record the wall time of every call of the decorated function (no-op when disabled)"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(kind, name, time.perf_counter() - start)
+
+        return wrapper
+    return decorator
+
+
+def start_run():
+    """Start collecting the calls of a new script run in this thread
+
+    Calls of fragment reruns since the last export are exported first.
+    """
+    if getattr(_run, "calls", None):
+        export()
+    _run.calls = []
+    _run.exported = 0
+
+
+def run_calls():
+    """Calls recorded since start_run() in this thread"""
+    return list(getattr(_run, "calls", None) or [])
+
+
+def run_summary():
+    """Calls, total and maximum ms per function of the current run, slowest first"""
+    summary = {}
+    for call in run_calls():
+        entry = summary.setdefault((call["kind"], call["name"]), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += call["seconds"]
+        entry[2] = max(entry[2], call["seconds"])
+
+    rows = [
+        {"Art": kind, "Funktion": name, "Aufrufe": calls, "Gesamt (ms)": round(seconds * 1000, 1),
+         "Max (ms)": round(longest * 1000, 1)}
+        for (kind, name), (calls, seconds, longest) in summary.items()
+    ]
+    return sorted(rows, key=lambda row: row["Gesamt (ms)"], reverse=True)
+
+
+def totals():
+    """Process-wide calls, seconds and maximum seconds per (kind, name)"""
+    with _lock:
+        return {key: tuple(value) for key, value in _totals.items()}
+
+
+def prometheus_text():
+    """Process-wide totals in the Prometheus text exposition format"""
+    lines = [
+        "# HELP kh_call_duration_seconds Wall time of instrumented dashboard functions",
+        "# TYPE kh_call_duration_seconds summary",
+    ]
+    maxima = []
+    for (kind, name), (calls, seconds, longest) in sorted(totals().items()):
+        labels = f'kind="{kind}",name="{name}"'
+        lines.append(f"kh_call_duration_seconds_count{{{labels}}} {calls}")
+        lines.append(f"kh_call_duration_seconds_sum{{{labels}}} {seconds:.6f}")
+        maxima.append(f"kh_call_duration_seconds_max{{{labels}}} {longest:.6f}")
+
+    lines += [
+        "# HELP kh_call_duration_seconds_max Longest single call of instrumented dashboard functions",
+        "# TYPE kh_call_duration_seconds_max gauge",
+    ] + maxima
+    return "\n".join(lines) + "\n"
+
+
+def export(path=EXPORT_PATH):
+    """Write the metrics to path (.prom: Prometheus totals, otherwise JSON lines of this run)"""
+    if not path:
+        return
+
+    if path.endswith(".prom"):
+        text = prometheus_text()
+        tmp_path = f"{path}.tmp"
+        with _lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return
+
+    calls = run_calls()
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    with _lock, open(path, "a", encoding="utf-8") as f:
+        for call in calls[getattr(_run, "exported", 0):]:
+            f.write(json.dumps({"time": timestamp, **call}, ensure_ascii=False) + "\n")
+    _run.exported = len(calls)
@@ -0,0 +1,182 @@
+"""
+Hierarchical KPI rollup for the Hospital Reform Dashboard
+Aggregates hospital-level facts to region and state level
+
+Facts are additive measures per hospital (counts, Mio. EUR, beds), so the
+region and state aggregates are plain sums. They are materialized once;
+update_hospital() applies the difference of one hospital's facts to its
+region and to the state without recomputing the rest.
+"""
+
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+
+MEASURES = [
+    "lg_approved", "lg_total",
+    "quality_fulfilled", "quality_total",
+    "funds_allocated", "funds_total",
+    "occupied_beds", "beds",
+]
+
+# KPI name -> (numerator, denominator, target in %)
+RATIO_KPIS = {
+    "lg_approved": ("lg_approved", "lg_total", 100),
+    "quality_fulfilled": ("quality_fulfilled", "quality_total", 95),
+    "funds_allocated": ("funds_allocated", "funds_total", 100),
+}
+
+BED_OCCUPANCY_TARGET = (75, 85)
+
+
+def latest_staffing_month(months, as_of):
+    """Latest of months (staffing deliveries) up to as_of, or None"""
+    months = pd.to_datetime(pd.Series(months))
+    months = months[months <= pd.Timestamp(as_of)]
+    return months.max() if len(months) else None
+
+
+def facts_from_dataset(sites, approvals, staffing, indicators, as_of, decided_by=None):
+    """Build hospital-level facts (one row per site) as of a month
+
+    sites/approvals/staffing/indicators follow synthetic_data.generate_dataset;
+    indicators only need rows for the as_of month. Staffing is delivered
+    monthly and routine data weekly, so the latest staffing month up to
+    as_of is used (see latest_staffing_month). LG approvals count once
+    decided up to decided_by (default as_of): approvals are delivered daily,
+    so the latest facts can include decisions made after the month start.
+    """
+    as_of = pd.Timestamp(as_of)
+    decided_by = pd.Timestamp(decided_by) if decided_by is not None else as_of
+    site_index = pd.Index(sites["id"], name="site_id")
+
+    approved = (approvals["status"] == "approved") & (approvals["decided"] <= decided_by)
+    lg = approvals.assign(approved=approved).groupby("site_id", observed=True).agg(
+        lg_approved=("approved", "sum"), lg_total=("approved", "size")
+    )
+
+    staffing = staffing[staffing["month"] == latest_staffing_month(staffing["month"], as_of)]
+    quality = staffing.assign(ok=staffing["staff_actual"] >= staffing["staff_required"]).groupby(
+        "site_id", observed=True
+    ).agg(quality_fulfilled=("ok", "sum"), quality_total=("ok", "size"))
+
+    indicators = indicators[indicators["month"] == as_of]
+    days = as_of.days_in_month
+    occupied = (indicators["cases"] * indicators["avg_stay"] / days).groupby(indicators["site_id"]).sum()
+
+    funds_total = sites["funds_requested"].to_numpy()
+    granted = (sites["funds_granted"] <= as_of).to_numpy()
+
+    facts = pd.DataFrame({
+        "region": sites["region"].astype(str).to_numpy(),
+        "funds_allocated": np.where(granted, funds_total, 0.0),
+        "funds_total": funds_total,
+        "beds": sites["beds"].to_numpy(),
+    }, index=site_index)
+    facts = facts.join(lg).join(quality)
+    facts["occupied_beds"] = occupied.reindex(site_index).to_numpy()
+    facts[MEASURES] = facts[MEASURES].fillna(0).astype(float)
+    return facts[["region"] + MEASURES]
+
+
+def _percentage(numerator, denominator):
+    return np.where(denominator > 0, 100 * numerator / np.maximum(denominator, 1e-9), 0.0)
+
+
+def format_trend(delta_pp):
+    """Format a percentage-point change like the scoreboard ("+3pp", "-2pp", "→ stabil")"""
+    delta = int(round(delta_pp))
+    if delta == 0:
+        return "→ stabil"
+    return f"{delta:+d}pp"
+
+
+class KPIRollup:
+    """Materialized hospital -> region -> state aggregates of additive facts"""
+
+    def __init__(self, facts, baseline_facts=None):
+        self.facts = facts.copy()
+        self.regional = self.facts.groupby("region", sort=False)[MEASURES].sum()
+        self.state = self.regional.sum()
+        self.baseline = baseline_facts[MEASURES].sum() if baseline_facts is not None else None
+        self._lock = threading.Lock()
+
+    def copy(self):
+        """Independent rollup with the same facts and aggregates (e.g. for what-if scenarios)"""
+        other = copy.copy(self)
+        other.facts = self.facts.copy()
+        other.regional = self.regional.copy()
+        other.state = self.state.copy()
+        other._lock = threading.Lock()
+        return other
+
+    def update_hospital(self, site_id, **values):
+        """Change one hospital's facts and apply the difference to its region and the state"""
+        with self._lock:
+            old = self.facts.loc[site_id, MEASURES].astype(float)
+            for measure, value in values.items():
+                if measure not in MEASURES:
+                    raise KeyError(f"Unknown measure: {measure}")
+                self.facts.loc[site_id, measure] = float(value)
+            delta = self.facts.loc[site_id, MEASURES].astype(float) - old
+
+            region = self.facts.loc[site_id, "region"]
+            self.regional.loc[region] += delta
+            self.state += delta
+
+    def regional_kpis(self):
+        """Percentages per region (lg_approved_pct, quality_fulfilled_pct, funds_allocated_pct, bed_occupancy)"""
+        with self._lock:
+            regional = self.regional.copy()
+        return pd.DataFrame({
+            "lg_approved_pct": _percentage(regional["lg_approved"], regional["lg_total"]).astype(int),
+            "quality_fulfilled_pct": _percentage(regional["quality_fulfilled"], regional["quality_total"]).astype(int),
+            "funds_allocated_pct": _percentage(regional["funds_allocated"], regional["funds_total"]).astype(int),
+            "bed_occupancy": _percentage(regional["occupied_beds"], regional["beds"]).round().astype(int),
+        }, index=regional.index)
+
+    def state_kpis(self):
+        """State-level KPIs in the get_state_kpis format (without emergency accessibility)"""
+        with self._lock:
+            state = self.state.copy()
+
+        kpis = {}
+        for name, (numerator, denominator, target) in RATIO_KPIS.items():
+            pct = float(_percentage(state[numerator], state[denominator]))
+            trend = "→ stabil"
+            if self.baseline is not None:
+                trend = format_trend(pct - float(_percentage(self.baseline[numerator], self.baseline[denominator])))
+            kpis[name] = {
+                "current": int(round(state[numerator])),
+                "total": int(round(state[denominator])),
+                "percentage": int(pct),
+                "target": target,
+                "trend": trend,
+            }
+
+        occupancy = float(_percentage(state["occupied_beds"], state["beds"]))
+        trend = "→ stabil"
+        if self.baseline is not None:
+            trend = format_trend(occupancy - float(_percentage(self.baseline["occupied_beds"], self.baseline["beds"])))
+        kpis["bed_occupancy"] = {
+            "current": int(round(occupancy)),
+            "target_min": BED_OCCUPANCY_TARGET[0],
+            "target_max": BED_OCCUPANCY_TARGET[1],
+            "trend": trend,
+        }
+        return kpis
+
+
+def rollup_from_dataset(dataset, as_of=None):
+    """Build a KPIRollup for a dataset, with the previous month as trend baseline"""
+    months = pd.DatetimeIndex(dataset["indicators"]["month"].unique()).sort_values()
+    as_of = pd.Timestamp(as_of) if as_of is not None else months[-1]
+    previous = months[months < as_of]
+
+    def facts(month):
+        return facts_from_dataset(dataset["sites"], dataset["approvals"], dataset["staffing"],
+                                  dataset["indicators"], month)
+
+    return KPIRollup(facts(as_of), facts(previous[-1]) if len(previous) else None)
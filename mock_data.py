@@ -1,38 +1,51 @@
 """
 Mock data generator for the Hospital Reform Dashboard
 Generates fictional data for prototyping purposes
+
+pandas and numpy are imported inside the functions that need them, so
+views without tables or charts (e.g. Planung) start without loading them.
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from functools import lru_cache
 import random
 
+from instrumentation import KIND_GETTER, timed
+from registry import HospitalRegistry
+
 # Constants
 REGIONS = ["Flensburg", "Kiel", "Lübeck", "Neumünster", "Rendsburg"]
 
+# Simulated coordinates for regions (fictional positioning for visualization)
+REGION_COORDS = {
+    "Flensburg": (54.8, 9.4),
+    "Kiel": (54.3, 10.1),
+    "Lübeck": (53.9, 10.7),
+    "Neumünster": (54.1, 9.9),
+    "Rendsburg": (54.3, 9.7),
+}
+
 HOSPITALS = {
     "Flensburg": [
-        {"name": "Malteser Krankenhaus St. Franziskus-Hospital", "level": "Regelversorgung", "beds": 320},
-        {"name": "Diakonissenkrankenhaus Flensburg", "level": "Regelversorgung", "beds": 280},
+        {"id": "771001", "name": "Malteser Krankenhaus St. Franziskus-Hospital", "level": "Regelversorgung", "beds": 320, "lat": 54.7836, "lon": 9.4321},
+        {"id": "771002", "name": "Diakonissenkrankenhaus Flensburg", "level": "Regelversorgung", "beds": 280, "lat": 54.775, "lon": 9.441},
     ],
     "Kiel": [
-        {"name": "UKSH Campus Kiel", "level": "Maximalversorgung", "beds": 850},
-        {"name": "Städtisches Krankenhaus Kiel", "level": "Schwerpunktversorgung", "beds": 450},
-        {"name": "Helios Klinik Kiel", "level": "Regelversorgung", "beds": 380},
+        {"id": "772001", "name": "UKSH Campus Kiel", "level": "Maximalversorgung", "beds": 850, "lat": 54.329, "lon": 10.138},
+        {"id": "772002", "name": "Städtisches Krankenhaus Kiel", "level": "Schwerpunktversorgung", "beds": 450, "lat": 54.3353, "lon": 10.1105},
+        {"id": "772003", "name": "Helios Klinik Kiel", "level": "Regelversorgung", "beds": 380, "lat": 54.3, "lon": 10.12},
     ],
     "Lübeck": [
-        {"name": "UKSH Campus Lübeck", "level": "Maximalversorgung", "beds": 650},
-        {"name": "Sana-Klinik Lübeck", "level": "Regelversorgung", "beds": 320},
-        {"name": "Lübeck Hospital", "level": "Regelversorgung", "beds": 240},
+        {"id": "773001", "name": "UKSH Campus Lübeck", "level": "Maximalversorgung", "beds": 650, "lat": 53.836, "lon": 10.709},
+        {"id": "773002", "name": "Sana-Klinik Lübeck", "level": "Regelversorgung", "beds": 320, "lat": 53.879, "lon": 10.729},
+        {"id": "773003", "name": "Lübeck Hospital", "level": "Regelversorgung", "beds": 240, "lat": 53.865, "lon": 10.686},
     ],
     "Neumünster": [
-        {"name": "FEK Friedrich-Ebert-Krankenhaus", "level": "Schwerpunktversorgung", "beds": 520},
-        {"name": "Klinikum Neumünster", "level": "Regelversorgung", "beds": 390},
+        {"id": "774001", "name": "FEK Friedrich-Ebert-Krankenhaus", "level": "Schwerpunktversorgung", "beds": 520, "lat": 54.08, "lon": 9.978},
+        {"id": "774002", "name": "Klinikum Neumünster", "level": "Regelversorgung", "beds": 390, "lat": 54.065, "lon": 9.99},
     ],
     "Rendsburg": [
-        {"name": "Schön Klinik Rendsburg", "level": "Schwerpunktversorgung", "beds": 480},
-        {"name": "Imland Klinik Rendsburg", "level": "Regelversorgung", "beds": 350},
+        {"id": "775001", "name": "Schön Klinik Rendsburg", "level": "Schwerpunktversorgung", "beds": 480, "lat": 54.304, "lon": 9.663},
+        {"id": "775002", "name": "Imland Klinik Rendsburg", "level": "Regelversorgung", "beds": 350, "lat": 54.298, "lon": 9.67},
     ]
 }
 
@@ -54,93 +67,258 @@ LEISTUNGSGRUPPEN = [
     "Intensivmedizin",
 ]
 
+# Quality indicator targets (lower is better unless noted)
+QUALITY_TARGETS = {
+    "complication_rate": 2.5,
+    "mortality_rate": 1.5,
+    "satisfaction": 3.5,  # higher is better
+    "avg_stay": 5.0,
+    "avg_stay_range": 1,
+}
 
-def get_state_kpis():
-    """Generate state-level KPIs for the overview dashboard"""
+# Minimum annual cases per site (Mindestvorhaltezahlen), scaled to the synthetic routine data
+MINDESTMENGEN = {
+    "Innere Medizin - Kardiologie": 1200,
+    "Innere Medizin - Pneumologie": 1200,
+    "Unfallchirurgie": 1000,
+    "Neurochirurgie": 1500,
+    "Gefäßchirurgie": 1000,
+    "Orthopädie": 900,
+    "Intensivmedizin": 1500,
+}
+
+# Versorgungsstufen in ascending order and the lowest one that may provide an LG
+VERSORGUNGSSTUFEN = ["Regelversorgung", "Schwerpunktversorgung", "Maximalversorgung"]
+LG_MIN_LEVEL = {
+    "Neurochirurgie": "Schwerpunktversorgung",
+    "Gefäßchirurgie": "Schwerpunktversorgung",
+}
+
+# Related LGs (verwandte Leistungsgruppen) a site must also provide for an LG
+RELATED_LGS = {
+    "Innere Medizin - Kardiologie": ["Intensivmedizin"],
+    "Neurochirurgie": ["Intensivmedizin", "Radiologie"],
+    "Gefäßchirurgie": ["Chirurgie - Allgemein", "Radiologie"],
+    "Unfallchirurgie": ["Chirurgie - Allgemein", "Anästhesiologie"],
+    "Orthopädie": ["Anästhesiologie"],
+    "Intensivmedizin": ["Anästhesiologie"],
+}
+
+# Indexed hospital master data, built once at startup
+REGISTRY = HospitalRegistry(HOSPITALS)
+
+
+def hospital_status(total_lg, approved_lg, quality_ok):
+    """Derive a hospital's traffic-light status and warnings from its LG and quality state"""
+    status = "success"
+    warnings = []
+
+    if approved_lg < total_lg:
+        status = "warning"
+        warnings.append(f"{total_lg - approved_lg} LG noch nicht genehmigt")
+
+    if not quality_ok:
+        status = "critical" if status == "warning" else "warning"
+        warnings.append("Personalausstattung nicht ausreichend")
+
+    return status, warnings
+
+
+def regional_status(lg_approved_pct, quality_fulfilled_pct):
+    """Traffic-light status of regions from their LG and quality percentages (vectorized)"""
+    import numpy as np
+
+    lg_approved_pct = np.asarray(lg_approved_pct)
+    quality_fulfilled_pct = np.asarray(quality_fulfilled_pct)
+    return np.select(
+        [(lg_approved_pct >= 90) & (quality_fulfilled_pct >= 95), lg_approved_pct >= 75],
+        ["success", "warning"],
+        "critical",
+    )
+
+
+def rate_indicator(indicator, values):
+    """Rate indicator values against QUALITY_TARGETS (vectorized, returns status strings)"""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    if indicator == "avg_stay":
+        deviation = np.abs(values - QUALITY_TARGETS["avg_stay"]) / QUALITY_TARGETS["avg_stay_range"]
+    elif indicator == "satisfaction":
+        deviation = 1 + (QUALITY_TARGETS["satisfaction"] - values) / QUALITY_TARGETS["satisfaction"] * 10
+    else:
+        deviation = 1 + (values - QUALITY_TARGETS[indicator]) / QUALITY_TARGETS[indicator] * 10
+
+    # deviation <= 1: within target, <= 2: up to 10% (one range) off target
+    return np.select([deviation <= 1, deviation <= 2], ["success", "warning"], "critical")
+
+
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_dataset():
+    """Seeded synthetic facts (approvals, routine data, staffing) for the registry's hospitals"""
+    import pandas as pd
+    from synthetic_data import generate_dataset
+
+    return generate_dataset(sites=pd.DataFrame(list(REGISTRY)), n_months=36, seed=2025)
+
+
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_reachability():
+    """Reachability engine for the registry's hospitals over a synthetic population grid"""
+    from reachability import reachability_from_sites
+
+    dataset = get_dataset()
+    return reachability_from_sites(dataset["sites"], dataset["approvals"], LEISTUNGSGRUPPEN)
+
+
+def emergency_kpi(engine):
+    """emergency_accessible KPI: state population share reaching emergency care within 30 minutes"""
+    from reachability import EMERGENCY, EMERGENCY_MINUTES
+
+    percentage = int(engine.state_share(EMERGENCY, EMERGENCY_MINUTES))
+    return {"current": percentage, "total": 100, "percentage": percentage, "target": 100, "trend": "→ stabil"}
+
+
+def regional_coverage(engine, flows, region):
+    """Coverage analysis of a region from the reachability engine and a month's FlowMatrix"""
     return {
-        "lg_approved": {"current": 47, "total": 61, "percentage": 77, "target": 100, "trend": "+3pp"},
-        "quality_fulfilled": {"current": 156, "total": 164, "percentage": 95, "target": 95, "trend": "→ stabil"},
-        "funds_allocated": {"current": 48, "total": 60, "percentage": 80, "target": 100, "trend": "+5pp"},
-        "emergency_accessible": {"current": 98, "total": 100, "percentage": 98, "target": 100, "trend": "→ stabil"},
-        "bed_occupancy": {"current": 78, "target_min": 75, "target_max": 85, "trend": "+2pp"},
+        "coverage_gaps": engine.coverage_gaps(region),
+        "patient_migration": flows.migration(region),
+        "accessibility": engine.accessibility(region),
+        "demographics": {
+            "population": engine.population(region),
+            "avg_age": random.randint(42, 48),
+            "forecast_2030": random.randint(-8, 2),
+        }
     }
 
 
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_patient_flows():
+    """Patient flow engine over synthetic cases drawn from the routine data of get_dataset()"""
+    from patient_flows import flows_from_routine
+
+    dataset = get_dataset()
+    indicators = dataset["indicators"]
+    by_month = indicators.groupby(indicators["month"].dt.strftime("%Y-%m"))[["site_id", "lg", "cases"]]
+    return flows_from_routine(dataset["sites"], by_month.get_group, LEISTUNGSGRUPPEN)
+
+
+def latest_flows():
+    """FlowMatrix of the latest routine data month"""
+    return get_patient_flows().month(get_dataset()["indicators"]["month"].max())
+
+
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_kpi_rollup():
+    """KPI rollup over the hospital facts of get_dataset()"""
+    from kpi_rollup import rollup_from_dataset
+
+    return rollup_from_dataset(get_dataset())
+
+
+@timed(KIND_GETTER)
+def get_state_kpis():
+    """Get state-level KPIs for the overview dashboard (rolled up from hospital facts)"""
+    kpis = get_kpi_rollup().state_kpis()
+    kpis["emergency_accessible"] = emergency_kpi(get_reachability())
+    return kpis
+
+
+@timed(KIND_GETTER)
 def get_regional_status():
-    """Generate status for each region"""
-    statuses = ["success", "warning", "critical"]
-    weights = [0.5, 0.3, 0.2]  # 50% success, 30% warning, 20% critical
+    """Get status for each region"""
+    import pandas as pd
+
+    regional_kpis = get_kpi_rollup().regional_kpis()
 
     regional_data = []
     for region in REGIONS:
-        hospitals_count = len(HOSPITALS[region])
-        status = random.choices(statuses, weights=weights)[0]
+        hospitals_count = len(REGISTRY.in_region(region))
+        lg_approved_pct = int(regional_kpis.loc[region, "lg_approved_pct"])
+        quality_fulfilled_pct = int(regional_kpis.loc[region, "quality_fulfilled_pct"])
 
         regional_data.append({
             "region": region,
-            "status": status,
+            "status": str(regional_status(lg_approved_pct, quality_fulfilled_pct)),
             "hospitals": hospitals_count,
-            "lg_approved_pct": random.randint(70, 100),
-            "quality_fulfilled_pct": random.randint(85, 100),
+            "lg_approved_pct": lg_approved_pct,
+            "quality_fulfilled_pct": quality_fulfilled_pct,
             "population": random.randint(100000, 500000),
+            "lat": REGION_COORDS[region][0],
+            "lon": REGION_COORDS[region][1],
         })
 
     return pd.DataFrame(regional_data)
 
 
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_volume_projection():
+    """Annual case projection of every site x LG from the routine data of get_dataset()"""
+    from volume_projection import VolumeProjection
+
+    return VolumeProjection(get_dataset()["indicators"], MINDESTMENGEN)
+
+
+def site_volumes(projection, site_id):
+    """Projection rows of a site's LGs with a Mindestmenge (lg, cases_12m, projected, threshold, status)"""
+    volumes = projection.for_site(site_id)
+    volumes = volumes[volumes["threshold"].notna()].rename_axis("lg").reset_index()
+    return volumes.sort_values("projected", ignore_index=True)
+
+
+def lg_volumes(projection, sites, leistungsgruppe):
+    """Projection rows of an LG at all sites, lowest projection first (hospital, region, ...)"""
+    volumes = projection.for_lg(leistungsgruppe)
+    names = sites.assign(id=sites["id"].astype(str)).set_index("id")[["name", "region"]]
+    volumes = names.join(volumes, how="inner").rename(columns={"name": "hospital"})
+    return volumes.sort_values("projected", ignore_index=True)
+
+
+def rejection_reason(projection, site_id, leistungsgruppe):
+    """Reason for a rejected LG: the Mindestmenge projection if it falls short"""
+    volumes = projection.for_site(site_id)
+    if leistungsgruppe in volumes.index:
+        row = volumes.loc[leistungsgruppe]
+        if row["status"] in ("warning", "critical"):
+            return f"Mindestmenge nicht erreichbar (Prognose {row['projected']:,} / {int(row['threshold']):,} Fälle)"
+    return "Qualitätskriterien nicht erfüllt"
+
+
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_alert_engine():
+    """Alert rule engine over the hospital x LG facts of get_dataset()"""
+    from alerts import alerts_from_dataset
+
+    return alerts_from_dataset(get_dataset())
+
+
+@timed(KIND_GETTER)
 def get_critical_alerts():
-    """Generate critical alerts for the dashboard"""
-    alerts = [
-        {
-            "priority": "critical",
-            "region": "Lübeck",
-            "hospital": "UKSH Campus Lübeck",
-            "issue": "Personalausstattung Chirurgie nicht ausreichend",
-            "deadline": "15.01.2026",
-            "type": "Personal"
-        },
-        {
-            "priority": "critical",
-            "region": "Lübeck",
-            "hospital": None,
-            "issue": "Kardiologie-LG noch nicht genehmigt",
-            "deadline": "31.12.2025",
-            "type": "LG-Genehmigung"
-        },
-        {
-            "priority": "warning",
-            "region": "Kiel",
-            "hospital": None,
-            "issue": "Pneumologie: 2 Standorte unter Mindestmenge",
-            "deadline": "31.03.2026",
-            "type": "Mindestmenge"
-        },
-    ]
-    return alerts
+    """Generate critical alerts for the dashboard (rule-based, sorted by priority and deadline)"""
+    return get_alert_engine().alerts()
 
 
+@timed(KIND_GETTER)
 def get_hospitals_for_region(region):
     """Get detailed hospital data for a specific region"""
-    hospitals = HOSPITALS.get(region, [])
+    hospitals = REGISTRY.in_region(region)
     detailed_hospitals = []
 
     for hosp in hospitals:
         total_lg = random.randint(8, 15)
         approved_lg = random.randint(int(total_lg * 0.6), total_lg)
         quality_ok = random.choice([True, True, True, False])  # 75% chance of OK
-
-        status = "success"
-        warnings = []
-
-        if approved_lg < total_lg:
-            status = "warning"
-            warnings.append(f"{total_lg - approved_lg} LG noch nicht genehmigt")
-
-        if not quality_ok:
-            status = "critical" if status == "warning" else "warning"
-            warnings.append("Personalausstattung nicht ausreichend")
+        status, warnings = hospital_status(total_lg, approved_lg, quality_ok)
 
         detailed_hospitals.append({
+            "id": hosp["id"],
             "name": hosp["name"],
             "level": hosp["level"],
             "beds": hosp["beds"],
@@ -156,20 +334,10 @@ def get_hospitals_for_region(region):
     return detailed_hospitals
 
 
+@timed(KIND_GETTER)
 def get_hospital_details(hospital_name):
     """Get detailed information for a specific hospital"""
-    # Find the hospital in the regions
-    region = None
-    hospital_base = None
-
-    for reg, hosps in HOSPITALS.items():
-        for hosp in hosps:
-            if hosp["name"] == hospital_name:
-                region = reg
-                hospital_base = hosp
-                break
-        if hospital_base:
-            break
+    hospital_base = REGISTRY.by_name(hospital_name)
 
     if not hospital_base:
         return None
@@ -189,8 +357,9 @@ def get_hospital_details(hospital_name):
     rejected = random.sample(remaining_lg, min(rejected_lg, len(remaining_lg))) if rejected_lg > 0 else []
 
     return {
+        "id": hospital_base["id"],
         "name": hospital_name,
-        "region": region,
+        "region": hospital_base["region"],
         "level": hospital_base["level"],
         "beds": hospital_base["beds"],
         "staff": random.randint(200, 3500),
@@ -199,7 +368,8 @@ def get_hospital_details(hospital_name):
             {"name": lg, "status": "Audit geplant", "date": "20.12.2025"} for lg in in_progress
         ],
         "lg_rejected": [
-            {"name": lg, "reason": "Mindestmenge nicht erreichbar"} for lg in rejected
+            {"name": lg, "reason": rejection_reason(get_volume_projection(), hospital_base["id"], lg)}
+            for lg in rejected
         ],
         "quality": {
             "staff_ok": random.choice([True, False]),
@@ -214,55 +384,73 @@ def get_hospital_details(hospital_name):
     }
 
 
+@timed(KIND_GETTER)
 def get_quality_data_for_lg(leistungsgruppe):
     """Get quality data for a specific Leistungsgruppe"""
     return {
         "complication_rate": {
             "current": round(random.uniform(1.8, 2.8), 1),
-            "target": 2.5,
+            "target": QUALITY_TARGETS["complication_rate"],
             "status": "success"
         },
         "mortality_rate": {
             "current": round(random.uniform(0.8, 1.4), 1),
-            "target": 1.5,
+            "target": QUALITY_TARGETS["mortality_rate"],
             "status": "success"
         },
         "avg_stay": {
             "current": round(random.uniform(4.5, 6.0), 1),
-            "target": 5.0,
-            "range": 1,
+            "target": QUALITY_TARGETS["avg_stay"],
+            "range": QUALITY_TARGETS["avg_stay_range"],
             "status": "success"
         }
     }
 
 
-def get_quality_trends(leistungsgruppe, months=12):
-    """Generate trend data for quality indicators"""
-    dates = [(datetime.now() - timedelta(days=30*i)).strftime("%b %Y") for i in range(months)]
-    dates.reverse()
+@timed(KIND_GETTER)
+def get_volume_projection_for_hospital(hospital_name):
+    """Get the annual case projection of a hospital's LGs with a Mindestmenge"""
+    hospital_base = REGISTRY.by_name(hospital_name)
+    if not hospital_base:
+        return None
+    return site_volumes(get_volume_projection(), hospital_base["id"])
 
-    # Generate trending data
-    base_complication = 2.8
-    trend = -0.05  # Improving trend
 
-    data = {
-        "month": dates,
-        "complication_rate_sh": [max(1.5, base_complication + trend * i + random.uniform(-0.2, 0.2)) for i in range(months)],
-        "complication_rate_bund": [2.4 + random.uniform(-0.1, 0.1) for _ in range(months)],
-    }
+@timed(KIND_GETTER)
+def get_volume_projection_for_lg(leistungsgruppe):
+    """Get the annual case projection of an LG at all hospitals, lowest first"""
+    return lg_volumes(get_volume_projection(), get_dataset()["sites"], leistungsgruppe)
+
+
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_federal_indicators():
+    """Synthetic federal routine data used as Bundesweit baseline"""
+    from synthetic_data import BBOX_DE, generate_dataset
+
+    return generate_dataset(n_sites=400, n_months=36, n_regions=16, bbox=BBOX_DE, seed=1990)["indicators"]
+
 
-    return pd.DataFrame(data)
+@lru_cache(maxsize=1)
+@timed(KIND_GETTER)
+def get_quality_series():
+    """Quality time series of get_dataset() with the federal baseline"""
+    from timeseries import QualityTimeSeries
 
+    return QualityTimeSeries(get_dataset()["indicators"], get_federal_indicators())
 
-def get_hospital_comparison(leistungsgruppe):
-    """Get comparison data for hospitals for a specific LG"""
-    all_hospitals = []
-    for region, hosps in HOSPITALS.items():
-        for hosp in hosps:
-            all_hospitals.append(hosp["name"])
 
+@timed(KIND_GETTER)
+def get_quality_trends(leistungsgruppe, months=12, window=None):
+    """Get the monthly complication rate trend (state vs. federal baseline) for an LG"""
+    return get_quality_series().trend_frame(leistungsgruppe, months=months, window=window)
+
+
+@timed(KIND_GETTER)
+def get_hospital_comparison(leistungsgruppe, limit=None):
+    """Get comparison data for hospitals for a specific LG (all sites unless limited)"""
     comparison_data = []
-    for hosp_name in all_hospitals[:8]:  # Limit to 8 for display
+    for hosp_name in REGISTRY.names[:limit]:
         comparison_data.append({
             "hospital": hosp_name,
             "complication": random.choice(["success", "success", "warning"]),
@@ -274,6 +462,26 @@ def get_hospital_comparison(leistungsgruppe):
     return comparison_data
 
 
+@lru_cache(maxsize=None)
+@timed(KIND_GETTER)
+def get_comparison_table(leistungsgruppe):
+    """Site comparison table of an LG from the latest month of get_dataset()"""
+    from comparison import comparison_table
+
+    dataset = get_dataset()
+    indicators = dataset["indicators"]
+    latest = indicators[(indicators["month"] == indicators["month"].max()) & (indicators["lg"] == leistungsgruppe)]
+    return comparison_table(dataset["sites"], latest)
+
+
+@timed(KIND_GETTER)
+def get_hospital_comparison_page(leistungsgruppe, sort="hospital", descending=False, region=None, level=None,
+                                 status=None, page=1, page_size=25):
+    """Get one sorted, filtered page of the site comparison of an LG (rows, total, page, pages, page_size)"""
+    return get_comparison_table(leistungsgruppe).page(sort, descending, region, level, status, page, page_size)
+
+
+@timed(KIND_GETTER)
 def get_timeline_events():
     """Get timeline events for the planning view"""
     events = [
@@ -323,24 +531,13 @@ def get_timeline_events():
     return events
 
 
+@timed(KIND_GETTER)
 def get_regional_coverage_analysis(region):
     """Get coverage analysis for a region"""
-    return {
-        "coverage_gaps": [
-            {"lg": "Neurochirurgie", "status": "missing"},
-            {"lg": "Gefäßchirurgie", "status": "under_capacity"},
-        ],
-        "patient_migration": {
-            "outbound": {"Bremen": 12, "Hamburg": 8, "Niedersachsen": 5},
-            "inbound": {"Hamburg": 3, "Mecklenburg-Vorpommern": 2},
-        },
-        "accessibility": {
-            "emergency_30min": 98,
-            "specialized_60min": 95,
-        },
-        "demographics": {
-            "population": random.randint(150000, 450000),
-            "avg_age": random.randint(42, 48),
-            "forecast_2030": random.randint(-8, 2),
-        }
-    }
+    return regional_coverage(get_reachability(), latest_flows(), region)
+
+
+@timed(KIND_GETTER)
+def get_regional_patient_flows(region):
+    """Get the latest month's patient flows from and to a region (origin, destination, cases)"""
+    return latest_flows().flows(region)
@@ -0,0 +1,160 @@
+"""
+Patient flow engine: origin-destination matrices of inpatient cases
+Aggregates case-level routine data (residence area -> treating site x LG)
+into in- and outflows between regions and neighbouring states
+
+A month's cases are counted into one sparse OD matrix with a row per
+residence area and a column per (destination, LG); destinations are the
+sites plus the neighbouring states for cases treated outside the state.
+Area-level flows are a product with a sparse indicator matrix mapping each
+destination to its area, so raw cases are read once per month and only
+the small area x area x LG aggregate is cached.
+"""
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+MIGRATION_TOP = 3  # areas listed per direction
+MIGRATION_MIN_PCT = 0.5
+CACHED_MONTHS = 12
+
+
+def _codes(values, index):
+    """Positions of values in index (-1 if missing); categoricals are mapped per category"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        mapping = np.append(index.get_indexer(values.cat.categories), -1)
+        return mapping[values.cat.codes.to_numpy()]
+    return index.get_indexer(values.astype(str))
+
+
+def od_matrix(cases, areas, destinations, leistungsgruppen):
+    """Sparse case counts: residence area (rows) x destination * len(leistungsgruppen) + LG (columns)
+
+    cases: residence, destination, lg and an optional "cases" weight column
+    (for deliveries pre-aggregated by residence); unknown codes are dropped.
+    """
+    n_lg = len(leistungsgruppen)
+    residence = _codes(cases["residence"], pd.Index(areas))
+    destination = _codes(cases["destination"], pd.Index(destinations))
+    lg = _codes(cases["lg"], pd.Index(leistungsgruppen))
+    weights = cases["cases"].to_numpy() if "cases" in cases else np.ones(len(cases), dtype=np.int32)
+
+    valid = (residence >= 0) & (destination >= 0) & (lg >= 0)
+    return sp.coo_matrix(
+        (weights[valid], (residence[valid], destination[valid].astype(np.int64) * n_lg + lg[valid])),
+        shape=(len(areas), len(destinations) * n_lg),
+    ).tocsr()
+
+
+def destination_areas(dest_area, n_areas, n_lg):
+    """Sparse indicator mapping each (destination, LG) column to its (dest_area[destination], LG) column"""
+    rows = np.arange(len(dest_area) * n_lg)
+    cols = np.repeat(dest_area, n_lg) * n_lg + np.tile(np.arange(n_lg), len(dest_area))
+    return sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(rows), n_areas * n_lg))
+
+
+class FlowMatrix:
+    """Case counts of one month between areas (residence x treatment), in total and per LG"""
+
+    def __init__(self, areas, regions, counts, leistungsgruppen):
+        """counts: ndarray (residence area, treating area, LG)"""
+        self.areas = list(areas)
+        self.regions = list(regions)
+        self.leistungsgruppen = list(leistungsgruppen)
+        self.counts = counts
+        self.total = counts.sum(axis=2)
+
+    def matrix(self, lg=None):
+        """Residence (rows) x treating area (columns) case counts, of one LG or all"""
+        values = self.total if lg is None else self.counts[:, :, self.leistungsgruppen.index(lg)]
+        return pd.DataFrame(values, index=self.areas, columns=self.areas)
+
+    def migration(self, region, top=MIGRATION_TOP):
+        """Largest outbound (residents treated elsewhere) and inbound (cases from elsewhere) shares in %"""
+        idx = self.areas.index(region)
+        residents = self.total[idx]
+        treated = self.total[:, idx]
+
+        def largest(counts):
+            share = pd.Series(100 * counts / max(counts.sum(), 1), index=self.areas).drop(region)
+            share = share[share >= MIGRATION_MIN_PCT].nlargest(top)
+            return {area: round(float(pct), 1) for area, pct in share.items()}
+
+        return {"outbound": largest(residents), "inbound": largest(treated)}
+
+    def flows(self, region):
+        """Flows of a region's residents and into its sites (origin, destination, cases), largest first"""
+        idx = self.areas.index(region)
+        origin, destination = np.nonzero(self.total)
+        keep = (origin == idx) | (destination == idx)
+        df = pd.DataFrame({
+            "origin": np.asarray(self.areas, dtype=object)[origin[keep]],
+            "destination": np.asarray(self.areas, dtype=object)[destination[keep]],
+            "cases": self.total[origin[keep], destination[keep]],
+        })
+        return df.sort_values("cases", ascending=False, ignore_index=True)
+
+
+class PatientFlows:
+    """Monthly flow matrices of the sites' regions and the neighbouring states, cached by month"""
+
+    def __init__(self, sites, load_cases, leistungsgruppen, external, max_months=CACHED_MONTHS):
+        """sites: id, region; load_cases(month) -> case-level DataFrame (see od_matrix)"""
+        site_ids = sites["id"].astype(str).to_numpy()
+        site_regions = sites["region"].astype(str).to_numpy()
+        self.regions = list(dict.fromkeys(site_regions))
+        self.areas = self.regions + [area for area in external if area not in self.regions]
+        self.destinations = list(site_ids) + self.areas[len(self.regions):]
+        self.leistungsgruppen = list(leistungsgruppen)
+        self._load_cases = load_cases
+        self._max_months = max_months
+
+        area_index = pd.Index(self.areas)
+        dest_area = np.concatenate([
+            area_index.get_indexer(site_regions), np.arange(len(self.regions), len(self.areas))
+        ])
+        self._to_areas = destination_areas(dest_area, len(self.areas), len(self.leistungsgruppen))
+        self._months = OrderedDict()
+        self._lock = threading.Lock()
+
+    def aggregate(self, cases):
+        """FlowMatrix of case-level data"""
+        n_areas, n_lg = len(self.areas), len(self.leistungsgruppen)
+        od = od_matrix(cases, self.areas, self.destinations, self.leistungsgruppen)
+        counts = (od @ self._to_areas).toarray().reshape(n_areas, n_areas, n_lg)
+        return FlowMatrix(self.areas, self.regions, counts, self.leistungsgruppen)
+
+    def month(self, month):
+        """FlowMatrix of a month; raw cases are only loaded on the first request"""
+        key = pd.Timestamp(month).strftime("%Y-%m")
+        with self._lock:
+            if key in self._months:
+                self._months.move_to_end(key)
+                return self._months[key]
+
+        flows = self.aggregate(self._load_cases(key))
+
+        with self._lock:
+            self._months[key] = flows
+            while len(self._months) > self._max_months:
+                self._months.popitem(last=False)
+        return flows
+
+
+def flows_from_routine(sites, load_routine, leistungsgruppen, seed=42):
+    """PatientFlows over synthetic cases drawn from the monthly routine data (site_id, lg, cases)
+
+    Stands in for case-level §21 deliveries: each month's cases are
+    generated from load_routine(month) with a month-specific seed.
+    """
+    from synthetic_data import NEIGHBOUR_STATES, generate_cases
+
+    def load_cases(month):
+        month_seed = seed + pd.Timestamp(month).year * 12 + pd.Timestamp(month).month
+        return generate_cases(sites, load_routine(month), seed=month_seed)
+
+    return PatientFlows(sites, load_cases, leistungsgruppen, list(NEIGHBOUR_STATES))
@@ -0,0 +1,260 @@
+"""
+Reachability engine for emergency and specialist coverage
+Estimates travel times from every cell of a population grid to the nearest
+site offering each Leistungsgruppe
+
+Coordinates are projected to kilometres around the grid centre and the
+sites offering an LG are indexed in one KD-tree per LG, so the nearest
+site of all cells is a single vectorized query. Travel time is the
+straight-line distance times a road detour factor at an average speed.
+
+Emergency care (EMERGENCY) is indexed like an additional LG. When a site's
+portfolio changes, only the affected services are updated: an added one is
+compared against the cells directly, a removed one rebuilds its tree and
+re-queries only the cells the site was nearest to.
+"""
+
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Emergency care is tracked as an extra service next to the LGs. Every
+# supply level maps to a G-BA Notfallstufe, so all sites offer it.
+EMERGENCY = "Notfallversorgung"
+NOTFALLSTUFEN = {"Regelversorgung": 1, "Schwerpunktversorgung": 2, "Maximalversorgung": 3}
+EMERGENCY_MINUTES = 30
+SPECIALIZED_MINUTES = 60
+
+DETOUR_FACTOR = 1.3  # road distance / straight-line distance
+AVG_SPEED_KMH = 60
+
+# Share of the population reaching an LG within SPECIALIZED_MINUTES
+GAP_MISSING_PCT = 50
+GAP_UNDER_CAPACITY_PCT = 90
+
+BBOX_MARGIN_DEG = 0.2  # grid margin around sites outside Schleswig-Holstein
+
+
+def project_km(lat, lon, lat0, lon0):
+    """Equirectangular projection to kilometres around (lat0, lon0)"""
+    x = (np.asarray(lon, dtype=float) - lon0) * 111.320 * np.cos(np.radians(lat0))
+    y = (np.asarray(lat, dtype=float) - lat0) * 110.574
+    return np.column_stack([x, y])
+
+
+def _minutes(distance_km):
+    return distance_km * DETOUR_FACTOR / AVG_SPEED_KMH * 60
+
+
+class ReachabilityEngine:
+    """Travel time from each population cell to the nearest site per LG, aggregated by region"""
+
+    def __init__(self, grid, sites, portfolios, leistungsgruppen):
+        """grid: lat, lon, population; sites: id, region, lat, lon; portfolios: site id -> LGs (and EMERGENCY)"""
+        self.leistungsgruppen = list(leistungsgruppen)
+        self.services = self.leistungsgruppen + [EMERGENCY]
+        self._lg_index = {lg: i for i, lg in enumerate(self.services)}
+        self._lock = threading.Lock()
+
+        lat0, lon0 = grid["lat"].mean(), grid["lon"].mean()
+        self._site_ids = pd.Index(sites["id"].astype(str))
+        self._site_xy = project_km(sites["lat"], sites["lon"], lat0, lon0)
+        cells = project_km(grid["lat"], grid["lon"], lat0, lon0)
+
+        # Each cell belongs to the region of its nearest site; cells are
+        # sorted by region so a region's cells are a contiguous slice
+        _, nearest_site = cKDTree(self._site_xy).query(cells)
+        site_regions = sites["region"].astype(str).to_numpy()
+        self.regions = list(dict.fromkeys(site_regions))
+        region_code = pd.Index(self.regions).get_indexer(site_regions[nearest_site])
+        order = np.argsort(region_code, kind="stable")
+        self._cells = cells[order]
+        self._cell_region = region_code[order]
+        self._population = grid["population"].to_numpy(dtype=float)[order]
+        self._region_counts = np.bincount(region_code, minlength=len(self.regions))
+        self._region_starts = np.concatenate([[0], np.cumsum(self._region_counts)[:-1]])
+        self._region_population = np.bincount(
+            self._cell_region, weights=self._population, minlength=len(self.regions)
+        )
+
+        self._offers = np.zeros((len(self._site_ids), len(self.services)), dtype=bool)
+        for site_id, lgs in portfolios.items():
+            row = self._site_ids.get_loc(str(site_id))
+            for lg in lgs:
+                if lg in self._lg_index:
+                    self._offers[row, self._lg_index[lg]] = True
+
+        n_cells, n_lg = len(self._cells), len(self.services)
+        self._travel = np.full((n_cells, n_lg), np.inf, dtype=np.float32)
+        self._nearest = np.full((n_cells, n_lg), -1, dtype=np.int32)
+        self._trees = {}
+        for lg_idx in range(n_lg):
+            self._build_tree(lg_idx)
+            self._query(lg_idx, np.arange(n_cells))
+
+    def _build_tree(self, lg_idx):
+        offering = np.flatnonzero(self._offers[:, lg_idx])
+        self._trees[lg_idx] = (cKDTree(self._site_xy[offering]) if len(offering) else None, offering)
+
+    def _query(self, lg_idx, cells):
+        tree, offering = self._trees[lg_idx]
+        if tree is None:
+            self._travel[cells, lg_idx] = np.inf
+            self._nearest[cells, lg_idx] = -1
+            return
+        distance, pos = tree.query(self._cells[cells])
+        self._travel[cells, lg_idx] = _minutes(distance)
+        self._nearest[cells, lg_idx] = offering[pos]
+
+    def copy(self):
+        """Independent engine sharing the immutable grid and site arrays (e.g. for what-if scenarios)"""
+        other = copy.copy(self)
+        other._offers = self._offers.copy()
+        other._travel = self._travel.copy()
+        other._nearest = self._nearest.copy()
+        other._trees = dict(self._trees)
+        other._lock = threading.Lock()
+        return other
+
+    def portfolio(self, site_id):
+        """Services (LGs and EMERGENCY) a site currently offers"""
+        row = self._site_ids.get_loc(str(site_id))
+        return [service for service, offered in zip(self.services, self._offers[row]) if offered]
+
+    def update_site(self, site_id, leistungsgruppen):
+        """Replace the portfolio (LGs and EMERGENCY) of one site and update the travel times it affects"""
+        row = self._site_ids.get_loc(str(site_id))
+        new = np.zeros(len(self.services), dtype=bool)
+        new[[self._lg_index[lg] for lg in leistungsgruppen if lg in self._lg_index]] = True
+
+        with self._lock:
+            old = self._offers[row].copy()
+            self._offers[row] = new
+            for lg_idx in np.flatnonzero(new & ~old):
+                self._build_tree(lg_idx)
+                travel = _minutes(np.hypot(*(self._cells - self._site_xy[row]).T))
+                closer = travel < self._travel[:, lg_idx]
+                self._travel[closer, lg_idx] = travel[closer]
+                self._nearest[closer, lg_idx] = row
+            for lg_idx in np.flatnonzero(old & ~new):
+                self._build_tree(lg_idx)
+                self._query(lg_idx, np.flatnonzero(self._nearest[:, lg_idx] == row))
+
+    def _covered_population(self, minutes):
+        """Covered population per region (rows) and service; regions without cells sum to 0"""
+        covered = (self._travel <= minutes) * self._population[:, None]
+        n_lg = len(self.services)
+        bins = (self._cell_region[:, None] * n_lg + np.arange(n_lg)).ravel()
+        return np.bincount(bins, weights=covered.ravel(), minlength=len(self.regions) * n_lg).reshape(-1, n_lg)
+
+    def shares(self, minutes=SPECIALIZED_MINUTES):
+        """Population share (%) per region (rows) and service (columns) reaching a site within `minutes`"""
+        with self._lock:
+            covered = self._covered_population(minutes)
+        return pd.DataFrame(
+            100 * covered / np.maximum(self._region_population[:, None], 1),
+            index=self.regions, columns=self.services,
+        )
+
+    def state_shares(self, minutes=SPECIALIZED_MINUTES):
+        """Population share (%) of the whole grid reaching each service within `minutes`"""
+        with self._lock:
+            covered = self._covered_population(minutes).sum(axis=0)
+        return pd.Series(100 * covered / max(self._population.sum(), 1), index=self.services)
+
+    def state_share(self, service, minutes):
+        """Population share (%) of the whole grid reaching a service within `minutes`"""
+        lg_idx = self._lg_index[service]
+        with self._lock:
+            covered = self._population[self._travel[:, lg_idx] <= minutes].sum()
+        return 100 * covered / max(self._population.sum(), 1)
+
+    def coverage_inputs(self, region, site_ids, minutes=SPECIALIZED_MINUTES):
+        """Inputs for re-planning the portfolios of site_ids in a region
+
+        Returns the population of the region's cells, a sparse boolean
+        cells x site_ids matrix of which cells each site reaches within
+        `minutes` and a cells x services matrix of the cells that the other
+        sites' current portfolios already cover.
+        """
+        import scipy.sparse as sp
+
+        i = self.regions.index(region)
+        cells = slice(self._region_starts[i], self._region_starts[i] + self._region_counts[i])
+        xy, population = self._cells[cells], self._population[cells]
+        radius = minutes / 60 * AVG_SPEED_KMH / DETOUR_FACTOR
+        rows = self._site_ids.get_indexer([str(site_id) for site_id in site_ids])
+
+        reached = cKDTree(xy).query_ball_point(self._site_xy[rows], radius)
+        lengths = [len(cell_list) for cell_list in reached]
+        reach = sp.csc_matrix(
+            (np.ones(sum(lengths), dtype=bool), np.concatenate(reached).astype(np.int64),
+             np.concatenate([[0], np.cumsum(lengths)])),
+            shape=(len(xy), len(rows)),
+        )
+
+        others = np.ones(len(self._site_ids), dtype=bool)
+        others[rows] = False
+        outside = np.zeros((len(xy), len(self.services)), dtype=bool)
+        with self._lock:
+            for lg_idx in range(len(self.services)):
+                offering = np.flatnonzero(self._offers[:, lg_idx] & others)
+                if len(offering):
+                    distance, _ = cKDTree(self._site_xy[offering]).query(xy)
+                    outside[:, lg_idx] = _minutes(distance) <= minutes
+        return population, reach, outside
+
+    def population(self, region):
+        return int(self._region_population[self.regions.index(region)])
+
+    def accessibility(self, region):
+        """Emergency (<30 min) and average specialist (<60 min) coverage of a region in %"""
+        emergency = self.shares(EMERGENCY_MINUTES).loc[region, EMERGENCY]
+        specialized = self.shares(SPECIALIZED_MINUTES).loc[region, self.leistungsgruppen]
+        return {
+            "emergency_30min": int(emergency),
+            "specialized_60min": int(specialized.mean()),
+        }
+
+    def coverage_gaps(self, region):
+        """LGs that too little of a region's population reaches within 60 minutes, worst first"""
+        shares = self.shares(SPECIALIZED_MINUTES).loc[region, self.leistungsgruppen].sort_values()
+        gaps = []
+        for lg, share in shares.items():
+            if share < GAP_MISSING_PCT:
+                gaps.append({"lg": lg, "status": "missing", "share": int(share)})
+            elif share < GAP_UNDER_CAPACITY_PCT:
+                gaps.append({"lg": lg, "status": "under_capacity", "share": int(share)})
+        return gaps
+
+
+def grid_bbox(sites):
+    """Population grid bounding box: Schleswig-Holstein if all sites lie in it, else the sites' extent"""
+    from synthetic_data import BBOX_SH
+
+    lat, lon = sites["lat"].astype(float), sites["lon"].astype(float)
+    if lat.between(BBOX_SH[0], BBOX_SH[1]).all() and lon.between(BBOX_SH[2], BBOX_SH[3]).all():
+        return BBOX_SH
+    return (lat.min() - BBOX_MARGIN_DEG, lat.max() + BBOX_MARGIN_DEG,
+            lon.min() - BBOX_MARGIN_DEG, lon.max() + BBOX_MARGIN_DEG)
+
+
+def reachability_from_sites(sites, approvals, leistungsgruppen, seed=42, bbox=None):
+    """Build a ReachabilityEngine for sites with a synthetic population grid over bbox (default: grid_bbox)
+
+    A site's portfolio are its approved LGs plus EMERGENCY if its supply
+    level has a Notfallstufe.
+    """
+    from synthetic_data import generate_population_grid
+
+    approved = approvals[approvals["status"] == "approved"]
+    portfolios = approved.groupby("site_id", observed=True)["lg"].apply(lambda lgs: list(lgs.astype(str))).to_dict()
+    for site_id, level in zip(sites["id"].astype(str), sites["level"].astype(str)):
+        if level in NOTFALLSTUFEN:
+            portfolios.setdefault(site_id, []).append(EMERGENCY)
+
+    grid = generate_population_grid(sites, bbox=bbox or grid_bbox(sites), seed=seed)
+    return ReachabilityEngine(grid, sites, portfolios, leistungsgruppen)
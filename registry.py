@@ -0,0 +1,64 @@
+"""
+Hospital registry for the Hospital Reform Dashboard
+Indexes the hospital master data once for constant-time lookups
+"""
+
+
+class HospitalRegistry:
+    """Read-only index over hospital master data (region -> list of hospital dicts)"""
+
+    def __init__(self, hospitals):
+        self._by_id = {}
+        self._by_name = {}
+        self._by_region = {}
+        self._by_level = {}
+
+        for region, hosps in hospitals.items():
+            self._by_region.setdefault(region, [])
+            for hosp in hosps:
+                site = dict(hosp, region=region)
+
+                if site["id"] in self._by_id:
+                    raise ValueError(f"Duplicate site ID: {site['id']}")
+                if site["name"] in self._by_name:
+                    raise ValueError(f"Duplicate hospital name: {site['name']}")
+
+                self._by_id[site["id"]] = site
+                self._by_name[site["name"]] = site
+                self._by_region[region].append(site)
+                self._by_level.setdefault(site["level"], []).append(site)
+
+        self._by_region = {region: tuple(sites) for region, sites in self._by_region.items()}
+        self._by_level = {level: tuple(sites) for level, sites in self._by_level.items()}
+        self.ids = tuple(self._by_id)
+        self.names = tuple(self._by_name)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def get(self, site_id):
+        """Get a hospital by its stable site ID (None if unknown)"""
+        return self._by_id.get(site_id)
+
+    def by_name(self, name):
+        """Get a hospital by its name (None if unknown)"""
+        return self._by_name.get(name)
+
+    def in_region(self, region):
+        """Get all hospitals of a region"""
+        return self._by_region.get(region, ())
+
+    def with_level(self, level):
+        """Get all hospitals of a Versorgungsstufe"""
+        return self._by_level.get(level, ())
+
+    @property
+    def regions(self):
+        return tuple(self._by_region)
+
+    @property
+    def levels(self):
+        return tuple(self._by_level)
@@ -0,0 +1,365 @@
+"""
+What-if scenarios for the regional conferences
+Applies change sets (move an LG to another site, close a site) to a copy
+of the current state and recomputes only what the changes touch
+
+A ScenarioModel bundles the engines of a backend: KPI rollup, volume
+projection, reachability and alerts. Changes go through their incremental
+update paths (KPIRollup.update_hospital, ReachabilityEngine.update_site,
+AlertEngine.update/remove and the projection rows of the sites involved),
+so a scenario costs a copy of the state plus work proportional to the
+sites it changes. When an LG moves, its cases, staff and quality follow it
+to the target site; a closed site's approved LGs move to the nearest site
+offering them.
+
+Batches of scenarios run on a persistent process pool whose spawned
+workers build the model once from the active data source.
+
+Change sets are lists of dicts:
+    {"action": "move_lg", "lg": "Urologie", "from": "772003", "to": "772001"}
+    {"action": "close_site", "site": "771002"}
+"""
+
+import atexit
+from collections import OrderedDict, defaultdict
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from alerts import INDICATOR_LABELS
+
+ACTION_MOVE_LG = "move_lg"
+ACTION_CLOSE_SITE = "close_site"
+
+# Below this many scenarios the pool start-up costs more than it saves
+POOL_MIN_SCENARIOS = 8
+# Pools kept alive at once: the current data generation and the one before
+# (sessions pinned to the old snapshot until their next full run)
+MAX_POOLS = 2
+
+DAYS_PER_YEAR = 365
+
+
+def _approved(fact):
+    return int(fact is not None and fact["status"] == "approved")
+
+
+def _quality_delta(fact, previous):
+    """Change of quality_fulfilled/quality_total when a staffing row becomes fact (None = removed)"""
+    def counts(row):
+        if row is None or np.isnan(row["staff_required"]):
+            return 0, 0
+        return int(row["staff_actual"] >= row["staff_required"]), 1
+
+    (new_ok, new_total), (old_ok, old_total) = counts(fact), counts(previous)
+    return {"quality_fulfilled": new_ok - old_ok, "quality_total": new_total - old_total}
+
+
+class ScenarioModel:
+    """State of the hospital landscape that change sets are applied to"""
+
+    def __init__(self, sites, rollup, volumes, reachability, alerts):
+        """sites: id, name, region, level, lat, lon; volumes: VolumeProjection.table"""
+        from reachability import project_km
+
+        sites = sites.reset_index(drop=True)
+        self.sites = sites.assign(id=sites["id"].astype(str)).set_index("id", drop=False)
+        self.rollup = rollup
+        self.volumes = volumes
+        self.reachability = reachability
+        self.alerts = alerts
+        self.closed = set()
+        self._xy = project_km(self.sites["lat"], self.sites["lon"], self.sites["lat"].mean(), self.sites["lon"].mean())
+
+    def copy(self):
+        """Independent model to apply a scenario to"""
+        other = ScenarioModel.__new__(ScenarioModel)
+        other.sites = self.sites
+        other._xy = self._xy
+        other.rollup = self.rollup.copy()
+        other.volumes = self.volumes.copy()
+        other.reachability = self.reachability.copy()
+        other.alerts = self.alerts.copy()
+        other.closed = set(self.closed)
+        return other
+
+    def approved_lgs(self, site_id):
+        """LGs approved at a site"""
+        facts = self.alerts.facts
+        site_facts = facts[facts.index.get_level_values("site_id") == str(site_id)]
+        return list(site_facts.index.get_level_values("lg")[site_facts["status"] == "approved"])
+
+    def _sync_reachability(self, site_ids):
+        from reachability import EMERGENCY
+
+        for site_id in site_ids:
+            emergency = EMERGENCY in self.reachability.portfolio(site_id) and site_id not in self.closed
+            self.reachability.update_site(site_id, self.approved_lgs(site_id) + ([EMERGENCY] if emergency else []))
+
+    def move_lg(self, lg, source, target):
+        """Move an approved LG with its cases, staff and quality from source to target"""
+        self._move([(lg, str(source), str(target))])
+
+    def _move(self, moves):
+        """Apply LG moves (lg, source, target; one per target x LG) in one pass over each engine"""
+        from volume_projection import volume_status
+
+        facts = self.alerts.facts
+        deltas = defaultdict(lambda: defaultdict(float))  # site -> measure -> change
+        removed, targets, new_facts, volume_rows, volume_keys = [], [], [], [], []
+        for lg, source, target in moves:
+            key, target_key = (source, lg), (target, lg)
+            if key not in facts.index or facts.loc[key, "status"] != "approved":
+                raise ValueError(f"LG {lg} is not approved at site {source}")
+            if target in self.closed or target == source or target not in self.sites.index:
+                raise ValueError(f"Cannot move LG {lg} to site {target}")
+
+            moved = facts.loc[key]
+            existing = facts.loc[target_key] if target_key in facts.index else None
+            volume = self.volumes.loc[key] if key in self.volumes.index else None
+            cases = 0.0 if volume is None else float(volume["cases_12m"])
+            occupied = cases * np.nan_to_num(moved["avg_stay"]) / DAYS_PER_YEAR
+
+            # The target's fact: staff and projected cases add up, its own quality indicators win
+            new = moved.copy()
+            new[["region", "name", "status"]] = [self.sites.loc[target, "region"], self.sites.loc[target, "name"],
+                                                 "approved"]
+            if existing is not None:
+                for column in ["staff_required", "staff_actual", "projected_cases"]:
+                    if not np.isnan(existing[column]):
+                        new[column] = np.nansum([existing[column], moved[column]])
+                for column in INDICATOR_LABELS:
+                    if not np.isnan(existing[column]):
+                        new[column] = existing[column]
+
+            # KPI rollup: the application, its staffing row and its occupied beds change sites
+            for site_id, changes in [
+                (source, {"lg_approved": -1, "lg_total": -1, "occupied_beds": -occupied, **_quality_delta(None, moved)}),
+                (target, {"lg_approved": 1 - _approved(existing), "lg_total": int(existing is None),
+                          "occupied_beds": occupied, **_quality_delta(new, existing)}),
+            ]:
+                for measure, change in changes.items():
+                    deltas[site_id][measure] += change
+
+            if volume is not None:
+                row = volume.copy()
+                if target_key in self.volumes.index:
+                    row[["cases_12m", "projected"]] += self.volumes.loc[target_key, ["cases_12m", "projected"]]
+                volume_rows.append(row)
+                volume_keys.append(target_key)
+            removed.append(key)
+            targets.append(target_key)
+            new_facts.append(new)
+
+        for site_id, changes in deltas.items():
+            current = self.rollup.facts.loc[site_id]
+            self.rollup.update_hospital(site_id, **{measure: current[measure] + change
+                                                    for measure, change in changes.items()})
+
+        # Volume projection rows of the targets replace those of both sites
+        if volume_rows:
+            rows = pd.DataFrame(volume_rows)
+            rows.index = pd.MultiIndex.from_tuples(volume_keys, names=self.volumes.index.names)
+            rows["status"] = volume_status(rows["projected"], rows["threshold"])
+            kept = self.volumes.drop(index=removed + list(rows.index), errors="ignore")
+            self.volumes = pd.concat([kept, rows]).astype(self.volumes.dtypes)
+
+        # Alerts: drop the source facts, re-evaluate the target facts
+        self.alerts.remove(removed)
+        self.alerts.update(pd.DataFrame(new_facts).set_index(
+            pd.MultiIndex.from_tuples(targets, names=facts.index.names)
+        ))
+        self._sync_reachability(dict.fromkeys(site_id for _, source, target in moves for site_id in (source, target)))
+
+    def close_site(self, site_id):
+        """Close a site: its approved LGs move to the nearest open site offering them, the rest is dropped"""
+        site_id = str(site_id)
+        if site_id in self.closed:
+            raise ValueError(f"Site {site_id} is already closed")
+        self.closed.add(site_id)
+
+        moves = [(lg, site_id, self._nearest_target(site_id, lg)) for lg in self.approved_lgs(site_id)]
+        if moves:
+            self._move(moves)
+        facts = self.alerts.facts
+        self.alerts.remove(facts.index[facts.index.get_level_values("site_id") == site_id])
+        self.volumes = self.volumes[self.volumes.index.get_level_values("site_id") != site_id]
+
+        self.rollup.update_hospital(site_id, lg_approved=0, lg_total=0, quality_fulfilled=0, quality_total=0,
+                                    occupied_beds=0, beds=0)
+        self._sync_reachability([site_id])
+
+    def _nearest_target(self, site_id, lg):
+        """Nearest open site offering lg (or any open site if none does)"""
+        facts = self.alerts.facts
+        approved = facts[(facts.index.get_level_values("lg") == lg) & (facts["status"] == "approved")]
+        candidates = pd.Index(approved.index.get_level_values("site_id")).difference(list(self.closed))
+        if candidates.empty:
+            candidates = self.sites.index.difference(list(self.closed))
+        positions = self.sites.index.get_indexer(candidates)
+        distance = np.hypot(*(self._xy[positions] - self._xy[self.sites.index.get_loc(site_id)]).T)
+        return candidates[int(np.argmin(distance))]
+
+    def apply(self, changes):
+        """Apply a change set in order"""
+        for change in changes:
+            if change["action"] == ACTION_MOVE_LG:
+                self.move_lg(change["lg"], change["from"], change["to"])
+            elif change["action"] == ACTION_CLOSE_SITE:
+                self.close_site(change["site"])
+            else:
+                raise ValueError(f"Unknown action: {change['action']}")
+        return self
+
+    def summary(self, region=None):
+        """KPIs of the current state for the state (and one region)"""
+        from reachability import EMERGENCY, EMERGENCY_MINUTES, SPECIALIZED_MINUTES
+
+        kpis = self.rollup.state_kpis()
+        alerts = self.alerts.alerts()
+        result = {
+            "lg_approved_pct": kpis["lg_approved"]["percentage"],
+            "quality_fulfilled_pct": kpis["quality_fulfilled"]["percentage"],
+            "bed_occupancy": kpis["bed_occupancy"]["current"],
+            "emergency_30min": round(float(self.reachability.state_shares(EMERGENCY_MINUTES)[EMERGENCY]), 1),
+            "specialized_60min": round(float(
+                self.reachability.state_shares(SPECIALIZED_MINUTES)[self.reachability.leistungsgruppen].mean()
+            ), 1),
+            "below_mindestmenge": int(self.volumes["status"].isin(["warning", "critical"]).sum()),
+            "alerts_critical": sum(alert["sites"] for alert in alerts if alert["priority"] == "critical"),
+            "alerts_warning": sum(alert["sites"] for alert in alerts if alert["priority"] == "warning"),
+        }
+        if region is not None:
+            accessibility = self.reachability.accessibility(region)
+            result["region_lg_approved_pct"] = int(self.rollup.regional_kpis().loc[region, "lg_approved_pct"])
+            result["region_emergency_30min"] = accessibility["emergency_30min"]
+            result["region_specialized_60min"] = accessibility["specialized_60min"]
+        return result
+
+
+def describe(changes, site_names):
+    """Short German description of a change set"""
+    parts = []
+    for change in changes:
+        if change["action"] == ACTION_MOVE_LG:
+            parts.append(f"{change['lg']}: {site_names[change['from']]} → {site_names[change['to']]}")
+        else:
+            parts.append(f"Schließung {site_names[change['site']]}")
+    return "; ".join(parts)
+
+
+def model_from_backend(backend):
+    """ScenarioModel over the engines of a backend (mock_data module or StoreBackend)"""
+    sites = backend.sites if hasattr(backend, "sites") else backend.get_dataset()["sites"]
+    return ScenarioModel(
+        sites,
+        backend.get_kpi_rollup(),
+        backend.get_volume_projection().table,
+        backend.get_reachability(),
+        backend.get_alert_engine(),
+    )
+
+
+def evaluate(model, changes, region=None):
+    """Summary of a change set applied to a copy of model (baseline stays unchanged)"""
+    return model.copy().apply(changes).summary(region)
+
+
+# --- Batches on a process pool ---------------------------------------------------
+
+_pools = OrderedDict()  # (processes, store_root, months, versions) -> pool, least recently used first
+_pools_lock = threading.Lock()
+_worker_model = None
+
+
+def get_model():
+    """Scenario model of the data_provider snapshot, built on first use (kept with the snapshot)"""
+    import data_provider
+
+    snapshot = data_provider.current_snapshot()
+    return snapshot.get(("scenario_model",), lambda: model_from_backend(snapshot.backend))[0]
+
+
+def _init_worker(store_root, months):
+    """Build the model from the parent's data source in a pool worker"""
+    global _worker_model
+    if store_root:
+        from data_store import open_backend
+
+        backend = open_backend(store_root, months=months)
+    else:
+        import mock_data as backend
+    _worker_model = model_from_backend(backend)
+
+
+def worker_model():
+    """The model of the current pool worker (for functions submitted to get_pool())"""
+    return _worker_model
+
+
+def _evaluate_in_worker(args):
+    changes, region = args
+    return evaluate(_worker_model, changes, region)
+
+
+def get_pool(processes):
+    """Persistent process pool whose workers hold the model of the active data source and generation
+
+    One pool per data generation; beyond MAX_POOLS the least recently used
+    one is retired without cancelling its in-flight work.
+    """
+    import data_provider
+
+    backend = data_provider.get_backend()
+    store_root = getattr(getattr(backend, "store", None), "root", None)
+    months = getattr(backend, "months", None)
+    versions = getattr(backend, "versions", None)  # a replaced partition keeps its month
+    key = (processes, store_root, tuple(sorted(months.items())) if months else None,
+           tuple(sorted(versions.items())) if versions else None)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(store_root, months),
+            )
+            while len(_pools) > MAX_POOLS:
+                _, retired = _pools.popitem(last=False)
+                retired.shutdown(wait=False)  # queued and running work still finishes
+        _pools.move_to_end(key)
+        return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(cancel_futures=True)
+        _pools.clear()
+
+
+def evaluate_batch(scenarios, region=None, processes=None):
+    """Summary of the current state and summaries of several change sets
+
+    Runs on a persistent process pool (reused across calls) when there are
+    at least POOL_MIN_SCENARIOS change sets and more than one process.
+    """
+    model = get_model()
+    baseline = model.summary(region)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(scenarios) < POOL_MIN_SCENARIOS:
+        results = [evaluate(model, changes, region) for changes in scenarios]
+    else:
+        results = list(get_pool(processes).map(_evaluate_in_worker, [(changes, region) for changes in scenarios]))
+    return baseline, results
+
+
+def compare(baseline, results, names):
+    """Table of scenario summaries (rows) with the baseline as first row"""
+    return pd.DataFrame([baseline] + list(results), index=["Ist-Zustand"] + list(names))
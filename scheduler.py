@@ -0,0 +1,195 @@
+"""
+Background refresh scheduler for the Hospital Reform Dashboard
+Ingests new deliveries on the cadences of the concept doc and swaps in a
+pre-warmed data snapshot at the daily 17:00 refresh
+
+One daemon thread per server process wakes at every KPI refresh (see
+data_provider.refresh_at). It fetches the external sources into the inbox
+(KH_INBOX) when KH_SOURCES_URL is set (see connectors.py) and ingests the
+CSV files in the inbox (named <source>_*.csv) of every source whose cadence
+is due at that 17:00 slot: LG approvals daily, routine data weekly and
+staffing in the first slot of every month. It then builds the next data
+snapshot, which also picks up partitions written by other processes.
+prewarm() runs on the new snapshot before it is swapped in, so the first
+user after a refresh gets cached KPIs, maps, alert tables and comparison
+matrices. The app starts the scheduler after its first page is rendered;
+the snapshot of the server start is pre-warmed PREWARM_DELAY seconds later.
+
+Set KH_SCHEDULER=off to disable the scheduler (e.g. for benchmarks).
+"""
+
+import glob
+import os
+import threading
+from datetime import datetime, timedelta
+
+import data_provider
+from data_provider import FRESHNESS_QUALITY, FRESHNESS_ROUTINE, FRESHNESS_STRUCTURAL, LEISTUNGSGRUPPEN, refresh_at
+
+# Ingestion cadence per source (concept doc, section 8.1 "Datenfrische"); the
+# names are data_store.SOURCE_*, which is not imported here to keep pandas and
+# pyarrow off the cold start (the scheduler is imported by every script run)
+CADENCES = {
+    "lg_approvals": FRESHNESS_STRUCTURAL,  # LG-Status: täglich
+    "routine": FRESHNESS_ROUTINE,  # Routinedaten: wöchentlich
+    "staffing": FRESHNESS_QUALITY,  # Personalausstattung (Qualitätskriterien): monatlich
+}
+
+# Seconds between the start (at the end of the first script run) and pre-warming the first snapshot,
+# so the first visitor's page and its follow-up reruns do not compete with pandas/pyarrow imports
+PREWARM_DELAY = 5
+
+
+def next_ingest(freshness, last):
+    """Run slot from which a source ingested at the run slot last is due again
+
+    Daily and weekly cadences count whole days from the slot; monthly
+    sources are due at the first slot of the next calendar month.
+    """
+    if freshness == FRESHNESS_QUALITY:
+        return (last.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return last + timedelta(days=1 if freshness == FRESHNESS_STRUCTURAL else 7)
+
+
+def prewarm():
+    """Compute the expensive view artifacts in the calling thread's snapshot (and the chart cache)"""
+    import scenarios
+    from charts import patient_flow_sankey, regional_map
+
+    data_provider.get_state_kpis()
+    regional_map(data_provider.get_regional_status())
+    data_provider.get_critical_alerts()
+    data_provider.get_timeline_events()
+
+    for region in data_provider.get_registry().regions:
+        data_provider.get_hospitals_for_region(region)
+        data_provider.get_regional_coverage_analysis(region)
+        patient_flow_sankey(data_provider.get_regional_patient_flows(region))
+    scenarios.get_model()
+
+    for lg in LEISTUNGSGRUPPEN:
+        data_provider.get_quality_data_for_lg(lg)
+        data_provider.get_quality_trends(lg)
+        data_provider.get_volume_projection_for_lg(lg)
+        data_provider.get_hospital_comparison_page(
+            lg, sort="hospital", descending=False, region=None, level=None, status=None, page=1
+        )  # first page of the Qualität view (same arguments, same cache key)
+
+
+class RefreshScheduler:
+    """Daemon thread that ingests due sources and refreshes the data snapshot at every KPI refresh"""
+
+    def __init__(self, inbox=None, sources_url=None):
+        self.inbox = inbox
+        self.sources_url = sources_url
+        self.last_fetch = []
+        self.last_ingest = {source: None for source in CADENCES}
+        self.last_run = None
+        self.next_run = None
+        self.last_result = []
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def due(self, source, slot):
+        last = self.last_ingest[source]
+        return last is None or next_ingest(CADENCES[source], last) <= slot
+
+    def ingest(self, slot):
+        """Ingest the inbox files of all sources due at the run slot into the store of the active backend"""
+        from data_store import DataStore
+        from ingest import ingest_file
+
+        store = getattr(data_provider.get_backend(), "store", None)
+        if not isinstance(store, DataStore) or not self.inbox:  # databases are loaded by their own ETL
+            return []
+
+        results = []
+        for source in CADENCES:
+            if not self.due(source, slot):
+                continue
+            for path in sorted(glob.glob(os.path.join(self.inbox, f"{source}_*.csv"))):
+                results.append(ingest_file(store, source, path))
+            self.last_ingest[source] = slot
+        return results
+
+    def fetch(self):
+        """Fetch all external sources into the inbox (concurrently, conditional requests)"""
+        if not (self.sources_url and self.inbox):
+            return []
+        import connectors
+
+        return connectors.fetch(self.sources_url, self.inbox)
+
+    def run_once(self, slot=None):
+        """Fetch sources, ingest due sources, then build, pre-warm and swap in the next snapshot
+
+        slot is the 17:00 run slot the scheduler woke up for (default: now);
+        cadences count from it, so a wake-up a few ms early does not skip a day.
+        """
+        now = datetime.now()
+        slot = slot or now
+        self.last_fetch = self.fetch()
+        self.last_result = self.ingest(slot)
+        ingested = datetime.now()
+        data_provider.refresh(wait=True)
+        if data_provider.current_snapshot().created < ingested:
+            data_provider.refresh(wait=True)  # the refresh joined was started before the ingestion finished
+        self.last_run = now
+
+    def _run(self):
+        if self._stop.wait(PREWARM_DELAY):
+            return
+        try:
+            prewarm()  # the snapshot built at server start
+        except Exception as error:  # surfaced in the Planung view instead of dying silently with the thread
+            self.error = error
+
+        while True:
+            # From the last slot, so an early wake-up does not run the same slot twice
+            self.next_run = refresh_at(max(datetime.now(), self.next_run or datetime.min))
+            timeout = (self.next_run - datetime.now()).total_seconds()
+            if self._stop.wait(max(timeout, 0)):
+                return
+            try:
+                self.run_once(self.next_run)
+                self.error = None
+            except Exception as error:
+                self.error = error
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start(inbox=None, sources_url=None):
+    """Start the process-wide scheduler once (no-op afterwards or with KH_SCHEDULER=off)"""
+    global _scheduler
+    if os.environ.get("KH_SCHEDULER", "").lower() == "off":
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            data_provider.on_refresh(prewarm)
+            _scheduler = RefreshScheduler(
+                inbox or os.environ.get("KH_INBOX"), sources_url or os.environ.get("KH_SOURCES_URL")
+            ).start()
+        return _scheduler
+
+
+def get_scheduler():
+    """The running scheduler, or None"""
+    return _scheduler
+
+
+def next_refresh():
+    """Point in time of the next data refresh"""
+    if _scheduler is not None and _scheduler.next_run is not None:
+        return _scheduler.next_run
+    return data_provider.current_snapshot().expires
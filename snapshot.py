@@ -0,0 +1,94 @@
+"""
+Process-wide immutable data snapshots
+One Snapshot holds the backend of one data generation and the getter
+values computed from it, shared read-only by all sessions
+
+Values are frozen when they enter a snapshot: dicts and lists become
+FrozenDict/FrozenList (still dict/list instances, so pandas, json and
+Streamlit accept them) and NumPy arrays are made read-only. pandas objects
+are shared as they are; with copy-on-write (always on since pandas 3, which
+requirements.txt requires) a session modifying a returned DataFrame gets
+its own copy and never changes the snapshot. A refresh builds a new Snapshot and data_provider swaps the
+reference in one assignment, so a reader sees either the old or the new
+generation, never a mix.
+"""
+
+import sys
+import threading
+from datetime import datetime
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("snapshot data is read-only")
+
+
+class FrozenDict(dict):
+    """dict that cannot be modified"""
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    """list that cannot be modified"""
+
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(value):
+    """Read-only version of a getter value (recursively for dicts, lists and tuples)"""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    np = sys.modules.get("numpy")  # not imported here: a view without NumPy data never loads it
+    if np is not None and isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+    return value
+
+
+class Snapshot:
+    """Backend of one data generation and the frozen getter values computed from it"""
+
+    def __init__(self, backend, generation, expires=None, values=None, created=None):
+        self.backend = backend
+        self.generation = generation
+        self.created = created or datetime.now()
+        self.expires = expires
+        self._values = dict(values or {})
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Value of key, computed (and frozen) on first use; returns (value, hit)"""
+        with self._lock:
+            if key in self._values:
+                return self._values[key], True
+
+        value = freeze(compute())
+
+        with self._lock:
+            return self._values.setdefault(key, value), False
+
+    def values(self, keep=None):
+        """Computed values (optionally only the keys for which keep(key) is true), e.g. to carry over"""
+        with self._lock:
+            return {key: value for key, value in self._values.items() if keep is None or keep(key)}
+
+    def count(self, name):
+        """Number of computed values of one getter"""
+        with self._lock:
+            return sum(key[0] == name for key in self._values)
+
+    def expired(self, now):
+        return self.expires is not None and now >= self.expires
@@ -0,0 +1,382 @@
+"""
+SQL repository for the Hospital Reform Dashboard
+Serves the data store interface from SQLite (local) or Postgres (production)
+
+SQLRepository implements months()/read()/write() of data_store.DataStore on
+one table per source, so StoreBackend and its engines run on it unchanged.
+Connections come from a fixed-size pool. Every statement is generated from
+a fixed template per source, column set and filter set (membership filters
+bind one array parameter instead of a variable IN list), so SQLite's
+per-connection statement cache and Postgres server-side prepared statements
+(psycopg, prepare_threshold=0) reuse their plans. batch() sends several
+queries in one round trip (a psycopg pipeline on Postgres).
+
+SQLBackend answers the per-hospital getters with one round trip each
+instead of one query per hospital: the regional hospital list is a single
+join, the site profile a single batch.
+
+Build a local database from synthetic data and serve the dashboard from it:
+    python data_store.py build sqlite:///data/dashboard.db --sites 1700 --months 36
+    KH_DATA_STORE=sqlite:///data/dashboard.db streamlit run app.py
+"""
+
+import json
+import queue
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data_store import (
+    INDICATORS, SOURCE_HOSPITALS, SOURCE_LG_APPROVALS, SOURCE_ROUTINE, SOURCE_STAFFING, SOURCES, StoreBackend,
+    month_key,
+)
+from instrumentation import KIND_GETTER, timed
+from mock_data import hospital_status, rejection_reason
+
+SQLITE = "sqlite"
+POSTGRES = "postgres"
+
+POOL_SIZE = 4
+
+# Columns per source in DataStore order (partition keys month and region last)
+TABLES = {
+    SOURCE_HOSPITALS: {
+        "id": "TEXT", "name": "TEXT", "level": "TEXT", "beds": "INTEGER", "lat": "REAL", "lon": "REAL",
+        "funds_requested": "REAL", "funds_granted": "DATE", "month": "TEXT", "region": "TEXT",
+    },
+    SOURCE_LG_APPROVALS: {
+        "site_id": "TEXT", "lg": "TEXT", "status": "TEXT", "decided": "DATE", "month": "TEXT", "region": "TEXT",
+    },
+    SOURCE_ROUTINE: {
+        "site_id": "TEXT", "lg": "TEXT", "cases": "INTEGER", "complication_rate": "REAL", "mortality_rate": "REAL",
+        "satisfaction": "REAL", "avg_stay": "REAL", "month": "TEXT", "region": "TEXT",
+    },
+    SOURCE_STAFFING: {
+        "site_id": "TEXT", "lg": "TEXT", "staff_required": "INTEGER", "staff_actual": "INTEGER", "month": "TEXT",
+        "region": "TEXT",
+    },
+}
+
+# Row order of read(): partition order as in DataStore, then the site
+ORDER = {
+    SOURCE_HOSPITALS: ("month", "region", "id"),
+    SOURCE_LG_APPROVALS: ("month", "region", "site_id"),
+    SOURCE_ROUTINE: ("month", "region", "site_id"),
+    SOURCE_STAFFING: ("month", "region", "site_id"),
+}
+
+INDEXES = {
+    SOURCE_HOSPITALS: [("month", "region"), ("month", "id")],
+    SOURCE_LG_APPROVALS: [("month", "region"), ("site_id", "month")],
+    SOURCE_ROUTINE: [("month", "region"), ("site_id", "month"), ("lg", "month")],
+    SOURCE_STAFFING: [("month", "region"), ("site_id", "month")],
+}
+
+# Write counter per source (StoreBackend carries engines over only while it is unchanged)
+VERSIONS_TABLE = "source_versions"
+QUERY_VERSIONS = f"SELECT source, version FROM {VERSIONS_TABLE}"
+BUMP_VERSION = (f"INSERT INTO {VERSIONS_TABLE} (source, version) VALUES (?, 1) "
+                f"ON CONFLICT (source) DO UPDATE SET version = {VERSIONS_TABLE}.version + 1")
+
+QUERY_MONTHS = " UNION ".join(f"SELECT DISTINCT '{source}' AS source, month FROM {source}" for source in SOURCES)
+
+# Hospitals of a region with their LG and staffing aggregates (one join instead of one query per hospital)
+QUERY_REGION_HOSPITALS = f"""
+WITH site_approvals AS (
+    SELECT site_id, COUNT(*) AS lg_total, SUM(CASE WHEN status = 'approved' THEN 1 ELSE 0 END) AS lg_approved
+    FROM {SOURCE_LG_APPROVALS} WHERE month = ? AND region = ? GROUP BY site_id
+), site_staffing AS (
+    SELECT site_id, SUM(staff_actual) AS staff,
+           MIN(CASE WHEN staff_actual >= staff_required THEN 1 ELSE 0 END) AS quality_ok
+    FROM {SOURCE_STAFFING} WHERE month = ? AND region = ? GROUP BY site_id
+)
+SELECT h.id, h.name, h.level, h.beds,
+       COALESCE(a.lg_total, 0) AS lg_total, COALESCE(a.lg_approved, 0) AS lg_approved,
+       COALESCE(s.quality_ok, 1) AS quality_ok, COALESCE(s.staff, 0) AS staff
+FROM {SOURCE_HOSPITALS} h
+LEFT JOIN site_approvals a ON a.site_id = h.id
+LEFT JOIN site_staffing s ON s.site_id = h.id
+WHERE h.month = ? AND h.region = ?
+ORDER BY h.id
+"""
+
+# Site profile: LG statuses, staffing and case-weighted indicators (sent as one batch)
+QUERY_SITE_APPROVALS = f"SELECT lg, status FROM {SOURCE_LG_APPROVALS} WHERE month = ? AND site_id = ?"
+QUERY_SITE_STAFFING = f"""
+SELECT COALESCE(SUM(staff_actual), 0) AS staff,
+       COALESCE(MIN(CASE WHEN staff_actual >= staff_required THEN 1 ELSE 0 END), 1) AS quality_ok
+FROM {SOURCE_STAFFING} WHERE month = ? AND site_id = ?
+"""
+QUERY_SITE_INDICATORS = f"""
+SELECT SUM(cases) AS cases, {", ".join(f"SUM({col} * cases) AS {col}_weighted, AVG({col}) AS {col}_mean"
+                                        for col in INDICATORS)}
+FROM {SOURCE_ROUTINE} WHERE month >= ? AND month <= ? AND site_id = ?
+"""
+
+
+class ConnectionPool:
+    """Fixed-size pool of DB-API connections, created on first use and shared by all threads"""
+
+    def __init__(self, connect, size=POOL_SIZE):
+        self._connect = connect
+        self._size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection (blocks while all are in use); commits on success, rolls back on errors"""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self._size
+            if create:
+                self._created += 1
+        return self._connect() if create else self._idle.get()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _connector(url):
+    """(dialect, connect function) for a database URL"""
+    if url.startswith("sqlite:///"):
+        import sqlite3
+
+        path = url[len("sqlite:///"):]
+        return SQLITE, lambda: sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+    if url.startswith(("postgresql://", "postgres://")):
+        import psycopg
+
+        return POSTGRES, lambda: psycopg.connect(url, prepare_threshold=0)
+    raise ValueError(f"Unsupported database URL: {url}")
+
+
+class SQLRepository:
+    """Data store interface (months/read/write) on a pooled SQLite or Postgres database"""
+
+    def __init__(self, url, pool_size=POOL_SIZE):
+        self.root = url
+        self.dialect, connect = _connector(url)
+        self.pool = ConnectionPool(connect, pool_size)
+        self.round_trips = 0
+        self._lock = threading.Lock()
+        self._schema = False
+
+    def _sql(self, sql):
+        return sql.replace("?", "%s") if self.dialect == POSTGRES else sql
+
+    def _in(self, column):
+        """Membership filter with one bound parameter (see _param)"""
+        if self.dialect == POSTGRES:
+            return f"{column} = ANY(?)"
+        return f"{column} IN (SELECT value FROM json_each(?))"
+
+    def _param(self, values):
+        return list(values) if self.dialect == POSTGRES else json.dumps(list(values))
+
+    def _count(self):
+        with self._lock:
+            self.round_trips += 1
+
+    def batch(self, queries):
+        """Run (sql, params) queries in one round trip; returns one DataFrame per query"""
+        self._count()
+        with self.pool.connection() as conn:
+            if self.dialect == POSTGRES:
+                with conn.pipeline():
+                    cursors = [conn.execute(self._sql(sql), params) for sql, params in queries]
+            else:
+                cursors = [conn.execute(sql, params) for sql, params in queries]
+            return [
+                pd.DataFrame.from_records(cursor.fetchall(), columns=[col[0] for col in cursor.description])
+                for cursor in cursors
+            ]
+
+    def query(self, sql, params=()):
+        return self.batch([(sql, params)])[0]
+
+    def create_schema(self):
+        with self.pool.connection() as conn:
+            for source, columns in TABLES.items():
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {source} "
+                             f"({', '.join(f'{name} {kind}' for name, kind in columns.items())})")
+                for index in INDEXES[source]:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {source}_{'_'.join(index)} "
+                                 f"ON {source} ({', '.join(index)})")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (source TEXT PRIMARY KEY, version INTEGER)")
+        self._schema = True
+
+    def months(self, source=None):
+        """Months present for a source, oldest first (all sources in one query: dict by source)"""
+        months = {name: [] for name in SOURCES}
+        for name, month in self.query(QUERY_MONTHS).itertuples(index=False):
+            months[name].append(month)
+        months = {name: sorted(values) for name, values in months.items()}
+        return months if source is None else months[source]
+
+    def latest_month(self, source):
+        months = self.months(source)
+        return months[-1] if months else None
+
+    def versions(self):
+        """Write counter per source (see DataStore.versions)"""
+        if not self._schema:
+            self.create_schema()
+        versions = dict.fromkeys(SOURCES, 0)
+        versions.update(self.query(QUERY_VERSIONS).itertuples(index=False))
+        return versions
+
+    def write(self, source, df, month=None):
+        """Write a DataFrame to a source table, replacing the month/region pairs it covers"""
+        if not self._schema:
+            self.create_schema()
+
+        columns = TABLES[source]
+        df = df.copy()
+        if month is not None:
+            df["month"] = month_key(month)
+        elif not pd.api.types.is_string_dtype(df["month"]):
+            df["month"] = pd.to_datetime(df["month"]).dt.strftime("%Y-%m")
+        for name, kind in columns.items():
+            if kind == "DATE":
+                df[name] = pd.to_datetime(df[name]).dt.strftime("%Y-%m-%d")
+            elif df[name].dtype == "category":
+                df[name] = df[name].astype(str)
+        df = df[list(columns)].astype(object).where(df[list(columns)].notna(), None)
+
+        pairs = df[["month", "region"]].drop_duplicates().itertuples(index=False)
+        insert = f"INSERT INTO {source} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        self._count()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(self._sql(f"DELETE FROM {source} WHERE month = ? AND region = ?"), list(pairs))
+            cursor.executemany(self._sql(insert), list(df.itertuples(index=False, name=None)))
+            cursor.execute(self._sql(BUMP_VERSION), (source,))
+
+    def read(self, source, columns=None, **equals):
+        """Read a source with column projection and equality/membership filters (see DataStore.read)"""
+        columns = list(columns or TABLES[source])
+        conditions, params = [], []
+        for column, value in equals.items():
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(self._in(column))
+                params.append(self._param(value))
+            else:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = ", ".join(ORDER[source])
+        df = self.query(f"SELECT {', '.join(columns)} FROM {source}{where} ORDER BY {order}", params)
+
+        for column in df.columns:
+            if column == "month":
+                df[column] = pd.to_datetime(df[column], format="%Y-%m")
+            elif TABLES[source][column] == "DATE":
+                df[column] = pd.to_datetime(df[column], format="%Y-%m-%d")
+        return df
+
+
+class SQLBackend(StoreBackend):
+    """StoreBackend on a SQLRepository with one round trip per hospital list and site profile"""
+
+    def __init__(self, repository, previous=None, months=None):
+        if months is None:
+            months = {source: tuple(values) for source, values in repository.months().items()}
+        super().__init__(repository, previous=previous, months=months)
+
+    @timed(KIND_GETTER)
+    def get_hospitals_for_region(self, region):
+        latest = self._latest
+        rows = self.store.query(QUERY_REGION_HOSPITALS, (
+            latest(SOURCE_LG_APPROVALS), region, latest(SOURCE_STAFFING), region, latest(SOURCE_HOSPITALS), region,
+        ))
+
+        detailed_hospitals = []
+        for hosp in rows.itertuples(index=False):
+            lg_total, lg_approved = int(hosp.lg_total), int(hosp.lg_approved)
+            quality_ok = bool(hosp.quality_ok)
+            status, warnings = hospital_status(lg_total, lg_approved, quality_ok)
+
+            detailed_hospitals.append({
+                "id": hosp.id,
+                "name": hosp.name,
+                "level": hosp.level,
+                "beds": int(hosp.beds),
+                "lg_total": lg_total,
+                "lg_approved": lg_approved,
+                "lg_percentage": int((lg_approved / lg_total) * 100) if lg_total else 0,
+                "quality_fulfilled": quality_ok,
+                "status": status,
+                "warnings": warnings,
+                "staff": int(hosp.staff),
+            })
+
+        return detailed_hospitals
+
+    @timed(KIND_GETTER)
+    def get_hospital_details(self, hospital_name):
+        hospital_base = self.registry.by_name(hospital_name)
+        if not hospital_base:
+            return None
+
+        site_id = hospital_base["id"]
+        recent_months = self.months[SOURCE_ROUTINE][-6:]
+        approvals, staffing, indicators = self.store.batch([
+            (QUERY_SITE_APPROVALS, (self._latest(SOURCE_LG_APPROVALS), site_id)),
+            (QUERY_SITE_STAFFING, (self._latest(SOURCE_STAFFING), site_id)),
+            (QUERY_SITE_INDICATORS, (recent_months[0], recent_months[-1], site_id)),
+        ])
+        staffing, indicators = staffing.iloc[0], indicators.iloc[0]
+        cases = indicators["cases"] or 0
+
+        def indicator(col):
+            value = indicators[f"{col}_weighted"] / cases if cases else indicators[f"{col}_mean"]
+            return round(float(value), 1)
+
+        by_status = approvals.groupby("status")["lg"].apply(list)
+        return {
+            "id": site_id,
+            "name": hospital_name,
+            "region": hospital_base["region"],
+            "level": hospital_base["level"],
+            "beds": hospital_base["beds"],
+            "staff": int(staffing["staff"]),
+            "lg_approved": by_status.get("approved", []),
+            "lg_in_progress": [
+                {"name": lg, "status": "Audit geplant", "date": "offen"} for lg in by_status.get("in_progress", [])
+            ],
+            "lg_rejected": [
+                {"name": lg, "reason": rejection_reason(self.get_volume_projection(), site_id, lg)}
+                for lg in by_status.get("rejected", [])
+            ],
+            "quality": {
+                "staff_ok": bool(staffing["quality_ok"]),
+                "equipment_ok": True,
+                "related_lg_ok": True,
+            },
+            "quality_indicators": {
+                "complication_rate": indicator("complication_rate"),
+                "mortality_rate": indicator("mortality_rate"),
+                "satisfaction": indicator("satisfaction"),
+            }
+        }
@@ -0,0 +1,294 @@
+"""
+Synthetic data generator for the Hospital Reform Dashboard
+Generates seeded, columnar datasets at Bundesland and federal scale for load testing
+"""
+
+import numpy as np
+import pandas as pd
+
+from mock_data import REGIONS, LEISTUNGSGRUPPEN
+
+LEVELS = ["Maximalversorgung", "Schwerpunktversorgung", "Regelversorgung"]
+LEVEL_WEIGHTS = [0.1, 0.25, 0.65]
+LEVEL_BEDS = [700, 450, 300]  # median beds per level
+LEVEL_LG_SHARE = [0.95, 0.75, 0.5]  # share of LGs applied for per level
+
+LG_STATUSES = ["approved", "in_progress", "rejected"]
+LG_STATUS_WEIGHTS = [0.75, 0.15, 0.10]
+
+# Bounding boxes (lat_min, lat_max, lon_min, lon_max)
+BBOX_SH = (53.4, 55.05, 8.3, 11.3)
+BBOX_DE = (47.3, 55.05, 5.9, 15.0)
+
+# Neighbouring states as origins/destinations of patient flows: (lat, lon, attraction)
+NEIGHBOUR_STATES = {
+    "Hamburg": (53.55, 10.0, 1.0),
+    "Niedersachsen": (53.3, 9.4, 0.5),
+    "Mecklenburg-Vorpommern": (53.85, 11.3, 0.4),
+    "Bremen": (53.08, 8.8, 0.3),
+}
+
+
+def _month_range(n_months, end_month=None):
+    end = pd.Timestamp(end_month) if end_month is not None else pd.Timestamp.now()
+    return pd.date_range(end=end.to_period("M").to_timestamp(), periods=n_months, freq="MS")
+
+
+def _region_names(n_regions):
+    if n_regions <= len(REGIONS):
+        return REGIONS[:n_regions]
+    return [f"Region {i + 1:03d}" for i in range(n_regions)]
+
+
+def generate_sites(rng, n_sites, regions, bbox=BBOX_SH):
+    """Generate hospital master data (one row per site)"""
+    level_idx = rng.choice(len(LEVELS), size=n_sites, p=LEVEL_WEIGHTS)
+    beds = np.rint(np.asarray(LEVEL_BEDS)[level_idx] * rng.lognormal(0.0, 0.25, n_sites)).astype(np.int32)
+    site_ids = np.char.add("9", np.char.zfill(np.arange(1, n_sites + 1).astype(str), 5))
+
+    return pd.DataFrame({
+        "id": site_ids,
+        "name": np.char.add("Standort ", site_ids),
+        "region": pd.Categorical.from_codes(rng.integers(0, len(regions), n_sites), categories=regions),
+        "level": pd.Categorical.from_codes(level_idx, categories=LEVELS),
+        "beds": beds,
+        "lat": rng.uniform(bbox[0], bbox[1], n_sites).round(4),
+        "lon": rng.uniform(bbox[2], bbox[3], n_sites).round(4),
+    })
+
+
+def complete_sites(rng, sites, months, bbox=BBOX_SH):
+    """Add coordinates and Transformationsfonds columns to hospital master data
+
+    funds_requested is in Mio. EUR; funds_granted is the month the request
+    was granted (NaT while still open).
+    """
+    sites = sites.copy()
+    n_sites = len(sites)
+    sites["region"] = sites["region"].astype("category")
+    sites["level"] = pd.Categorical(sites["level"], categories=LEVELS)
+    if "lat" not in sites:
+        sites["lat"] = rng.uniform(bbox[0], bbox[1], n_sites).round(4)
+        sites["lon"] = rng.uniform(bbox[2], bbox[3], n_sites).round(4)
+
+    sites["funds_requested"] = (sites["beds"].to_numpy() * 0.01 * rng.lognormal(0.0, 0.3, n_sites)).round(1)
+    granted = months[rng.integers(0, len(months), n_sites)]
+    sites["funds_granted"] = granted.where(rng.random(n_sites) < 0.8)
+    return sites
+
+
+def generate_approvals(rng, sites, leistungsgruppen, months):
+    """Generate LG applications and decisions (one row per site x applied LG)"""
+    n_sites, n_lg = len(sites), len(leistungsgruppen)
+    share = np.asarray(LEVEL_LG_SHARE)[sites["level"].cat.codes.to_numpy()]
+    applied = rng.random((n_sites, n_lg)) < share[:, None]
+    site_idx, lg_idx = np.nonzero(applied)
+    n = len(site_idx)
+
+    status_idx = rng.choice(len(LG_STATUSES), size=n, p=LG_STATUS_WEIGHTS)
+    decided = months[rng.integers(0, len(months), n)]
+    decided = decided.where(status_idx != 1)  # in_progress has no decision yet
+
+    return pd.DataFrame({
+        "site_id": sites["id"].to_numpy()[site_idx],
+        "region": sites["region"].to_numpy()[site_idx],
+        "lg": pd.Categorical.from_codes(lg_idx, categories=leistungsgruppen),
+        "status": pd.Categorical.from_codes(status_idx, categories=LG_STATUSES),
+        "decided": decided,
+    })
+
+
+def generate_indicators(rng, sites, approvals, months):
+    """Generate monthly routine data and quality indicators (site x LG x month)"""
+    n_pairs, n_months = len(approvals), len(months)
+    site_pos = pd.Index(sites["id"]).get_indexer(approvals["site_id"])
+    beds = sites["beds"].to_numpy()[site_pos]
+    lg_per_site = np.bincount(site_pos, minlength=len(sites))[site_pos]
+
+    # Per-series parameters, then broadcast over months; cases are scaled so
+    # that bed occupancy (cases x stay / bed days) averages around 78%
+    base_cases = beds * 30 * 0.78 / 5.2 / lg_per_site * rng.lognormal(0.0, 0.15, n_pairs)
+    trend = rng.normal(0.0, 0.01, n_pairs)
+    base_compl = rng.normal(2.3, 0.4, n_pairs)
+    base_mort = rng.normal(1.1, 0.25, n_pairs)
+    base_satis = rng.normal(3.9, 0.3, n_pairs)
+    base_stay = rng.normal(5.2, 0.6, n_pairs)
+
+    t = np.arange(n_months)
+    season = 1.0 + 0.1 * np.cos(2 * np.pi * (months.month.to_numpy() - 1) / 12)
+    expected = base_cases[:, None] * (1 + trend[:, None] * t[None, :]) * season[None, :]
+    cases = rng.poisson(np.clip(expected, 0.1, None)).astype(np.int32)
+
+    shape = (n_pairs, n_months)
+    drift = -0.02 * t[None, :]
+    return pd.DataFrame({
+        "site_id": np.repeat(approvals["site_id"].to_numpy(), n_months),
+        "region": np.repeat(approvals["region"].to_numpy(), n_months),
+        "lg": np.repeat(approvals["lg"].to_numpy(), n_months),
+        "month": np.tile(months.to_numpy(), n_pairs),
+        "cases": cases.ravel(),
+        "complication_rate": np.clip(base_compl[:, None] + drift + rng.normal(0, 0.2, shape), 0.2, None).round(2).ravel(),
+        "mortality_rate": np.clip(base_mort[:, None] + rng.normal(0, 0.1, shape), 0.1, None).round(2).ravel(),
+        "satisfaction": np.clip(base_satis[:, None] + rng.normal(0, 0.1, shape), 1.0, 5.0).round(2).ravel(),
+        "avg_stay": np.clip(base_stay[:, None] + rng.normal(0, 0.3, shape), 1.0, None).round(2).ravel(),
+    })
+
+
+def generate_staffing(rng, approvals, months):
+    """Generate monthly staffing reports (site x LG x month, in full-time equivalents)"""
+    n_pairs, n_months = len(approvals), len(months)
+    required = rng.integers(3, 12, n_pairs)
+    coverage = rng.normal(1.1, 0.1, (n_pairs, n_months))
+    actual = np.maximum(np.rint(required[:, None] * coverage), 0).astype(np.int16)
+
+    return pd.DataFrame({
+        "site_id": np.repeat(approvals["site_id"].to_numpy(), n_months),
+        "region": np.repeat(approvals["region"].to_numpy(), n_months),
+        "lg": np.repeat(approvals["lg"].to_numpy(), n_months),
+        "month": np.tile(months.to_numpy(), n_pairs),
+        "staff_required": np.repeat(required.astype(np.int16), n_months),
+        "staff_actual": actual.ravel(),
+    })
+
+
+def generate_dataset(n_sites=1700, n_months=36, n_regions=5, leistungsgruppen=LEISTUNGSGRUPPEN,
+                     seed=42, end_month=None, bbox=BBOX_SH, sites=None):
+    """Generate a reproducible synthetic dataset as a dict of columnar DataFrames
+
+    Keys: "sites", "approvals", "indicators", "staffing". The same seed and
+    parameters always produce the same data; pass end_month to keep the
+    month axis fixed across calendar months. Pass sites (id, name, region,
+    level, beds) to generate facts for existing master data instead of
+    random sites.
+    """
+    rng = np.random.default_rng(seed)
+    months = _month_range(n_months, end_month)
+
+    if sites is None:
+        sites = generate_sites(rng, n_sites, _region_names(n_regions), bbox)
+    sites = complete_sites(rng, sites, months, bbox)
+    approvals = generate_approvals(rng, sites, list(leistungsgruppen), months)
+
+    return {
+        "sites": sites,
+        "approvals": approvals,
+        "indicators": generate_indicators(rng, sites, approvals, months),
+        "staffing": generate_staffing(rng, approvals, months),
+    }
+
+
+def generate_population_grid(sites, bbox=BBOX_SH, cell_km=1.0, total_population=2_950_000, n_towns=60,
+                             rural_share=0.3, seed=42):
+    """Generate a population grid (one row per cell: lat, lon, population)
+
+    Cells are cell_km squares over the bounding box. rural_share of the
+    population is spread evenly, the rest around towns placed at randomly
+    chosen sites (weighted by beds) with a Gaussian falloff.
+    """
+    rng = np.random.default_rng(seed)
+    lat_mid = (bbox[0] + bbox[1]) / 2
+    lat_step = cell_km / 110.574
+    lon_step = cell_km / (111.320 * np.cos(np.radians(lat_mid)))
+    lats = np.arange(bbox[0] + lat_step / 2, bbox[1], lat_step)
+    lons = np.arange(bbox[2] + lon_step / 2, bbox[3], lon_step)
+    cell_lat, cell_lon = (a.ravel() for a in np.meshgrid(lats, lons, indexing="ij"))
+
+    beds = sites["beds"].to_numpy(dtype=float)
+    towns = rng.choice(len(sites), size=min(n_towns, len(sites)), replace=False, p=beds / beds.sum())
+    town_lat = sites["lat"].to_numpy()[towns]
+    town_lon = sites["lon"].to_numpy()[towns]
+    town_weight = beds[towns]
+    town_sigma_km = rng.uniform(3, 10, len(towns))
+
+    dy = (cell_lat[:, None] - town_lat[None, :]) * 110.574
+    dx = (cell_lon[:, None] - town_lon[None, :]) * 111.320 * np.cos(np.radians(lat_mid))
+    urban = (town_weight * np.exp(-(dx ** 2 + dy ** 2) / (2 * town_sigma_km ** 2))).sum(axis=1)
+
+    density = rural_share / len(cell_lat) + (1 - rural_share) * urban / urban.sum()
+    return pd.DataFrame({
+        "lat": cell_lat.round(4),
+        "lon": cell_lon.round(4),
+        "population": rng.poisson(density * total_population).astype(np.int32),
+    })
+
+
+def generate_cases(sites, routine, seed=42, home_share=0.85, inbound_share=0.04, outbound_share=0.06,
+                   distance_km=40.0):
+    """Generate case-level routine data for one month (one row per case: residence, destination, lg)
+
+    Every case of routine (site_id, lg, cases) is treated at its site; its
+    residence is the site's region with probability home_share, a
+    neighbouring state with inbound_share and another region otherwise,
+    weighted by exp(-distance / distance_km) between region centres. On top,
+    outbound_share of each region's cases are residents treated in a
+    neighbouring state (destination = state name).
+    """
+    rng = np.random.default_rng(seed)
+    site_ids = pd.Index(sites["id"].astype(str))
+    site_regions = sites["region"].astype(str).to_numpy()
+    regions = list(dict.fromkeys(site_regions))
+    external = list(NEIGHBOUR_STATES)
+    areas = regions + external
+
+    centres = sites.groupby(site_regions, sort=False)[["lat", "lon"]].mean().loc[regions].to_numpy()
+    centres = np.vstack([centres, [NEIGHBOUR_STATES[state][:2] for state in external]])
+    lat_mid = centres[:, 0].mean()
+    dy = (centres[:len(regions), None, 0] - centres[None, :, 0]) * 110.574
+    dx = (centres[:len(regions), None, 1] - centres[None, :, 1]) * 111.320 * np.cos(np.radians(lat_mid))
+    gravity = np.exp(-np.hypot(dx, dy) / distance_km)
+    gravity[:, len(regions):] *= [NEIGHBOUR_STATES[state][2] for state in external]
+
+    # Residence probabilities per treating region (rows) over all areas
+    n_regions = len(regions)
+    same = np.eye(n_regions, len(areas), dtype=bool)
+    other = gravity * ~same
+    other[:, n_regions:] = 0
+    residence_p = (
+        home_share * same
+        + (1 - home_share - inbound_share) * other / np.maximum(other.sum(axis=1, keepdims=True), 1e-12)
+    )
+    residence_p[:, n_regions:] = inbound_share * gravity[:, n_regions:] / gravity[:, n_regions:].sum(axis=1, keepdims=True)
+
+    # Treated in the state: one entry per case, residence drawn per treating region
+    site_pos = site_ids.get_indexer(routine["site_id"].astype(str))
+    counts = routine["cases"].to_numpy(dtype=np.int64)
+    lg = pd.Categorical(routine["lg"], categories=LEISTUNGSGRUPPEN)
+    case_site = np.repeat(site_pos, counts)
+    case_lg = np.repeat(lg.codes, counts)
+    case_region = pd.Index(regions).get_indexer(site_regions)[case_site]
+    residence = np.empty(len(case_site), dtype=np.int16)
+    u = rng.random(len(case_site))
+    for region_idx in range(n_regions):
+        mask = case_region == region_idx
+        cdf = np.cumsum(residence_p[region_idx])
+        residence[mask] = np.minimum(np.searchsorted(cdf / cdf[-1], u[mask]), len(areas) - 1)
+
+    # Treated in a neighbouring state: per residence region, LG mix of its own cases
+    out_residence, out_destination, out_lg = [], [], []
+    by_region_lg = np.zeros((n_regions, len(LEISTUNGSGRUPPEN)))
+    np.add.at(by_region_lg, (case_region, case_lg), 1)
+    for region_idx in range(n_regions):
+        n_out = rng.poisson(outbound_share * by_region_lg[region_idx].sum())
+        if n_out == 0:
+            continue
+        state_p = gravity[region_idx, n_regions:] / gravity[region_idx, n_regions:].sum()
+        out_residence.append(np.full(n_out, region_idx, dtype=np.int16))
+        out_destination.append(len(site_ids) + rng.choice(len(external), n_out, p=state_p))
+        out_lg.append(rng.choice(len(LEISTUNGSGRUPPEN), n_out, p=by_region_lg[region_idx] / by_region_lg[region_idx].sum()))
+
+    destinations = list(site_ids) + external
+    return pd.DataFrame({
+        "residence": pd.Categorical.from_codes(np.concatenate([residence] + out_residence), categories=areas),
+        "destination": pd.Categorical.from_codes(
+            np.concatenate([case_site] + out_destination).astype(np.int32), categories=destinations
+        ),
+        "lg": pd.Categorical.from_codes(np.concatenate([case_lg] + out_lg), categories=LEISTUNGSGRUPPEN),
+    })
+
+
+def to_hospitals_mapping(sites):
+    """Convert a sites DataFrame to the HOSPITALS layout (region -> list of hospital dicts)"""
+    hospitals = {}
+    for region, group in sites.groupby("region", observed=True, sort=False):
+        hospitals[region] = group[["id", "name", "level", "beds"]].astype({"level": str}).to_dict("records")
+    return hospitals
@@ -0,0 +1,75 @@
+"""Data generations of StoreBackend: which engines a refresh recomputes"""
+
+import pandas as pd
+import pytest
+
+from data_store import DataStore, SOURCE_LG_APPROVALS, SOURCE_ROUTINE, StoreBackend, write_dataset
+from ingest import ingest_file
+from synthetic_data import generate_dataset
+
+
+@pytest.fixture
+def dataset():
+    return generate_dataset(n_sites=60, n_months=14, seed=7)
+
+
+@pytest.fixture
+def store(tmp_path, dataset):
+    store = DataStore(str(tmp_path / "store"))
+    write_dataset(store, dataset)
+    return store
+
+
+def deliver_approvals(tmp_path, dataset, name="lg_approvals_daily.csv"):
+    """Daily approvals delivery of the current month in which every open application was approved on the 10th"""
+    month = dataset["indicators"]["month"].max()
+    approvals = dataset["approvals"].copy()
+    open_applications = approvals["status"] != "approved"
+    approvals["status"] = "approved"
+    approvals.loc[open_applications, "decided"] = month + pd.Timedelta(days=9)
+    approvals["month"] = month.strftime("%Y-%m")
+    path = tmp_path / name
+    approvals.to_csv(path, index=False, date_format="%Y-%m-%d")
+    return str(path)
+
+
+def test_same_month_approvals_delivery_refreshes_kpis(tmp_path, store, dataset):
+    backend = StoreBackend(store).build()
+    before = backend.get_state_kpis()["lg_approved"]
+
+    stats = ingest_file(store, SOURCE_LG_APPROVALS, deliver_approvals(tmp_path, dataset))
+    assert stats["months"] == list(backend.months[SOURCE_LG_APPROVALS])  # same month, replaced
+
+    refreshed = backend.refreshed()
+    fresh = StoreBackend(store).build()
+    after = refreshed.get_state_kpis()["lg_approved"]
+    assert after == fresh.get_state_kpis()["lg_approved"]
+    assert after["current"] == after["total"] > before["current"]
+    assert refreshed.get_critical_alerts() == fresh.get_critical_alerts()
+    assert refreshed.get_reachability() is not backend.get_reachability()
+
+
+def test_refreshed_reuses_only_unchanged_engines(store, dataset):
+    backend = StoreBackend(store).build()
+    backend.get_patient_flows()
+
+    same = backend.refreshed()
+    assert same.get_kpi_rollup() is backend.get_kpi_rollup()
+    assert same.get_reachability() is backend.get_reachability()
+    assert same.get_volume_projection() is backend.get_volume_projection()
+    assert same.get_patient_flows() is backend.get_patient_flows()
+    assert same.get_alert_engine() is backend.get_alert_engine()
+
+    # A new routine month: routine engines are rebuilt, the approvals' reachability is kept
+    latest = dataset["indicators"]["month"].max()
+    routine = dataset["indicators"][dataset["indicators"]["month"] == latest].copy()
+    routine["month"] = latest + pd.DateOffset(months=1)
+    store.write(SOURCE_ROUTINE, routine)
+
+    refreshed = same.refreshed()
+    assert refreshed.get_reachability() is same.get_reachability()
+    assert refreshed.get_kpi_rollup() is not same.get_kpi_rollup()
+    assert refreshed.get_volume_projection() is not same.get_volume_projection()
+    assert refreshed.get_patient_flows() is not same.get_patient_flows()
+    assert refreshed.get_alert_engine() is not same.get_alert_engine()
+    assert refreshed.get_volume_projection().as_of == routine["month"].iloc[0]
@@ -0,0 +1,64 @@
+"""Immutable snapshots and the atomic generation swap of data_provider"""
+
+import threading
+
+import numpy as np
+import pytest
+
+import data_provider
+import mock_data
+from snapshot import Snapshot, freeze
+
+
+@pytest.fixture
+def restore_snapshot():
+    snapshot = data_provider._snapshot
+    yield
+    data_provider._swap(snapshot)
+    data_provider._pinned.snapshot = None
+
+
+def test_frozen_values_are_read_only():
+    value = freeze({"rows": [{"a": 1}], "array": np.arange(3), "pair": ([1], 2)})
+    with pytest.raises(TypeError):
+        value["rows"] = []
+    with pytest.raises(TypeError):
+        value["rows"].append({"a": 2})
+    with pytest.raises(TypeError):
+        value["rows"][0]["a"] = 2
+    with pytest.raises(TypeError):
+        value["pair"][0].append(3)
+    with pytest.raises(ValueError):
+        value["array"][0] = 1
+
+
+def test_snapshot_computes_each_value_once():
+    snapshot = Snapshot(mock_data, 1)
+    calls = []
+    first, hit = snapshot.get(("getter",), lambda: calls.append(1) or [1, 2])
+    second, second_hit = snapshot.get(("getter",), lambda: calls.append(1) or [3])
+    assert (hit, second_hit) == (False, True)
+    assert first is second and len(calls) == 1
+
+
+def test_pinned_run_keeps_its_generation_across_swap(restore_snapshot):
+    old = data_provider._snapshot
+    pinned, swapped, seen = threading.Event(), threading.Event(), {}
+
+    def script_run():
+        data_provider.pin()
+        pinned.set()
+        swapped.wait()
+        seen["during"] = data_provider.current_snapshot()
+        seen["next_run"] = data_provider.pin()
+
+    thread = threading.Thread(target=script_run)
+    thread.start()
+    pinned.wait()
+    new = Snapshot(mock_data, old.generation + 1)
+    data_provider._swap(new)
+    swapped.set()
+    thread.join()
+
+    assert seen["during"] is old
+    assert seen["next_run"] is new
@@ -0,0 +1,115 @@
+"""
+Time-series engine for quality indicators
+Date-indexed monthly series per hospital x LG with pre-aggregated state and federal baselines
+
+Baselines are stored as case counts plus case-weighted sums per LG and
+month, so any range, rolling window or coarser frequency can be derived
+by slicing and summing without touching hospital-level rows.
+"""
+
+import pandas as pd
+
+INDICATORS = ["complication_rate", "mortality_rate", "satisfaction", "avg_stay"]
+
+LEVEL_STATE = "state"
+LEVEL_FEDERAL = "federal"
+
+
+def _aggregate(indicators):
+    """Case-weighted sums per LG and month: {lg: DataFrame indexed by month}"""
+    weighted = indicators[INDICATORS].mul(indicators["cases"], axis=0)
+    weighted["cases"] = indicators["cases"]
+    weighted["lg"] = indicators["lg"].astype(str)
+    weighted["month"] = pd.to_datetime(indicators["month"])
+
+    sums = weighted.groupby(["lg", "month"]).sum()
+    return {lg: frame.droplevel("lg").sort_index() for lg, frame in sums.groupby(level="lg")}
+
+
+_EMPTY = pd.DataFrame(columns=["cases"] + INDICATORS, index=pd.DatetimeIndex([], name="month"), dtype=float)
+
+
+def _rates(sums):
+    return sums[INDICATORS].div(sums["cases"].where(sums["cases"] > 0), axis=0)
+
+
+class QualityTimeSeries:
+    """Monthly quality indicators with range queries, rolling windows and year-over-year changes"""
+
+    def __init__(self, indicators, federal_indicators=None):
+        self._baselines = {LEVEL_STATE: _aggregate(indicators)}
+        if federal_indicators is not None:
+            self._baselines[LEVEL_FEDERAL] = _aggregate(federal_indicators)
+
+        sites = indicators[["site_id", "lg", "month", "cases"] + INDICATORS].copy()
+        sites["lg"] = sites["lg"].astype(str)
+        sites["month"] = pd.to_datetime(sites["month"])
+        self._sites = sites.set_index(["site_id", "lg", "month"]).sort_index()
+
+    @property
+    def leistungsgruppen(self):
+        return list(self._baselines[LEVEL_STATE])
+
+    def _sums(self, leistungsgruppe, level):
+        return self._baselines[level].get(leistungsgruppe, _EMPTY)
+
+    def months(self, leistungsgruppe):
+        """Available months of an LG's state series"""
+        return self._sums(leistungsgruppe, LEVEL_STATE).index
+
+    def baseline(self, leistungsgruppe, start=None, end=None, level=LEVEL_STATE, freq=None):
+        """Case-weighted indicator rates of an LG for a date range
+
+        freq downsamples to a coarser pandas frequency (e.g. "QS", "YS")
+        by re-weighting the summed cases, not by averaging rates.
+        """
+        sums = self._sums(leistungsgruppe, level).loc[start:end]
+        if freq is not None:
+            sums = sums.resample(freq).sum()
+        return _rates(sums)
+
+    def site_series(self, site_id, leistungsgruppe, start=None, end=None):
+        """Monthly cases and indicators of one hospital x LG for a date range"""
+        try:
+            series = self._sites.loc[(site_id, leistungsgruppe)]
+        except KeyError:
+            return pd.DataFrame(columns=["cases"] + INDICATORS)
+        return series.loc[start:end]
+
+    def rolling(self, leistungsgruppe, window=3, start=None, end=None, level=LEVEL_STATE):
+        """Case-weighted rolling mean over `window` months"""
+        sums = self._sums(leistungsgruppe, level)
+        rolled = sums.rolling(window, min_periods=window).sum()
+        return _rates(rolled).loc[start:end]
+
+    def year_over_year(self, leistungsgruppe, start=None, end=None, level=LEVEL_STATE):
+        """Change of each indicator against the same month one year earlier"""
+        rates = self.baseline(leistungsgruppe, level=level)
+        previous = rates.shift(freq=pd.DateOffset(years=1)).reindex(rates.index)
+        return (rates - previous).loc[start:end]
+
+    def trend_frame(self, leistungsgruppe, months=12, indicator="complication_rate", window=None, end=None):
+        """State vs. federal series of one indicator over the last `months` months
+
+        Columns: month, <indicator>_sh, <indicator>_bund (if a federal
+        baseline exists) and <indicator>_sh_yoy. With window, the state and
+        federal values are rolling means over that many months.
+        """
+        available = self.months(leistungsgruppe)
+        if end is not None:
+            available = available[available <= pd.Timestamp(end)]
+        start = available[-months] if months and len(available) >= months else None
+        end = available[-1] if len(available) else None
+
+        def series(level):
+            if window:
+                return self.rolling(leistungsgruppe, window, start, end, level=level)[indicator]
+            return self.baseline(leistungsgruppe, start, end, level=level)[indicator]
+
+        state = series(LEVEL_STATE)
+        frame = pd.DataFrame({"month": state.index, f"{indicator}_sh": state.to_numpy()})
+        if LEVEL_FEDERAL in self._baselines:
+            frame[f"{indicator}_bund"] = series(LEVEL_FEDERAL).reindex(state.index).to_numpy()
+        yoy = self.year_over_year(leistungsgruppe, start, end)[indicator]
+        frame[f"{indicator}_sh_yoy"] = yoy.reindex(state.index).to_numpy()
+        return frame
@@ -0,0 +1,127 @@
+"""
+Mindestmengen volume projection
+Projects the annual case volume of every site x LG from the monthly routine data
+
+All series share one monthly design matrix (intercept, linear trend and
+annual harmonics), so the least-squares fits of all series are one batched
+solve; series with the same missing months are solved together. The
+projection is the sum of the fitted values over the next 12 months and is
+compared with the Mindestmengen thresholds.
+"""
+
+import numpy as np
+import pandas as pd
+
+FIT_MONTHS = 36
+HORIZON_MONTHS = 12
+HARMONICS = 1  # cos/sin pairs of the annual season
+MINDESTMENGE_CRITICAL_SHARE = 0.75  # projection / threshold below this is critical
+
+STATUS_NONE = "none"  # LG without Mindestmenge
+
+
+def _month_number(months):
+    months = pd.DatetimeIndex(months)
+    return months.year.to_numpy() * 12 + months.month.to_numpy() - 1
+
+
+def design_matrix(month_numbers, origin, harmonics=HARMONICS):
+    """Columns: intercept, trend (years since origin) and cos/sin of the annual season"""
+    t = np.asarray(month_numbers, dtype=float)
+    columns = [np.ones_like(t), (t - origin) / 12]
+    for k in range(1, harmonics + 1):
+        columns += [np.cos(2 * np.pi * k * t / 12), np.sin(2 * np.pi * k * t / 12)]
+    return np.column_stack(columns)
+
+
+def fit_batch(Y, X):
+    """Least-squares coefficients (series x columns) of all rows of Y (NaN = missing month)
+
+    Rows are grouped by their pattern of observed months and each group is
+    solved with one pseudo-inverse for all of its rows; rows with fewer
+    observations than columns get NaN.
+    """
+    coef = np.full((len(Y), X.shape[1]), np.nan)
+    observed = ~np.isnan(Y)
+    # One bytes key per pattern (packed bits), much faster than np.unique(axis=0)
+    keys = np.packbits(observed, axis=1)
+    keys = keys.view(f"V{keys.shape[1]}").ravel() if keys.shape[1] > 1 else keys.ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    for p, row in enumerate(first):
+        pattern = observed[row]
+        if pattern.sum() < X.shape[1]:
+            continue
+        rows = np.flatnonzero(inverse == p)
+        rhs = Y[rows] if pattern.all() else Y[np.ix_(rows, pattern)]
+        coef[rows] = (np.linalg.pinv(X[pattern]) @ rhs.T).T
+    return coef
+
+
+def volume_status(projected, threshold):
+    """Rate projected annual cases against thresholds (vectorized, NaN threshold = STATUS_NONE)"""
+    projected = np.asarray(projected, dtype=float)
+    threshold = np.asarray(threshold, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [np.isnan(threshold), projected >= threshold, projected >= threshold * MINDESTMENGE_CRITICAL_SHARE],
+            [STATUS_NONE, "success", "warning"],
+            "critical",
+        )
+
+
+class VolumeProjection:
+    """Annual case projection and Mindestmenge status of every site x LG"""
+
+    def __init__(self, indicators, thresholds, as_of=None, fit_months=FIT_MONTHS, horizon=HORIZON_MONTHS):
+        """indicators: site_id, lg, month, cases (monthly routine data); thresholds: LG -> annual cases"""
+        months = pd.to_datetime(indicators["month"])
+        as_of = pd.Timestamp(as_of) if as_of is not None else months.max()
+        window = months.between(as_of - pd.DateOffset(months=fit_months - 1), as_of)
+        indicators = indicators[window]
+
+        site_codes, site_ids = pd.factorize(indicators["site_id"])
+        lg_codes, lgs = pd.factorize(indicators["lg"])
+        keys, series = np.unique(site_codes * len(lgs) + lg_codes, return_inverse=True)
+        self.index = pd.MultiIndex.from_arrays(
+            [np.asarray(site_ids, dtype=str)[keys // len(lgs)], np.asarray(lgs, dtype=str)[keys % len(lgs)]],
+            names=["site_id", "lg"],
+        )
+        month_numbers = np.arange(_month_number([as_of])[0] - fit_months + 1, _month_number([as_of])[0] + 1)
+        month_pos = _month_number(months[window]) - month_numbers[0]
+
+        Y = np.full((len(self.index), fit_months), np.nan)
+        Y[series, month_pos] = indicators["cases"].to_numpy(dtype=float)
+
+        origin = month_numbers[-1]
+        X = design_matrix(month_numbers, origin)
+        self.coef = fit_batch(Y, X)
+        future = design_matrix(np.arange(origin + 1, origin + 1 + horizon), origin)
+        fitted = np.clip(self.coef @ future.T, 0, None)
+
+        cases_12m = np.nansum(Y[:, -12:], axis=1)
+        mean_month = np.nanmean(Y, axis=1)
+        projected = np.where(np.isnan(fitted).any(axis=1), mean_month * horizon, fitted.sum(axis=1))
+        threshold = self.index.get_level_values("lg").map(thresholds).to_numpy(dtype=float, na_value=np.nan)
+
+        self.table = pd.DataFrame({
+            "cases_12m": cases_12m.astype(int),
+            "projected": np.rint(projected).astype(int),
+            "trend_pct": np.round(100 * self.coef[:, 1] / np.maximum(mean_month, 1e-9), 1),
+            "threshold": threshold,
+            "status": volume_status(projected, threshold),
+        }, index=self.index)
+        self.as_of = as_of
+
+    def for_site(self, site_id):
+        """Projection of one site's LGs (indexed by lg)"""
+        try:
+            return self.table.xs(str(site_id), level="site_id")
+        except KeyError:
+            return self.table.iloc[:0].droplevel("site_id")
+
+    def for_lg(self, leistungsgruppe):
+        """Projection of one LG at all sites (indexed by site_id)"""
+        try:
+            return self.table.xs(leistungsgruppe, level="lg")
+        except KeyError:
+            return self.table.iloc[:0].droplevel("lg")